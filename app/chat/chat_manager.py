@@ -3,14 +3,30 @@ import os
 import sqlite3
 import uuid
 
+from app.db.connection import RESUMES_DB_PATH, get_cursor
+from app.db.write_queue import get_write_queue
 
-PRIMARY_DB_PATH = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-)
+
+PRIMARY_DB_PATH = RESUMES_DB_PATH
 FALLBACK_CHAT_DB_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage", "chat_history.db"
 )
 
+CHAT_HISTORY_SQL = """
+    SELECT message_id, role, content, timestamp, search_type, query_analysis, candidate_names, conversation_context
+    FROM chat_messages
+    WHERE session_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+MESSAGE_RESULTS_SQL = """
+    SELECT resume_id
+    FROM message_results
+    WHERE message_id = ?
+    ORDER BY rank
+"""
+
 
 def _ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(path)
@@ -51,6 +67,8 @@ def _schema_statements() -> list[str]:
             FOREIGN KEY (message_id) REFERENCES chat_messages(message_id)
         )
         """,
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_message_results_message ON message_results(message_id, rank)",
     ]
 
 
@@ -106,11 +124,9 @@ def _resolve_chat_db_path() -> str:
 DB_PATH = _resolve_chat_db_path()
 
 
-def _connect() -> sqlite3.Connection:
-    _init_chat_db(DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+def _write(work) -> None:
+    """Apply work(conn) through the single-writer queue and wait for the commit"""
+    get_write_queue(DB_PATH).submit(work).result()
 
 
 def create_chat_session(title: str = "New Conversation") -> str:
@@ -125,19 +141,13 @@ def create_chat_session(title: str = "New Conversation") -> str:
     """
     session_id = f"session_{uuid.uuid4().hex[:12]}"
 
-    conn = _connect()
-    cursor = conn.cursor()
-
-    cursor.execute(
+    _write(lambda conn: conn.execute(
         """
         INSERT INTO chat_sessions (session_id, title, created_at, last_updated_at)
         VALUES (?, ?, datetime('now'), datetime('now'))
         """,
         (session_id, title),
-    )
-
-    conn.commit()
-    conn.close()
+    ))
 
     return session_id
 
@@ -155,28 +165,25 @@ def save_user_message(session_id: str, content: str) -> str:
     """
     message_id = f"msg_{uuid.uuid4().hex[:12]}"
 
-    conn = _connect()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        INSERT INTO chat_messages (message_id, session_id, role, content, timestamp)
-        VALUES (?, ?, 'user', ?, datetime('now'))
-        """,
-        (message_id, session_id, content),
-    )
+    def save(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            INSERT INTO chat_messages (message_id, session_id, role, content, timestamp)
+            VALUES (?, ?, 'user', ?, datetime('now'))
+            """,
+            (message_id, session_id, content),
+        )
 
-    cursor.execute(
-        """
-        UPDATE chat_sessions
-        SET last_updated_at = datetime('now')
-        WHERE session_id = ?
-        """,
-        (session_id,),
-    )
+        conn.execute(
+            """
+            UPDATE chat_sessions
+            SET last_updated_at = datetime('now')
+            WHERE session_id = ?
+            """,
+            (session_id,),
+        )
 
-    conn.commit()
-    conn.close()
+    _write(save)
 
     return message_id
 
@@ -210,46 +217,42 @@ def save_agent_message(
     candidate_names_json = json.dumps(candidate_names) if candidate_names else None
     conversation_context_json = json.dumps(conversation_context) if conversation_context else None
 
-    conn = _connect()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        INSERT INTO chat_messages (message_id, session_id, role, content, timestamp, search_type, query_analysis, candidate_names, conversation_context)
-        VALUES (?, ?, 'agent', ?, datetime('now'), ?, ?, ?, ?)
-        """,
-        (
-            message_id,
-            session_id,
-            content,
-            search_type,
-            query_analysis_json,
-            candidate_names_json,
-            conversation_context_json,
-        ),
-    )
+    def save(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            INSERT INTO chat_messages (message_id, session_id, role, content, timestamp, search_type, query_analysis, candidate_names, conversation_context)
+            VALUES (?, ?, 'agent', ?, datetime('now'), ?, ?, ?, ?)
+            """,
+            (
+                message_id,
+                session_id,
+                content,
+                search_type,
+                query_analysis_json,
+                candidate_names_json,
+                conversation_context_json,
+            ),
+        )
 
-    if candidate_ids:
-        for rank, resume_id in enumerate(candidate_ids, start=1):
-            cursor.execute(
+        if candidate_ids:
+            conn.executemany(
                 """
                 INSERT INTO message_results (message_id, resume_id, rank)
                 VALUES (?, ?, ?)
                 """,
-                (message_id, resume_id, rank),
+                [(message_id, resume_id, rank) for rank, resume_id in enumerate(candidate_ids, start=1)],
             )
 
-    cursor.execute(
-        """
-        UPDATE chat_sessions
-        SET last_updated_at = datetime('now')
-        WHERE session_id = ?
-        """,
-        (session_id,),
-    )
+        conn.execute(
+            """
+            UPDATE chat_sessions
+            SET last_updated_at = datetime('now')
+            WHERE session_id = ?
+            """,
+            (session_id,),
+        )
 
-    conn.commit()
-    conn.close()
+    _write(save)
 
     return message_id
 
@@ -265,20 +268,9 @@ def load_chat_history(session_id: str, limit: int = 10) -> list:
     Returns:
         List of message dicts with keys: role, content, candidate_ids, timestamp
     """
-    conn = _connect()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_cursor(row_factory=sqlite3.Row, db_path=DB_PATH)
 
-    cursor.execute(
-        """
-        SELECT message_id, role, content, timestamp, search_type, query_analysis, candidate_names, conversation_context
-        FROM chat_messages
-        WHERE session_id = ?
-        ORDER BY timestamp DESC
-        LIMIT ?
-        """,
-        (session_id, limit),
-    )
+    cursor.execute(CHAT_HISTORY_SQL, (session_id, limit))
 
     messages = list(reversed(cursor.fetchall()))
 
@@ -291,15 +283,7 @@ def load_chat_history(session_id: str, limit: int = 10) -> list:
         }
 
         if msg["role"] == "agent":
-            cursor.execute(
-                """
-                SELECT resume_id
-                FROM message_results
-                WHERE message_id = ?
-                ORDER BY rank
-                """,
-                (msg["message_id"],),
-            )
+            cursor.execute(MESSAGE_RESULTS_SQL, (msg["message_id"],))
             candidate_rows = cursor.fetchall()
             message_dict["candidate_ids"] = [row["resume_id"] for row in candidate_rows]
 
@@ -315,8 +299,6 @@ def load_chat_history(session_id: str, limit: int = 10) -> list:
 
         chat_history.append(message_dict)
 
-    conn.close()
-
     return chat_history
 
 
@@ -327,9 +309,7 @@ def get_all_sessions() -> list:
     Returns:
         List of session dicts with session_id, title, created_at, last_updated_at
     """
-    conn = _connect()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_cursor(row_factory=sqlite3.Row, db_path=DB_PATH)
 
     cursor.execute(
         """
@@ -341,8 +321,6 @@ def get_all_sessions() -> list:
 
     sessions = [dict(row) for row in cursor.fetchall()]
 
-    conn.close()
-
     return sessions
 
 
@@ -0,0 +1,91 @@
+# app/db/connection.py
+"""
+Shared read connections for the query paths (agent nodes, hybrid search, chat history).
+
+Opening a connection per request costs a file open, schema parse and pragma
+setup on every agent step, and throws away SQLite's page cache and Python's
+prepared-statement cache each time. Instead, every thread keeps one open
+connection per database file:
+
+- WAL (readers never wait for the ingestion writer), plus a busy timeout
+- cache_size / mmap_size tuned for a read-heavy workload, temp_store in memory
+  (ORDER BY / DISTINCT on large result sets stay out of temp files)
+- a larger prepared-statement cache: parameterized SQL that is run again
+  (same text, new parameters) skips the SQL compiler
+- autocommit and query_only: a read never holds a transaction open, and
+  writes must go through app/db/write_queue.py
+
+The database path is RESUMES_DB_PATH (default: resumes.db in the project root),
+defined only here: init_db.DB_PATH, the write queue and every writer import it,
+so reads and writes hit the same file whatever the working directory.
+
+Usage:
+    cursor = get_cursor(row_factory=sqlite3.Row)
+    cursor.execute("SELECT * FROM parsed_resumes WHERE resume_id = ?", (resume_id,))
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+RESUMES_DB_PATH = os.path.abspath(os.getenv(
+    "RESUMES_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"),
+))
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))        # page cache per connection
+MMAP_SIZE_BYTES = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))  # prepared statements per connection
+
+_local = threading.local()
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """WAL journaling and a busy timeout (shared by the writer and the read pool)"""
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")  # safe with WAL; fsync only at checkpoints
+    return conn
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = configure_connection(sqlite3.connect(
+        db_path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+    ))
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    This thread's read connection to db_path (default RESUMES_DB_PATH).
+    Do not close it, and do not change its row_factory (use get_cursor).
+    """
+    key = os.path.abspath(db_path or RESUMES_DB_PATH)
+    # A forked child must not reuse its parent's connections
+    if getattr(_local, "pid", None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.connections = {}
+    conn = _local.connections.get(key)
+    if conn is None:
+        conn = _local.connections[key] = _open(key)
+    return conn
+
+
+def get_cursor(row_factory=None, db_path: Optional[str] = None) -> sqlite3.Cursor:
+    """A cursor on this thread's pooled connection, with its own row_factory"""
+    cursor = get_connection(db_path).cursor()
+    if row_factory is not None:
+        cursor.row_factory = row_factory
+    return cursor
+
+
+def close_connections() -> None:
+    """Close this thread's pooled connections (e.g. before a thread exits)"""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
@@ -1,11 +1,15 @@
 import sqlite3
 
-DB_PATH = "resumes.db"
+from app.db.connection import RESUMES_DB_PATH as DB_PATH
+from app.db.migrations import run_migrations
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    # WAL: readers (chat, search) never block the ingestion writer, and vice versa
+    cursor.execute("PRAGMA journal_mode=WAL")
+
     # Chat Sessions Table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS chat_sessions (
@@ -27,6 +31,7 @@ def init_db():
         candidate_names TEXT,
         search_type TEXT,
         query_analysis TEXT,
+        conversation_context TEXT,
         FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id)
     )
     """)
@@ -50,6 +55,7 @@ def init_db():
         recruiter_id TEXT,
         upload_type pdf,
         total_files INTEGER,
+        priority INTEGER DEFAULT 1,         -- 0 interactive | 1 normal | 2 backfill
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
@@ -63,9 +69,31 @@ def init_db():
         file_path TEXT,
         status TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        content_hash TEXT,      -- SHA-256 of the PDF bytes (upload-time dedup)
+        duplicate_of TEXT,      -- document_id of the first upload with the same content
+        near_duplicate_of TEXT,     -- document_id of an earlier, textually near-identical resume (MinHash/LSH)
+        near_duplicate_score REAL,  -- estimated Jaccard similarity to near_duplicate_of
         FOREIGN KEY (batch_id) REFERENCES upload_batches(batch_id)
     )
     """)
+
+    # MinHash signatures and LSH buckets for near-duplicate lookups (app/ingestion/near_duplicates.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS document_minhash (
+        document_id TEXT PRIMARY KEY,
+        signature BLOB NOT NULL,
+        FOREIGN KEY (document_id) REFERENCES documents(document_id)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS document_lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        document_id TEXT NOT NULL
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_lookup ON document_lsh_buckets(band, bucket)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_document ON document_lsh_buckets(document_id)")
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS parsed_resumes(
         resume_id TEXT PRIMARY KEY,
@@ -104,6 +132,77 @@ def init_db():
     )
 """)
 
+    # Ingestion Jobs Table (durable per-stage work queue with worker leases)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ingestion_jobs (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id TEXT NOT NULL,
+        stage TEXT NOT NULL,                -- extract | parse | index
+        status TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | dead
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        lease_owner TEXT,
+        lease_expires_at REAL,              -- unix time; expired leases are re-leased
+        available_at REAL NOT NULL DEFAULT 0,    -- unix time; retry backoff
+        last_error TEXT,
+        priority INTEGER NOT NULL DEFAULT 1,     -- copied from upload_batches.priority
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (document_id, stage),
+        FOREIGN KEY (document_id) REFERENCES documents(document_id)
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_claim ON ingestion_jobs(status, stage, available_at)")
+
+    # Ingestion Runs Table (one row per pipeline run / queue worker session)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ingestion_runs (
+        run_id TEXT PRIMARY KEY,
+        source TEXT NOT NULL,               -- pipeline | worker
+        status TEXT NOT NULL DEFAULT 'running',  -- running | finished
+        started_at REAL NOT NULL,           -- unix time
+        finished_at REAL,
+        config TEXT,                        -- JSON: workers per stage, host, ...
+        stats TEXT                          -- JSON: final per-stage counts
+    )
+    """)
+
+    # Ingestion Stage Events Table (one row per document and stage attempt)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ingestion_stage_events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL,
+        document_id TEXT NOT NULL,
+        stage TEXT NOT NULL,                -- extract | parse | index
+        status TEXT NOT NULL,               -- ok | failed
+        queue_wait_seconds REAL,            -- time between being queued and a worker starting
+        duration_seconds REAL,              -- time spent in the stage itself
+        started_at REAL,
+        finished_at REAL,
+        provider TEXT,                      -- parse only
+        model TEXT,
+        llm_calls INTEGER,
+        input_tokens INTEGER,
+        output_tokens INTEGER,
+        cache_hit INTEGER,
+        error TEXT,
+        FOREIGN KEY (run_id) REFERENCES ingestion_runs(run_id)
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stage_events_run ON ingestion_stage_events(run_id, stage)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stage_events_document ON ingestion_stage_events(document_id)")
+
+    # Watched Files Table (files the watch-folder daemon already uploaded, by path/size/mtime)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS watched_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        batch_id TEXT,
+        ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
     # JD Raw Documents Table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS jd_documents (
@@ -142,8 +241,11 @@ def init_db():
     )
     """)
 
-
     conn.commit()
+
+    # Columns added since a table was first released, and indexes (app/db/migrations.py)
+    for version, name in run_migrations(conn):
+        print(f"Applied migration {version}: {name}")
     conn.close()
 
     print("Database initialized successfully")
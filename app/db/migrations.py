@@ -0,0 +1,395 @@
+# app/db/migrations.py
+"""
+Versioned schema migrations for resumes.db.
+
+init_db() creates any missing tables, then run_migrations() applies every
+migration newer than the versions recorded in `schema_migrations`, in order,
+each in its own transaction. A database created by any earlier version of
+the project (or by the old scripts/migrate_*.py) is brought to the same
+schema. To change the schema, append a migration; never edit a released one.
+
+check_query_plans() runs EXPLAIN QUERY PLAN on the hot-path queries and
+reports any that has fallen back to a full table scan (see scripts/migrate.py --check).
+"""
+
+import sqlite3
+from typing import Callable, Optional
+
+from app.db.resume_facets import backfill_resume_facets, backfill_resume_locations
+from app.db.resume_fts import FTS_COLUMNS, rebuild_resume_fts
+from app.db.resume_skills import backfill_resume_skills
+from app.db.text_store import archive_document_texts, register_text_functions
+
+
+def _ensure_column(conn: sqlite3.Connection, table_name: str, column_name: str, column_type: str) -> None:
+    """Add a column to an existing table if an older database does not have it yet"""
+    existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+    if column_name not in existing_columns:
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+
+
+def _columns_added_after_release(conn: sqlite3.Connection) -> None:
+    # Previously added by scripts/migrate_*.py and ad-hoc ALTERs in init_db
+    _ensure_column(conn, "chat_messages", "candidate_names", "TEXT")
+    _ensure_column(conn, "chat_messages", "conversation_context", "TEXT")
+    _ensure_column(conn, "parsed_resumes", "additional_information", "TEXT")
+    _ensure_column(conn, "upload_batches", "priority", "INTEGER DEFAULT 1")
+    _ensure_column(conn, "documents", "content_hash", "TEXT")
+    _ensure_column(conn, "documents", "duplicate_of", "TEXT")
+    _ensure_column(conn, "documents", "near_duplicate_of", "TEXT")
+    _ensure_column(conn, "documents", "near_duplicate_score", "REAL")
+    _ensure_column(conn, "ingestion_jobs", "priority", "INTEGER NOT NULL DEFAULT 1")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash)")
+
+
+def _hot_path_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_batch ON documents(batch_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parsed_resumes_document ON parsed_resumes(document_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parsed_resumes_indexed_at ON parsed_resumes(indexed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_message_results_message ON message_results(message_id, rank)")
+
+
+def _resume_skills(conn: sqlite3.Connection) -> None:
+    # Normalized skills (app/db/resume_skills.py); the primary key is the covering index
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resume_skills (
+            resume_id TEXT NOT NULL,
+            skill_canonical TEXT NOT NULL,      -- lowercased catalogue name (pre_extractor.canonicalize_skill)
+            skill_raw TEXT NOT NULL,            -- as written in the parsed resume
+            PRIMARY KEY (skill_canonical, resume_id),
+            FOREIGN KEY (resume_id) REFERENCES parsed_resumes(resume_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills(resume_id)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_parsed_resumes_delete_skills
+        AFTER DELETE ON parsed_resumes
+        BEGIN
+            DELETE FROM resume_skills WHERE resume_id = old.resume_id;
+        END
+    """)
+    backfill_resume_skills(conn)
+
+
+def _resume_fts(conn: sqlite3.Connection) -> None:
+    # Full-text index (app/db/resume_fts.py), kept in sync by triggers
+    resume_columns = FTS_COLUMNS[:-1]  # raw_text comes from documents
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+            resume_id UNINDEXED, {", ".join(FTS_COLUMNS)},
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    new_row = f"""
+        INSERT INTO resume_fts (resume_id, {", ".join(FTS_COLUMNS)})
+        VALUES (new.resume_id, {", ".join(f"new.{column}" for column in resume_columns)},
+                (SELECT raw_text FROM documents WHERE document_id = new.document_id));
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resume_fts_insert AFTER INSERT ON parsed_resumes
+        BEGIN {new_row} END
+    """)
+    # Not on indexed_at: the index stage updates every resume once
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resume_fts_update
+        AFTER UPDATE OF resume_id, document_id, {", ".join(resume_columns)} ON parsed_resumes
+        BEGIN
+            DELETE FROM resume_fts WHERE resume_id = old.resume_id;
+            {new_row}
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_resume_fts_delete AFTER DELETE ON parsed_resumes
+        BEGIN
+            DELETE FROM resume_fts WHERE resume_id = old.resume_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_resume_fts_raw_text AFTER UPDATE OF raw_text ON documents
+        WHEN EXISTS (SELECT 1 FROM parsed_resumes WHERE document_id = new.document_id)
+        BEGIN
+            UPDATE resume_fts SET raw_text = new.raw_text
+            WHERE resume_id IN (SELECT resume_id FROM parsed_resumes WHERE document_id = new.document_id);
+        END
+    """)
+    rebuild_resume_fts(conn)
+
+
+def _resume_facets(conn: sqlite3.Connection) -> None:
+    # Normalized employers, education and location (app/db/resume_facets.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resume_employment (
+            resume_id TEXT NOT NULL,
+            company TEXT NOT NULL,              -- as written in the parsed resume
+            company_norm TEXT NOT NULL,         -- lowercased, punctuation and legal suffixes removed
+            role TEXT,
+            start_date TEXT,                    -- 'YYYY-MM'
+            end_date TEXT,                      -- 'YYYY-MM', NULL = current job
+            FOREIGN KEY (resume_id) REFERENCES parsed_resumes(resume_id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resume_education (
+            resume_id TEXT NOT NULL,
+            institute_norm TEXT,                -- abbreviations expanded ("iit" → "indian institute of technology")
+            degree_norm TEXT,                   -- degree code: 'btech', 'msc', 'mba', ...
+            year TEXT,
+            FOREIGN KEY (resume_id) REFERENCES parsed_resumes(resume_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_employment_company ON resume_employment(company_norm, resume_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_employment_start ON resume_employment(start_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_employment_resume ON resume_employment(resume_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_education_institute ON resume_education(institute_norm, resume_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_education_degree ON resume_education(degree_norm, resume_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_education_resume ON resume_education(resume_id)")
+    _ensure_column(conn, "parsed_resumes", "location_norm", "TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parsed_resumes_location ON parsed_resumes(location_norm)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_parsed_resumes_delete_facets
+        AFTER DELETE ON parsed_resumes
+        BEGIN
+            DELETE FROM resume_employment WHERE resume_id = old.resume_id;
+            DELETE FROM resume_education WHERE resume_id = old.resume_id;
+        END
+    """)
+    backfill_resume_facets(conn)
+
+
+def _document_text(conn: sqlite3.Connection) -> None:
+    # Compressed text of indexed documents (app/db/text_store.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS document_text (
+            document_id TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,                -- 'zlib'
+            raw_size INTEGER NOT NULL,          -- characters before compression
+            data BLOB NOT NULL,
+            FOREIGN KEY (document_id) REFERENCES documents(document_id)
+        )
+    """)
+    # Archiving clears documents.raw_text: the index keeps the text it already has
+    conn.execute("DROP TRIGGER IF EXISTS trg_resume_fts_raw_text")
+    conn.execute("""
+        CREATE TRIGGER trg_resume_fts_raw_text AFTER UPDATE OF raw_text ON documents
+        WHEN new.raw_text IS NOT NULL
+         AND EXISTS (SELECT 1 FROM parsed_resumes WHERE document_id = new.document_id)
+        BEGIN
+            UPDATE resume_fts SET raw_text = new.raw_text
+            WHERE resume_id IN (SELECT resume_id FROM parsed_resumes WHERE document_id = new.document_id);
+        END
+    """)
+    # Re-parsed resumes: update in place so an archived document's text stays indexed
+    resume_columns = FTS_COLUMNS[:-1]
+    conn.execute("DROP TRIGGER IF EXISTS trg_resume_fts_update")
+    conn.execute(f"""
+        CREATE TRIGGER trg_resume_fts_update
+        AFTER UPDATE OF resume_id, document_id, {", ".join(resume_columns)} ON parsed_resumes
+        BEGIN
+            UPDATE resume_fts SET
+                resume_id = new.resume_id,
+                {", ".join(f"{column} = new.{column}" for column in resume_columns)},
+                raw_text = COALESCE((SELECT raw_text FROM documents WHERE document_id = new.document_id), raw_text)
+            WHERE resume_id = old.resume_id;
+        END
+    """)
+    indexed = [row[0] for row in conn.execute(
+        "SELECT document_id FROM parsed_resumes WHERE indexed_at IS NOT NULL"
+    )]
+    archive_document_texts(conn, indexed)
+
+
+def _ingestion_job_order(conn: sqlite3.Connection) -> None:
+    # lease() orders by (priority, available_at): available_at is now set when a job is
+    # queued, so older rows get their creation time instead of 0
+    conn.execute("""
+        UPDATE ingestion_jobs SET available_at = CAST(strftime('%s', created_at) AS REAL)
+        WHERE available_at = 0 AND created_at IS NOT NULL
+    """)
+
+
+def _resume_skill_variants(conn: sqlite3.Connection) -> None:
+    # Skill rows now include merged aliases and the parts of longer entries
+    backfill_resume_skills(conn)
+
+
+def _resume_location(conn: sqlite3.Connection) -> None:
+    # Location tokens (app/db/resume_facets.py): "Whitefield, Bengaluru" is found by "Bangalore"
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resume_location (
+            token TEXT NOT NULL,                -- normalized comma-separated part, or the whole location
+            resume_id TEXT NOT NULL,
+            PRIMARY KEY (token, resume_id),
+            FOREIGN KEY (resume_id) REFERENCES parsed_resumes(resume_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_location_resume ON resume_location(resume_id)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_parsed_resumes_delete_location
+        AFTER DELETE ON parsed_resumes
+        BEGIN
+            DELETE FROM resume_location WHERE resume_id = old.resume_id;
+        END
+    """)
+    backfill_resume_locations(conn)
+
+
+def _employment_current_marker(conn: sqlite3.Connection) -> None:
+    # resume_employment.end_date: 'present' for a current job, NULL only for an unknown date
+    backfill_resume_facets(conn)
+
+
+def _ingestion_job_lease_index(conn: sqlite3.Connection) -> None:
+    # lease() reads pending jobs in (priority, available_at) order straight off this index
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_lease
+        ON ingestion_jobs(status, priority, available_at)
+    """)
+
+
+def _unique_original_upload(conn: sqlite3.Connection) -> None:
+    # Two concurrent uploads of the same file could both become originals. Keep the
+    # oldest one, link the others to it, then let the index make it impossible again.
+    conn.execute("""
+        UPDATE documents
+        SET duplicate_of = (
+                SELECT o.document_id FROM documents o
+                WHERE o.content_hash = documents.content_hash AND o.duplicate_of IS NULL
+                ORDER BY o.created_at, o.document_id
+                LIMIT 1
+            ),
+            status = CASE WHEN status = 'uploaded' AND raw_text IS NULL THEN 'duplicate' ELSE status END
+        WHERE content_hash IS NOT NULL AND duplicate_of IS NULL
+          AND document_id != (
+                SELECT o.document_id FROM documents o
+                WHERE o.content_hash = documents.content_hash AND o.duplicate_of IS NULL
+                ORDER BY o.created_at, o.document_id
+                LIMIT 1
+            )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_original_hash
+        ON documents(content_hash) WHERE duplicate_of IS NULL
+    """)
+
+
+# (version, name, apply); apply(conn) runs inside the migration's transaction
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "columns_added_after_release", _columns_added_after_release),
+    (2, "hot_path_indexes", _hot_path_indexes),
+    (3, "resume_skills", _resume_skills),
+    (4, "resume_fts", _resume_fts),
+    (5, "resume_facets", _resume_facets),
+    (6, "document_text", _document_text),
+    (7, "ingestion_job_order", _ingestion_job_order),
+    (8, "ingestion_job_lease_index", _ingestion_job_lease_index),
+    (9, "resume_skill_variants", _resume_skill_variants),
+    (10, "resume_location", _resume_location),
+    (11, "employment_current_marker", _employment_current_marker),
+    (12, "unique_original_upload", _unique_original_upload),
+]
+
+
+def applied_versions(conn: sqlite3.Connection) -> dict[int, str]:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return {version: applied_at for version, applied_at in conn.execute("SELECT version, applied_at FROM schema_migrations")}
+
+
+def run_migrations(conn: sqlite3.Connection) -> list[tuple[int, str]]:
+    """Apply pending migrations in version order; returns [(version, name), ...] applied"""
+    conn.commit()
+    done = applied_versions(conn)
+    conn.commit()
+    applied = []
+    for version, name, apply in MIGRATIONS:
+        if version in done:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            apply(conn)
+            conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((version, name))
+    return applied
+
+
+# ─── Query plan check ───────────────────────────────────────────
+
+def hot_path_queries() -> list[tuple[str, str, tuple]]:
+    """
+    (name, sql, sample params) for the queries ingestion, search and chat run
+    all the time, built by the same constants and builders the code runs them with
+    """
+    # Imported here: these modules import init_db, which imports this one
+    from app.chat.chat_manager import CHAT_HISTORY_SQL, MESSAGE_RESULTS_SQL
+    from app.db.resume_facets import education_filter_sql, employment_filter_sql, location_filter_sql
+    from app.db.resume_fts import fts_column_filter, text_match_sql
+    from app.db.resume_skills import skill_filter_sql
+    from app.db.text_store import document_texts_sql
+    from app.ingestion.extractor import BATCH_DOCUMENTS_SQL
+    from app.pipeline.ingestion_pipeline import BACKLOG_KEYS_SQL, backlog_rows_sql
+    from app.pipeline.job_queue import runnable_jobs_sql, starving_jobs_sql
+    from app.pipeline.stages import RESUME_BY_DOCUMENT_SQL, STAGES
+
+    queries = [(f"{stage} backlog", sql, ()) for stage, sql in BACKLOG_KEYS_SQL.items()]
+    queries += [(f"{stage} backlog rows", backlog_rows_sql(stage, 2), ("a", "b")) for stage in BACKLOG_KEYS_SQL]
+    queries += [
+        ("batch documents", BATCH_DOCUMENTS_SQL, ("batch",)),
+        ("resume by document", RESUME_BY_DOCUMENT_SQL, ("doc",)),
+        ("answer texts", document_texts_sql(2), ("a", "b")),
+        ("job lease (pending)", runnable_jobs_sql("pending", len(STAGES)), (0, *STAGES, 1)),
+        ("job lease (expired)", runnable_jobs_sql("leased", len(STAGES)), (0, *STAGES, 1)),
+        ("job lease (starving)", starving_jobs_sql(len(STAGES)), (2, 0, *STAGES, 1)),
+        ("chat history", CHAT_HISTORY_SQL, ("session", 10)),
+        ("message results", MESSAGE_RESULTS_SQL, ("msg",)),
+    ]
+
+    # Search filters, composed the way the agent composes them
+    filters = [
+        ("skill filter", skill_filter_sql([["Python", "Go"], ["AWS"]], match_all=True)),
+        ("company and tenure filter", employment_filter_sql("Google", "2019")),
+        ("institute and degree filter", education_filter_sql("IIT Delhi", "B.Tech")),
+        ("degree text filter", education_filter_sql(degree="Computer Science")),
+        ("location filter", location_filter_sql("Koramangala, Bangalore")),
+    ]
+    for name, (clause, params) in filters:
+        sql, params = text_match_sql([], [clause], params)
+        queries.append((name, sql, tuple(params)))
+    title_match = fts_column_filter(["work_experience", "current_role"], ["data engineer"])
+    sql, params = text_match_sql([title_match], [], [])
+    queries.append(("text filter", sql, tuple(params)))
+    skill_clause, skill_params = filters[0][1]
+    sql, params = text_match_sql([title_match], [skill_clause], skill_params)
+    queries.append(("text and skill filter", sql, tuple(params)))
+    return queries
+
+
+def _is_full_scan(detail: str) -> bool:
+    # "SCAN documents" / "SCAN TABLE documents AS d" (older SQLite); index scans name the index
+    return detail.startswith("SCAN") and "INDEX" not in detail and "CONSTANT ROW" not in detail
+
+
+def check_query_plans(conn: sqlite3.Connection, queries: Optional[list] = None) -> list[dict]:
+    """
+    EXPLAIN QUERY PLAN for every hot-path query (default: hot_path_queries()).
+    Returns one entry per query that full-scans a table: {"query", "plan", "scans"};
+    an empty list means all use indexes.
+    """
+    register_text_functions(conn)  # the queries that read archived text call inflate_text()
+    regressions = []
+    for name, sql, params in queries if queries is not None else hot_path_queries():
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        scans = [detail for detail in plan if _is_full_scan(detail)]
+        if scans:
+            regressions.append({"query": name, "plan": plan, "scans": scans})
+    return regressions
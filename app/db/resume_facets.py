@@ -0,0 +1,301 @@
+# app/db/resume_facets.py
+"""
+Normalized employers, institutes, degrees and locations for indexed filters.
+
+Company, institute, degree and location filters used to search JSON blobs
+and expand abbreviations ("IIT" → "Indian Institute of Technology") on every
+query. The values are now normalized once, at parse time, into:
+
+    resume_employment(resume_id, company, company_norm, role, start_date, end_date)
+    resume_education(resume_id, institute_norm, degree_norm, year)
+    resume_location(token, resume_id)
+    parsed_resumes.location_norm
+
+Normalization lowercases the value, drops punctuation and legal suffixes,
+expands institute abbreviations, maps degree spellings to one code and
+merges city aliases:
+
+    "Google India Pvt. Ltd."  → company_norm   'google india'
+    "IIT-Delhi"               → institute_norm 'indian institute of technology delhi'
+    "B. Tech in CSE"          → degree_norm    'btech'
+    "Bengaluru, Karnataka"    → location_norm  'bangalore karnataka'
+
+start_date/end_date are 'YYYY-MM', so tenure windows compare as strings. A
+current job ends 'present' (CURRENT_MONTH), which sorts after every month;
+NULL is a date that was missing or could not be read, so it never counts as
+current. A query value is normalized the same way and
+matched as a whole-word prefix ("google" finds 'google india', not
+'googleplex'), which is an index range scan.
+
+Locations are often written neighbourhood first ("Whitefield, Bengaluru",
+"Sector 62, Noida"), so resume_location holds one token per comma-separated
+part ('whitefield', 'bangalore') plus the whole value. A location filter
+needs a matching token for every part of the queried place.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+from app.db.resume_fts import fts_phrase
+from app.utils.experience_calculator import parse_date_flexible
+
+_NON_WORD = re.compile(r"[^\w&+#]+")
+_COMPANY_SUFFIXES = {
+    "pvt", "private", "ltd", "limited", "inc", "incorporated", "llc", "llp", "corp",
+    "corporation", "co", "gmbh", "plc", "pte",
+}
+INSTITUTE_ALIASES = {
+    "iit": "indian institute of technology",
+    "nit": "national institute of technology",
+    "bits": "birla institute of technology and science",
+    "iiit": "indian institute of information technology",
+    "iim": "indian institute of management",
+    "isi": "indian statistical institute",
+    "aiims": "all india institute of medical sciences",
+}
+# Full forms first (longest match wins), then the short codes themselves
+DEGREE_ALIASES = {
+    "bachelor of technology": "btech", "master of technology": "mtech",
+    "bachelor of engineering": "be", "master of engineering": "me",
+    "bachelor of science": "bsc", "master of science": "msc",
+    "bachelor of computer applications": "bca", "master of computer applications": "mca",
+    "master of business administration": "mba", "bachelor of business administration": "bba",
+    "bachelor of commerce": "bcom", "master of commerce": "mcom",
+    "bachelor of arts": "ba", "master of arts": "ma",
+    "doctor of philosophy": "phd", "post graduate diploma": "pgdm",
+}
+DEGREE_CODES = {"btech", "mtech", "bsc", "msc", "bca", "mca", "mba", "bba", "bcom", "mcom",
+                "pgdm", "phd", "be", "me", "ms", "bs", "ba", "ma", "diploma"}
+CITY_ALIASES = {
+    "bengaluru": "bangalore", "bombay": "mumbai", "gurugram": "gurgaon", "new delhi": "delhi",
+    "calcutta": "kolkata", "madras": "chennai", "poona": "pune", "trivandrum": "thiruvananthapuram",
+}
+_LOCATION_PARTS = re.compile(r"[,;|/]|\s[-–]\s")
+_YEAR = re.compile(r"(19|20)\d{2}")
+_CURRENT = {"present", "current", "now", "till date", "ongoing", "today"}
+CURRENT_MONTH = "present"  # end_date of a current job; compares greater than any 'YYYY-MM'
+
+
+def _words(value) -> list[str]:
+    return _NON_WORD.sub(" ", str(value or "").lower().replace(".", "")).split()
+
+
+def normalize_company(name) -> str:
+    words = _words(name)
+    while len(words) > 1 and words[-1] in _COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_institute(name) -> str:
+    words = _words(name)
+    if words and words[0] in INSTITUTE_ALIASES:
+        words = INSTITUTE_ALIASES[words[0]].split() + words[1:]
+    return " ".join(words)
+
+
+def normalize_degree(degree) -> str:
+    text = " ".join(_words(degree))
+    for full_form in sorted(DEGREE_ALIASES, key=len, reverse=True):
+        if text.startswith(full_form):
+            return DEGREE_ALIASES[full_form]
+    # "b tech in cse" / "m sc physics" → the code spelled by the first one to three words
+    words = text.split()
+    for length in range(1, min(len(words), 3) + 1):
+        if "".join(words[:length]) in DEGREE_CODES:
+            return "".join(words[:length])
+    return text
+
+
+def normalize_location(location) -> str:
+    text = " ".join(_words(location))
+    for alias in sorted(CITY_ALIASES, key=len, reverse=True):
+        text = re.sub(rf"\b{alias}\b", CITY_ALIASES[alias], text)
+    return text
+
+
+def location_tokens(location) -> list[str]:
+    """Normalized comma-separated parts of a location, then the whole value"""
+    tokens = [normalize_location(part) for part in _LOCATION_PARTS.split(str(location or ""))]
+    tokens.append(normalize_location(location))
+    return list(dict.fromkeys(token for token in tokens if token))
+
+
+def normalize_month(date_str, end: bool = False) -> Optional[str]:
+    """
+    'Jan 2020' → '2020-01'; a bare year is its first month, or its last with end=True.
+    CURRENT_MONTH for 'Present' and the like; None for missing or unparseable.
+    """
+    date_str = str(date_str or "").strip()
+    if not date_str:
+        return None
+    if date_str.lower() in _CURRENT:
+        return CURRENT_MONTH
+    if _YEAR.fullmatch(date_str):
+        return f"{date_str}-12" if end else f"{date_str}-01"
+    parsed = parse_date_flexible(date_str)
+    return parsed.strftime("%Y-%m") if parsed else None
+
+
+# ─── Rows ───────────────────────────────────────────────────────
+
+def _field(entry, name):
+    return getattr(entry, name, None) if not isinstance(entry, dict) else entry.get(name)
+
+
+def employment_rows(resume_id: str, work_experience: list) -> list[tuple]:
+    rows = []
+    for job in work_experience or []:
+        company = " ".join(str(_field(job, "company") or "").split())
+        if not normalize_company(company):
+            continue
+        rows.append((resume_id, company, normalize_company(company), _field(job, "role"),
+                     normalize_month(_field(job, "start_date")), normalize_month(_field(job, "end_date"), end=True)))
+    return rows
+
+
+def education_rows(resume_id: str, education: list) -> list[tuple]:
+    rows = []
+    for entry in education or []:
+        institute_norm = normalize_institute(_field(entry, "institute"))
+        degree_norm = normalize_degree(_field(entry, "degree"))
+        if institute_norm or degree_norm:
+            rows.append((resume_id, institute_norm or None, degree_norm or None, _field(entry, "year")))
+    return rows
+
+
+def write_resume_facets(conn: sqlite3.Connection, resumes: dict[str, tuple[list, list]]) -> None:
+    """
+    Replace employment/education rows for {resume_id: (work_experience, education)}
+    (run inside the caller's transaction)
+    """
+    ids = [(resume_id,) for resume_id in resumes]
+    conn.executemany("DELETE FROM resume_employment WHERE resume_id = ?", ids)
+    conn.executemany("DELETE FROM resume_education WHERE resume_id = ?", ids)
+    conn.executemany("""
+        INSERT INTO resume_employment (resume_id, company, company_norm, role, start_date, end_date)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [row for resume_id, (jobs, _) in resumes.items() for row in employment_rows(resume_id, jobs)])
+    conn.executemany("""
+        INSERT INTO resume_education (resume_id, institute_norm, degree_norm, year)
+        VALUES (?, ?, ?, ?)
+    """, [row for resume_id, (_, education) in resumes.items() for row in education_rows(resume_id, education)])
+
+
+def write_resume_locations(conn: sqlite3.Connection, locations: dict[str, Optional[str]]) -> None:
+    """Replace the location tokens for {resume_id: location} (run inside the caller's transaction)"""
+    conn.executemany("DELETE FROM resume_location WHERE resume_id = ?", [(resume_id,) for resume_id in locations])
+    conn.executemany(
+        "INSERT OR IGNORE INTO resume_location (token, resume_id) VALUES (?, ?)",
+        [(token, resume_id) for resume_id, location in locations.items() for token in location_tokens(location)],
+    )
+
+
+def backfill_resume_locations(conn: sqlite3.Connection) -> int:
+    """Build location tokens for every parsed resume; returns resumes processed"""
+    locations = dict(conn.execute("SELECT resume_id, location FROM parsed_resumes").fetchall())
+    write_resume_locations(conn, locations)
+    return len(locations)
+
+
+def backfill_resume_facets(conn: sqlite3.Connection) -> int:
+    """Build facet rows and location_norm for every parsed resume; returns resumes processed"""
+    resumes, locations = {}, []
+    for resume_id, work_json, education_json, location in conn.execute(
+        "SELECT resume_id, work_experience, education, location FROM parsed_resumes"
+    ):
+        entries = []
+        for value in (work_json, education_json):
+            try:
+                parsed = json.loads(value) if value else []
+            except (TypeError, ValueError):
+                parsed = []
+            entries.append([entry for entry in parsed if isinstance(entry, dict)] if isinstance(parsed, list) else [])
+        resumes[resume_id] = tuple(entries)
+        locations.append((normalize_location(location) or None, resume_id))
+    write_resume_facets(conn, resumes)
+    conn.executemany("UPDATE parsed_resumes SET location_norm = ? WHERE resume_id = ?", locations)
+    return len(resumes)
+
+
+# ─── Filters ────────────────────────────────────────────────────
+
+def prefix_match_sql(column: str, value: str) -> tuple[str, list[str]]:
+    """Whole-word prefix match on a normalized column, as an index range"""
+    return f"({column} = ? OR ({column} >= ? AND {column} < ?))", [value, value + " ", value + "!"]
+
+
+def _query_month(month: Optional[str]) -> Optional[str]:
+    """A 'present' bound in a query is this month"""
+    return datetime.now().strftime("%Y-%m") if month == CURRENT_MONTH else month
+
+
+def employment_filter_sql(company: Optional[str] = None, employed_from: Optional[str] = None,
+                          employed_to: Optional[str] = None, column: str = "resume_id") -> tuple[str, list]:
+    """
+    Resumes with a job at company (if given) overlapping the window [employed_from, employed_to]
+    (any date normalize_month accepts; either end may be open).
+    """
+    conditions, params = [], []
+    company_norm = normalize_company(company) if company else ""
+    if company_norm:
+        clause, clause_params = prefix_match_sql("company_norm", company_norm)
+        conditions.append(clause)
+        params.extend(clause_params)
+    # A job with an unknown end date (NULL) does not overlap any window
+    employed_from = _query_month(normalize_month(employed_from))
+    if employed_from:
+        conditions.append("end_date >= ?")
+        params.append(employed_from)
+    employed_to = _query_month(normalize_month(employed_to, end=True))
+    if employed_to:
+        conditions.append("start_date <= ?")
+        params.append(employed_to)
+    if not conditions:
+        return "", []
+    return f"{column} IN (SELECT resume_id FROM resume_employment WHERE {' AND '.join(conditions)})", params
+
+
+def education_filter_sql(institute: Optional[str] = None, degree: Optional[str] = None,
+                         column: str = "resume_id") -> tuple[str, list]:
+    """
+    Resumes with one education entry matching the institute and/or degree.
+    A degree that maps to a known code ("B.Tech" → 'btech') is an index lookup;
+    free text ("Computer Science", "bachelor") is a word-prefix match on the
+    education column of resume_fts instead.
+    """
+    conditions, params = [], []
+    institute_norm = normalize_institute(institute) if institute else ""
+    if institute_norm:
+        clause, clause_params = prefix_match_sql("institute_norm", institute_norm)
+        conditions.append(clause)
+        params.extend(clause_params)
+    degree_norm = normalize_degree(degree) if degree else ""
+    if degree_norm in DEGREE_CODES:
+        conditions.append("degree_norm = ?")
+        params.append(degree_norm)
+    clauses = []
+    if conditions:
+        clauses.append(f"{column} IN (SELECT resume_id FROM resume_education WHERE {' AND '.join(conditions)})")
+    if degree_norm and degree_norm not in DEGREE_CODES:
+        clauses.append(f"{column} IN (SELECT resume_id FROM resume_fts WHERE resume_fts MATCH ?)")
+        params.append("education : " + fts_phrase(degree) + " *")
+    return " AND ".join(clauses), params
+
+
+def location_filter_sql(location: str, column: str = "resume_id") -> tuple[str, list]:
+    """
+    Resumes with a location token starting with each part of the queried place
+    ("Whitefield, Bangalore" needs both 'whitefield' and 'bangalore'): one index
+    range per part, all required.
+    """
+    parts = [normalize_location(part) for part in _LOCATION_PARTS.split(str(location or ""))]
+    clauses, params = [], []
+    for token in dict.fromkeys(part for part in parts if part):
+        clause, clause_params = prefix_match_sql("token", token)
+        clauses.append(f"{column} IN (SELECT resume_id FROM resume_location WHERE {clause})")
+        params.extend(clause_params)
+    return " AND ".join(clauses), params
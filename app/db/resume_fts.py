@@ -0,0 +1,78 @@
+# app/db/resume_fts.py
+"""
+Full-text index over resumes (SQLite FTS5).
+
+`resume_fts` holds one row per parsed resume with the text columns below, plus
+the document's raw_text. Triggers on parsed_resumes and documents keep it in
+sync (see migrations 4 and 6), so nothing else has to write to it.
+
+Job title, role and project filters used to be unanchored LIKEs over JSON
+columns. Those are full scans, and '%Data%' also matches "Database". They are
+now FTS5 column filters (company, institute and degree filters use the tables
+in resume_facets.py). The match is by whole token, and results are ordered
+by BM25:
+
+    WITH text_match AS (SELECT resume_id, bm25(resume_fts) AS score
+                        FROM resume_fts WHERE resume_fts MATCH ?)
+    SELECT resume_id FROM parsed_resumes JOIN text_match USING (resume_id)
+    WHERE ... ORDER BY text_match.score
+
+    match: {work_experience current_role} : ("Data Scientist") AND projects : ("chatbot")
+"""
+
+import sqlite3
+
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+
+FTS_COLUMNS = [
+    "candidate_name", "current_role", "work_experience", "education",
+    "projects", "additional_information", "raw_text",
+]
+
+TEXT_MATCH_CTE = (
+    "WITH text_match AS ("
+    "SELECT resume_id, bm25(resume_fts) AS score FROM resume_fts WHERE resume_fts MATCH ?"
+    ") "
+)
+
+
+def fts_phrase(text: str) -> str:
+    """Quote text as one FTS5 phrase (tokens in order, punctuation ignored)"""
+    return '"' + " ".join(str(text).split()).replace('"', '""') + '"'
+
+
+def fts_column_filter(columns: list[str], alternatives: list[str]) -> str:
+    """MATCH expression: any of the alternatives as a phrase, in any of the columns"""
+    phrases = [fts_phrase(alternative) for alternative in alternatives if str(alternative).strip()]
+    if not phrases:
+        return ""
+    return "{" + " ".join(columns) + "} : (" + " OR ".join(phrases) + ")"
+
+
+def text_match_sql(match_terms: list[str], where_clauses: list[str], params: list) -> tuple[str, list]:
+    """
+    resume_id query for parsed_resumes filters plus FTS terms (all required),
+    best BM25 match first. Without terms, the plain filter query.
+    """
+    match_terms = [term for term in match_terms if term]
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    if not match_terms:
+        return f"SELECT resume_id FROM parsed_resumes{where_sql}", list(params)
+    sql = (f"{TEXT_MATCH_CTE}SELECT resume_id FROM parsed_resumes JOIN text_match USING (resume_id)"
+           f"{where_sql} ORDER BY text_match.score")
+    return sql, [" AND ".join(f"({term})" for term in match_terms), *params]
+
+
+def rebuild_resume_fts(conn: sqlite3.Connection) -> int:
+    """Re-fill the index from parsed_resumes + documents (and archived texts); returns rows indexed"""
+    conn.execute("DELETE FROM resume_fts")
+    archived = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'document_text'").fetchone()
+    register_text_functions(conn)
+    return conn.execute(f"""
+        INSERT INTO resume_fts (resume_id, {", ".join(FTS_COLUMNS)})
+        SELECT pr.resume_id, {", ".join(f"pr.{column}" for column in FTS_COLUMNS[:-1])},
+               {RAW_TEXT_SQL if archived else "d.raw_text"}
+        FROM parsed_resumes pr
+        LEFT JOIN documents d ON pr.document_id = d.document_id
+        {RAW_TEXT_JOIN if archived else ""}
+    """).rowcount
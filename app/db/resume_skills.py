@@ -0,0 +1,107 @@
+# app/db/resume_skills.py
+"""
+Normalized skills: one `resume_skills` row per (resume, canonical skill).
+
+parsed_resumes.skills is a JSON list, and filtering it with LIKE '%java%'
+scans every resume and also matches "JavaScript". Skills are stored again
+here at parse time under a canonical key. The key is the catalogue name from
+pre_extractor.canonicalize_skill, lowercased, so "js" and "JavaScript" share a key.
+Aliases outside the catalogue are merged too ("ML" → 'machine learning',
+"Node" → 'node.js'). A longer entry also gets rows for its parts: the
+entry without parentheses and its leading phrase ("Machine Learning (CNN,
+RNN)" → 'machine learning'), each item inside the parentheses ('cnn',
+'rnn'), and catalogued skills mentioned anywhere in it ("Python 3.x" → 'python').
+
+The table is keyed (skill_canonical, resume_id) WITHOUT ROWID, so the primary
+key is a covering index. A skill filter is an index range per skill:
+
+    any of Python / Go:   resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical IN (?, ?))
+    Python and Go:        resume_id IN (... = ?) AND resume_id IN (... = ?)
+"""
+
+import json
+import re
+import sqlite3
+from typing import Iterable
+
+from app.parsing.pre_extractor import canonicalize_skill, find_skills
+
+
+_PARENTHESIZED = re.compile(r"[(\[]([^)\]]*)[)\]]")
+_PHRASE_END = re.compile(r"\s*(?::|;|,|\s[-–—]\s)\s*")
+
+
+def skill_key(skill: str) -> str:
+    """Lookup key for a skill as written in a resume or a query"""
+    return canonicalize_skill(skill)[1].lower()
+
+
+def skill_variants(raw: str) -> list[str]:
+    """The entry itself, without parentheses, its leading phrase and each parenthesized item"""
+    stripped = " ".join(_PARENTHESIZED.sub(" ", raw).split())
+    variants = [raw, stripped, _PHRASE_END.split(stripped, maxsplit=1)[0]]
+    for inner in _PARENTHESIZED.findall(raw):
+        variants += _PHRASE_END.split(inner)
+    return variants
+
+
+def resume_skill_rows(resume_id: str, skills: Iterable[str]) -> list[tuple[str, str, str]]:
+    """(resume_id, skill_canonical, skill_raw) rows for one resume, one per key"""
+    rows, seen = [], set()
+    for raw in skills:
+        raw = " ".join((raw or "").split())
+        if not raw:
+            continue
+        keys = [skill_key(variant) for variant in skill_variants(raw)]
+        keys += [canonical.lower() for found in find_skills(raw).values() for canonical in found]
+        for key in keys:
+            if key and key not in seen:
+                seen.add(key)
+                rows.append((resume_id, key, raw))
+    return rows
+
+
+def write_resume_skills(conn: sqlite3.Connection, rows_by_resume: dict[str, list[tuple]]) -> None:
+    """Replace the skill rows of these resumes (run inside the caller's transaction)"""
+    conn.executemany("DELETE FROM resume_skills WHERE resume_id = ?", [(resume_id,) for resume_id in rows_by_resume])
+    conn.executemany(
+        "INSERT OR IGNORE INTO resume_skills (resume_id, skill_canonical, skill_raw) VALUES (?, ?, ?)",
+        [row for rows in rows_by_resume.values() for row in rows],
+    )
+
+
+def backfill_resume_skills(conn: sqlite3.Connection) -> int:
+    """Build rows for every parsed resume from its skills JSON; returns resumes processed"""
+    rows_by_resume = {}
+    for resume_id, skills_json in conn.execute("SELECT resume_id, skills FROM parsed_resumes"):
+        try:
+            skills = json.loads(skills_json) if skills_json else []
+        except (TypeError, ValueError):
+            skills = []
+        if isinstance(skills, list):
+            rows_by_resume[resume_id] = resume_skill_rows(resume_id, [str(skill) for skill in skills])
+    write_resume_skills(conn, rows_by_resume)
+    return len(rows_by_resume)
+
+
+def skill_filter_sql(skill_groups: list[list[str]], match_all: bool, column: str = "resume_id") -> tuple[str, list[str]]:
+    """
+    WHERE fragment for skill filters. Each group is one requested skill and its
+    accepted variations ("k8s" → ["K8s", "Kubernetes"]). match_all requires
+    every group (intersection), otherwise any group will do (union).
+    """
+    groups = [sorted({skill_key(skill) for skill in group} - {""}) for group in skill_groups]
+    groups = [group for group in groups if group]
+    if not groups:
+        return "", []
+    if not match_all:
+        groups = [sorted({key for group in groups for key in group})]
+
+    clauses, params = [], []
+    for keys in groups:
+        placeholders = ",".join("?" * len(keys))
+        clauses.append(
+            f"{column} IN (SELECT resume_id FROM resume_skills WHERE skill_canonical IN ({placeholders}))"
+        )
+        params.extend(keys)
+    return "(" + " AND ".join(clauses) + ")", params
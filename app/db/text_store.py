@@ -0,0 +1,117 @@
+# app/db/text_store.py
+"""
+Compressed, out-of-row storage for extracted resume text.
+
+documents.raw_text is the working copy while a document moves through the
+pipeline (extract → parse → index). Once a document is indexed nothing on a
+hot path needs the full text again, except the answer step for one or two
+candidates. So the index stage archives it. The text is zlib-compressed into
+`document_text` and the column is cleared:
+
+    document_text(document_id, codec, raw_size, data)
+
+Result rows stop carrying the text: the agent nodes select the parsed fields
+only, and generate_answer loads the texts it will actually show with
+load_raw_texts(). Scans and joins over documents no longer drag whole resume
+texts through the page cache, and the archived copy is half the size or less
+(plain text resumes typically compress 2-3x).
+
+SQL that needs the text of any document (re-indexing, FTS rebuild) reads
+
+    COALESCE(d.raw_text, inflate_text(dt.codec, dt.data))   -- RAW_TEXT_SQL
+    ... LEFT JOIN document_text dt ON dt.document_id = d.document_id   -- RAW_TEXT_JOIN
+
+on a connection passed through register_text_functions().
+"""
+
+import os
+import sqlite3
+import zlib
+from typing import Iterable, Optional
+
+TEXT_CODEC = "zlib"
+COMPRESSION_LEVEL = int(os.getenv("TEXT_COMPRESSION_LEVEL", "6"))
+
+RAW_TEXT_SQL = "COALESCE(d.raw_text, inflate_text(dt.codec, dt.data))"
+RAW_TEXT_JOIN = "LEFT JOIN document_text dt ON dt.document_id = d.document_id"
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def inflate_text(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """Archived text back to str (None stays None)"""
+    if data is None:
+        return None
+    if codec != TEXT_CODEC:
+        raise ValueError(f"Unknown text codec: {codec}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def register_text_functions(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Make inflate_text(codec, data) available to SQL on this connection"""
+    conn.create_function("inflate_text", 2, inflate_text, deterministic=True)
+    return conn
+
+
+def archive_document_texts(conn: sqlite3.Connection, document_ids: Iterable[str]) -> int:
+    """
+    Move raw_text of these documents into document_text, compressed, and clear
+    the column (run inside the caller's transaction). Returns documents archived.
+    """
+    document_ids = list(document_ids)
+    rows = []
+    for start in range(0, len(document_ids), 500):
+        chunk = document_ids[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows += conn.execute(f"""
+            SELECT document_id, raw_text FROM documents
+            WHERE document_id IN ({placeholders}) AND raw_text IS NOT NULL
+        """, chunk).fetchall()
+    conn.executemany("""
+        INSERT OR REPLACE INTO document_text (document_id, codec, raw_size, data)
+        VALUES (?, ?, ?, ?)
+    """, [(document_id, TEXT_CODEC, len(text), compress_text(text)) for document_id, text in rows])
+    conn.executemany(
+        "UPDATE documents SET raw_text = NULL WHERE document_id = ?",
+        [(document_id,) for document_id, _ in rows]
+    )
+    return len(rows)
+
+
+def document_texts_sql(count: int) -> str:
+    """Stored text columns (inline or archived) of `count` documents"""
+    placeholders = ",".join("?" * count)
+    return f"""
+        SELECT d.document_id, d.raw_text, dt.codec, dt.data
+        FROM documents d
+        {RAW_TEXT_JOIN}
+        WHERE d.document_id IN ({placeholders})
+    """
+
+
+def load_document_texts(cursor: sqlite3.Cursor, document_ids: list[str]) -> dict[str, str]:
+    """{document_id: text} from documents.raw_text or the archive; missing texts are left out"""
+    texts = {}
+    for start in range(0, len(document_ids), 500):
+        chunk = document_ids[start:start + 500]
+        cursor.execute(document_texts_sql(len(chunk)), chunk)
+        for document_id, raw_text, codec, data in cursor.fetchall():
+            text = raw_text if raw_text is not None else inflate_text(codec, data)
+            if text is not None:
+                texts[document_id] = text
+    return texts
+
+
+def load_raw_texts(cursor: sqlite3.Cursor, resumes: list[dict]) -> None:
+    """
+    Fill in raw_text for result dicts that do not carry it yet (those with a
+    raw_text key, even None, are left alone)
+    """
+    pending = [resume for resume in resumes if "raw_text" not in resume and resume.get("document_id")]
+    if not pending:
+        return
+    texts = load_document_texts(cursor, list(dict.fromkeys(resume["document_id"] for resume in pending)))
+    for resume in pending:
+        resume["raw_text"] = texts.get(resume["document_id"])
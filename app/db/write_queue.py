@@ -0,0 +1,208 @@
+# app/db/write_queue.py
+"""
+Single-writer queue for resumes.db (and any other SQLite file).
+
+Ingestion stages, the chat manager, the run ledger and the JD indexer all
+write to the same database. With one connection per write, they fight over
+the write lock and "database is locked" errors show up as soon as chat and
+ingestion run together. Instead, every write in a process goes through one
+writer thread per database file (the job queue, uploads, the watcher and the
+pipeline stages included). The only exceptions are the LLM rate limiter and
+the parse cache: each keeps its own database file, which nothing else writes,
+and updates it in short transactions of its own.
+
+- Callers submit a write (a function of the connection, or SQL + params) and
+  get a concurrent.futures.Future back. Waiting on it is optional.
+- The writer takes whatever is queued (up to WRITE_BATCH_MAX requests) and
+  applies it in ONE transaction. Under load many small writes share a
+  commit; when idle a lone write is committed immediately.
+- Each request runs in its own SAVEPOINT, so a failing request only fails its
+  own future and the rest of the group still commits.
+- The connection uses WAL (readers never block the writer or each other) and
+  a busy timeout, so writers in other processes wait instead of erroring.
+  Foreign keys are enforced on it (chat_messages → chat_sessions, ...).
+- If the writer cannot open the database, every queued future fails with the
+  error and later submits raise it; get_write_queue() then starts a new writer.
+
+Usage:
+    queue = get_write_queue()
+    future = queue.execute("UPDATE documents SET status = ? WHERE document_id = ?", ("parsed", doc_id))
+    future.result()                          # rowcount, once committed
+
+    def save(conn):                          # several statements, one atomic unit
+        conn.execute(...)
+        return conn.execute(...).rowcount
+    queue.submit(save).result()
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from app.db.connection import RESUMES_DB_PATH as DB_PATH, configure_connection
+
+WRITE_BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "100"))   # requests per transaction
+
+_STOP = object()
+
+
+class WriteQueue:
+    """One writer thread applying queued writes in grouped transactions"""
+
+    def __init__(self, db_path: str = DB_PATH, max_batch: int = WRITE_BATCH_MAX):
+        self.db_path = db_path
+        self.max_batch = max(1, max_batch)
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"sqlite-writer:{os.path.basename(db_path)}", daemon=True)
+        self._closed = False
+        self._error = None  # why the writer thread could not start
+        self._state_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._thread.start()
+
+    # ─── Producers ──────────────────────────────────────────────
+
+    def submit(self, work: Callable[[sqlite3.Connection], object]) -> Future:
+        """
+        Run work(conn) inside the writer's transaction; the future gets its
+        return value. work must not commit or roll back itself.
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Nested submit from inside a write: already in the transaction
+            future.set_result(work(self._conn))
+            return future
+        with self._state_lock:
+            if self._error is not None:
+                raise RuntimeError(f"Write queue for {self.db_path} failed to start: {self._error}") from self._error
+            if self._closed:
+                raise RuntimeError(f"Write queue for {self.db_path} is closed")
+            self._requests.put((work, future))
+        return future
+
+    def execute(self, sql: str, params=()) -> Future:
+        """Queue one statement; the future gets the cursor's rowcount"""
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def executemany(self, sql: str, seq_of_params) -> Future:
+        rows = list(seq_of_params)
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed"""
+        self.submit(lambda conn: None).result()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(_STOP)
+        self._thread.join()
+
+    # ─── Writer thread ──────────────────────────────────────────
+
+    def _run(self) -> None:
+        try:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = configure_connection(sqlite3.connect(self.db_path, isolation_level=None))
+            # Per-connection setting, off by default: every write goes through here, so FKs are enforced for all of them
+            self._conn.execute("PRAGMA foreign_keys = ON")
+        except Exception as e:
+            self._fail_pending(e)
+            return
+        try:
+            while True:
+                first = self._requests.get()
+                if first is _STOP:
+                    return
+                batch, stop = [first], False
+                while len(batch) < self.max_batch:
+                    try:
+                        request = self._requests.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is _STOP:
+                        stop = True
+                        break
+                    batch.append(request)
+                self._apply(batch)
+                if stop:
+                    return
+        finally:
+            self._conn.close()
+
+    def _fail_pending(self, error: Exception) -> None:
+        """The writer never started: fail everything queued, and make later submits raise"""
+        with self._state_lock:
+            self._error = error
+            self._closed = True
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _STOP and request[1].set_running_or_notify_cancel():
+                request[1].set_exception(error)
+
+    def _apply(self, batch: list) -> None:
+        outcomes = []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for work, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._conn.execute("SAVEPOINT write_request")
+                try:
+                    result = work(self._conn)
+                except BaseException as e:
+                    self._conn.execute("ROLLBACK TO write_request")
+                    self._conn.execute("RELEASE write_request")
+                    outcomes.append((future, None, e))
+                    continue
+                self._conn.execute("RELEASE write_request")
+                outcomes.append((future, result, None))
+            self._conn.execute("COMMIT")
+        except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            # Nothing in the group was committed: every caller sees the error
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Results are only visible once committed
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_write_queues: dict[str, WriteQueue] = {}
+_write_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: str = DB_PATH) -> WriteQueue:
+    """Process-wide writer for a database file (started on first use)"""
+    key = os.path.abspath(db_path)
+    with _write_queues_lock:
+        write_queue = _write_queues.get(key)
+        # A forked child inherits the dict but not the writer thread; a writer that failed to start is replaced
+        if write_queue is None or write_queue._pid != os.getpid() or write_queue._error is not None:
+            write_queue = _write_queues[key] = WriteQueue(db_path)
+        return write_queue
+
+
+@atexit.register
+def _close_write_queues() -> None:
+    """Commit writes that nobody waited for before the interpreter exits"""
+    for write_queue in list(_write_queues.values()):
+        if write_queue._pid == os.getpid():
+            write_queue.close()
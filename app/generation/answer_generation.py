@@ -8,6 +8,11 @@ import re
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI            
+from app.utils.rate_limiter import (
+    get_rate_limiter, is_rate_limit_error, retry_after_from_error
+)
+from app.db.connection import get_cursor
+from app.db.text_store import load_raw_texts
 # Initialize LLMs
 load_dotenv()                                                                            
 # API key loaded from .env file               
@@ -364,6 +369,27 @@ def _generate_rule_based_answer(query: str, search_results: list, dropped_filter
     return intro + "\n".join(lines)
 
 
+def _invoke_rate_limited(provider: str, chain, inputs: dict, prompt_text: str,
+                         max_wait_seconds: float = 20.0) -> str:
+    """
+    Invoke a prompt | llm chain once the provider's shared rate limiter has
+    capacity and return the answer text. Interactive answers wait at most
+    max_wait_seconds, then the caller falls back to the next provider.
+    """
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = rate_limiter.expected_tokens(provider, prompt_text, max_output_tokens=4096)
+    rate_limiter.acquire(provider, estimated_tokens, timeout=max_wait_seconds)
+    try:
+        message = chain.invoke(inputs)
+    except Exception as e:
+        if is_rate_limit_error(e):
+            rate_limiter.on_rate_limited(provider, retry_after_from_error(e))
+        raise
+    # The message (not the parsed string) carries actual token usage and rate-limit headers
+    rate_limiter.record_response(provider, estimated_tokens, message)
+    return StrOutputParser().invoke(message)
+
+
 def generate_answer(query: str, search_results: list, conversation_history: list = None, format_as_list: bool = False, dropped_filters: list = None) -> str:
     """
     Generate natural language answer from search results
@@ -395,6 +421,8 @@ def generate_answer(query: str, search_results: list, conversation_history: list
     include_full_text = len(search_results_for_query) <= 2
     
     if include_full_text:
+        # Results come without the text; load (and decompress) it only now
+        load_raw_texts(get_cursor(), search_results_for_query)
         print(f"   📋 Including FULL resume text for {len(search_results)} candidate(s)")
     else:
         print(f"   📋 Using structured fields only for {len(search_results)} candidates")
@@ -510,39 +538,31 @@ Please provide a helpful answer based on these candidates.""")
     ])
     
     # Generate answer with fallback
-    chain = prompt | llm | StrOutputParser()
+    chain = prompt | llm
+    inputs = {
+        "query": query,
+        "context": context,
+        "history": history_text,
+        "dropped_filters_text": dropped_filters_text
+    }
+    prompt_text = context + history_text + query
     
     try:
         # Try OpenAI first
-        answer = chain.invoke({
-            "query": query,
-            "context": context,
-            "history": history_text,
-            "dropped_filters_text": dropped_filters_text
-        })
+        answer = _invoke_rate_limited("openai", chain, inputs, prompt_text)
     except Exception as e:
         # If OpenAI fails (rate limit), fallback to Groq
-        if "rate_limit" in str(e).lower() or "429" in str(e):
+        if is_rate_limit_error(e):
             print("   ⚠️  OpenAI rate limit hit, falling back to Groq...")
             try:
-                chain_groq = prompt | llm_groq | StrOutputParser()
-                answer = chain_groq.invoke({
-                    "query": query,
-                    "context": context,
-                    "history": history_text,
-                    "dropped_filters_text": dropped_filters_text
-                })
+                chain_groq = prompt | llm_groq
+                answer = _invoke_rate_limited("groq", chain_groq, inputs, prompt_text)
             except Exception as groq_error:
                 # If Groq also fails, fallback to Gemini
-                if "rate_limit" in str(groq_error).lower() or "429" in str(groq_error):
+                if is_rate_limit_error(groq_error):
                     print("   ⚠️  Groq rate limit hit too, falling back to Gemini...")
-                    chain_gemini = prompt | llm_gemini | StrOutputParser()
-                    answer = chain_gemini.invoke({
-                        "query": query,
-                        "context": context,
-                        "history": history_text,
-                        "dropped_filters_text": dropped_filters_text
-                    })
+                    chain_gemini = prompt | llm_gemini
+                    answer = _invoke_rate_limited("gemini", chain_gemini, inputs, prompt_text)
                 else:
                     print(f"   ⚠️  Groq fallback failed: {groq_error}")
                     return _generate_rule_based_answer(query, search_results_for_query, dropped_filters)
@@ -0,0 +1,167 @@
+# app/ingestion/extraction_engines.py
+"""
+Pluggable PDF text extraction engines.
+
+PyMuPDF is several times faster than pdfplumber on plain-text resumes, but
+pdfplumber copes better with some layouts (CID fonts, odd encodings). The
+FallbackEngine extracts every page with the fast engine and re-extracts only
+the pages that come back empty or garbled with the next engine in the chain.
+If the fast engine fails on the whole file, the next engine extracts every page.
+
+Select the engine with PDF_EXTRACTION_ENGINE = "auto" | "pymupdf" | "pdfplumber".
+"""
+
+import os
+import re
+from typing import Optional
+
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+# Garbled-text heuristics
+MIN_PAGE_CHARS = 20            # fewer visible chars than this counts as empty
+MIN_ALNUM_RATIO = 0.5          # share of non-space chars that must be letters/digits
+MAX_BAD_CHAR_RATIO = 0.02      # replacement chars / (cid:NN) / control chars
+MAX_AVG_WORD_LENGTH = 25       # glued words (missing spaces) look like this
+
+
+def looks_garbled(text: Optional[str]) -> bool:
+    """Return True if a page's text is empty or looks like a broken decode"""
+    if not text:
+        return True
+    visible = [ch for ch in text if not ch.isspace()]
+    if len(visible) < MIN_PAGE_CHARS:
+        return True
+
+    bad = text.count("�") + len(CID_PATTERN.findall(text))
+    bad += sum(1 for ch in visible if ord(ch) < 32)
+    if bad / len(visible) > MAX_BAD_CHAR_RATIO:
+        return True
+
+    alnum = sum(1 for ch in visible if ch.isalnum())
+    if alnum / len(visible) < MIN_ALNUM_RATIO:
+        return True
+
+    words = text.split()
+    if words and len(visible) / len(words) > MAX_AVG_WORD_LENGTH:
+        return True
+    return False
+
+
+class ExtractionEngine:
+    """Base class: an engine returns one text string per page"""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        raise NotImplementedError
+
+    def extract_page(self, file_path: str, page_number: int) -> str:
+        return self.extract_pages(file_path)[page_number]
+
+
+def _import_pymupdf():
+    """PyMuPDF >= 1.24.3 is imported as `pymupdf`; older releases only as `fitz`"""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+class PyMuPDFEngine(ExtractionEngine):
+    name = "pymupdf"
+
+    def is_available(self) -> bool:
+        try:
+            _import_pymupdf()
+            return True
+        except ImportError:
+            return False
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        with _import_pymupdf().open(file_path) as doc:
+            return [page.get_text("text") or "" for page in doc]
+
+    def extract_page(self, file_path: str, page_number: int) -> str:
+        with _import_pymupdf().open(file_path) as doc:
+            return doc[page_number].get_text("text") or ""
+
+
+class PdfPlumberEngine(ExtractionEngine):
+    name = "pdfplumber"
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+
+    def extract_page(self, file_path: str, page_number: int) -> str:
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return pdf.pages[page_number].extract_text() or ""
+
+
+class FallbackEngine(ExtractionEngine):
+    """
+    Fast engine first, per-page fallback to the next engines when a page looks
+    bad, and whole-file fallback when an engine cannot open the file at all.
+    """
+
+    name = "auto"
+
+    def __init__(self, engines: list[ExtractionEngine]):
+        self.engines = [engine for engine in engines if engine.is_available()]
+        if not self.engines:
+            raise RuntimeError("No PDF extraction engine is available")
+        # Pages re-extracted by a fallback engine during the last call
+        self.last_fallback_pages: list[int] = []
+
+    def extract_pages(self, file_path: str) -> list[str]:
+        self.last_fallback_pages = []
+        # An engine that fails on the whole file hands every page to the next one
+        for index, primary in enumerate(self.engines):
+            try:
+                pages = primary.extract_pages(file_path)
+                break
+            except Exception:
+                if index == len(self.engines) - 1:
+                    raise
+        fallbacks = self.engines[index + 1:]
+        if index > 0:
+            self.last_fallback_pages = list(range(len(pages)))
+
+        for page_number, text in enumerate(pages):
+            if not looks_garbled(text):
+                continue
+            for engine in fallbacks:
+                try:
+                    candidate = engine.extract_page(file_path, page_number)
+                except Exception:
+                    continue
+                if not looks_garbled(candidate) or len(candidate.strip()) > len(text.strip()):
+                    pages[page_number] = candidate
+                    self.last_fallback_pages.append(page_number)
+                    break
+        return pages
+
+
+ENGINES = {
+    "pymupdf": PyMuPDFEngine,
+    "pdfplumber": PdfPlumberEngine,
+}
+
+
+def get_extraction_engine(name: Optional[str] = None) -> ExtractionEngine:
+    """Build the configured engine ("auto" = PyMuPDF with pdfplumber fallback)"""
+    name = (name or os.getenv("PDF_EXTRACTION_ENGINE", "auto")).lower()
+    if name == "auto":
+        return FallbackEngine([PyMuPDFEngine(), PdfPlumberEngine()])
+    if name not in ENGINES:
+        raise ValueError(f"Unknown PDF extraction engine: {name}")
+    engine = ENGINES[name]()
+    if not engine.is_available():
+        raise RuntimeError(f"PDF extraction engine '{name}' is not installed")
+    return engine
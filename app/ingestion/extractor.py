@@ -1,47 +1,221 @@
-import pdfplumber
 import sqlite3
+import multiprocessing
+import os
+import queue
+import time
 from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
+from app.ingestion.extraction_engines import get_extraction_engine
+from app.ingestion.near_duplicates import index_extracted_texts, sign_texts
+from app.parsing.pre_extractor import PAGE_BREAK
+
+# Parallel extraction defaults (override per call or via environment)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "60"))
+EXTRACT_COMMIT_EVERY = int(os.getenv("EXTRACT_COMMIT_EVERY", "50"))
+
+BATCH_DOCUMENTS_SQL = """
+    SELECT document_id, file_path FROM documents
+    WHERE batch_id = ?
+      AND duplicate_of IS NULL
+"""
+
+_engine = None
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = get_extraction_engine()
+    return _engine
 
 def extract_text_from_pdf(file_path:str)->str:
-    """ extract text from a pdf file"""
+    """ extract text from a pdf file (engine set by PDF_EXTRACTION_ENGINE)"""
     if file_path.endswith('.pdf') is False:
         raise ValueError("File is not a PDF")
-    with pdfplumber.open(file_path) as pdf:
-        text=""
-        for page in pdf.pages:
-            text+=page.extract_text() + "\n"
+    pages=_get_engine().extract_pages(file_path)
+    # pages are separated by a form feed so the pre-extractor can find page headers/footers
+    text=PAGE_BREAK.join(page + "\n" for page in pages)
     if(text.strip() == ""):
         raise ValueError("No text found in PDF")
     return text
 
 def save_extracted_text(document_id:str,text:str):
-    """save extracted text to the database"""
-    conn=sqlite3.connect(DB_PATH)
-    cursor=conn.cursor()
-    cursor.execute("""
-        UPDATE documents
-        SET raw_text = ?
-        WHERE document_id = ?
-    """, (text, document_id))
-    # now update the status from uploaded to extracted
-    cursor.execute("""
+    """save extracted text to the database; returns (near_duplicate_of, score) or None"""
+    return save_extracted_texts([(document_id, text)]).get(document_id)
+
+def _write_extracted_texts(conn:sqlite3.Connection, results:list[tuple[str,str]], signatures:dict) -> dict:
+    conn.executemany("""
         UPDATE documents
-        SET status = ?
+        SET raw_text = ?, status = 'extracted'
         WHERE document_id = ?
-    """, ("extracted", document_id))
-    conn.commit()
-    conn.close()
+    """, [(text, document_id) for document_id, text in results])
+    return index_extracted_texts(conn, signatures)
+
+def save_extracted_texts(results:list[tuple[str,str]], conn:sqlite3.Connection=None) -> dict:
+    """
+    save many (document_id, text) pairs in a single transaction and add them to
+    the near-duplicate index; returns {document_id: (near_duplicate_of, score)}
+    (goes through the process-wide write queue unless a connection is given)
+    """
+    if not results:
+        return {}
+    # MinHash here, in the caller's thread: the write transaction only stores rows
+    signatures = sign_texts(results)
+    if conn is not None:
+        with conn:
+            return _write_extracted_texts(conn, results, signatures)
+    return get_write_queue().submit(lambda conn: _write_extracted_texts(conn, results, signatures)).result()
+
+_started = None  # set in pool workers by _init_extract_worker
+
+def _init_extract_worker(started):
+    """pool initializer: workers report each task they pick up on `started`"""
+    global _started
+    _started = started
+
+def _new_extract_pool(workers:int):
+    """(pool, started queue) for extract_documents_parallel"""
+    started = multiprocessing.Queue()
+    return multiprocessing.Pool(processes=workers, initializer=_init_extract_worker, initargs=(started,)), started
+
+def _extract_worker(task:tuple[str,str]) -> tuple[str, str | None, str | None]:
+    """pool worker: returns (document_id, text, error) and never raises"""
+    document_id, file_path = task
+    if _started is not None:
+        _started.put(document_id)
+    try:
+        return document_id, extract_text_from_pdf(file_path), None
+    except Exception as e:
+        return document_id, None, str(e)
+
+def extract_documents_parallel(
+    documents:list[tuple[str,str]],
+    workers:int=None,
+    max_in_flight:int=None,
+    timeout:float=EXTRACT_TIMEOUT_SECONDS,
+    commit_every:int=EXTRACT_COMMIT_EVERY,
+    on_result=None,
+) -> tuple[int, list[tuple[str,str]]]:
+    """
+    Extract text for many documents with a process pool.
+
+    Workers only extract; the calling process is the single writer and commits
+    raw_text/status in batches of `commit_every`. At most `max_in_flight` files
+    are queued in the pool at once. A file that runs longer than `timeout`
+    seconds is reported as failed and the pool is restarted so the stuck worker
+    does not hold a slot. The timeout counts from when a worker picks the file
+    up, not from when it was queued behind other files.
+
+    Args:
+        documents: [(document_id, file_path), ...]
+        workers: Number of worker processes (default: EXTRACT_WORKERS)
+        max_in_flight: Max files submitted but not finished (default: 2 * workers)
+        timeout: Per-file timeout in seconds
+        commit_every: Number of extracted documents per write transaction
+        on_result: Optional callback(document_id, text, error) for progress
+
+    Returns:
+        (success_count, [(document_id, error), ...])
+    """
+    workers = max(1, workers or EXTRACT_WORKERS)
+    max_in_flight = max(workers, max_in_flight or workers * 2)
+
+    pending_tasks = list(reversed(documents))
+    in_flight = {}  # document_id -> (file_path, async_result, deadline or None until a worker starts it)
+    pending_writes = []
+    write_futures = []  # batches are committed by the writer thread while extraction goes on
+    failures = []
+    success_count = 0
+
+    write_queue = get_write_queue()
+    pool, started = _new_extract_pool(workers)
+    try:
+        while pending_tasks or in_flight:
+            while pending_tasks and len(in_flight) < max_in_flight:
+                document_id, file_path = pending_tasks.pop()
+                async_result = pool.apply_async(_extract_worker, ((document_id, file_path),))
+                in_flight[document_id] = (file_path, async_result, None)
+
+            now = time.monotonic()
+            while True:
+                try:
+                    document_id = started.get_nowait()
+                except queue.Empty:
+                    break
+                if document_id in in_flight and in_flight[document_id][2] is None:
+                    file_path, async_result, _ = in_flight[document_id]
+                    in_flight[document_id] = (file_path, async_result, now + timeout)
+
+            finished = []
+            expired = []
+            for document_id, (file_path, async_result, deadline) in in_flight.items():
+                if async_result.ready():
+                    finished.append(async_result.get())
+                elif deadline is not None and now >= deadline:
+                    expired.append(document_id)
+
+            for document_id, text, error in finished:
+                del in_flight[document_id]
+                if error is None:
+                    pending_writes.append((document_id, text))
+                    success_count += 1
+                else:
+                    failures.append((document_id, error))
+                if on_result:
+                    on_result(document_id, text, error)
+
+            if expired:
+                for document_id in expired:
+                    del in_flight[document_id]
+                    error = f"Extraction timed out after {timeout:.0f}s"
+                    failures.append((document_id, error))
+                    if on_result:
+                        on_result(document_id, None, error)
+                # A hung worker cannot be cancelled individually: replace the pool
+                # and resubmit whatever was still running on it.
+                pool.terminate()
+                pool.join()
+                pool, started = _new_extract_pool(workers)
+                pending_tasks.extend(
+                    (document_id, file_path) for document_id, (file_path, _, _) in in_flight.items()
+                )
+                in_flight.clear()
+
+            if len(pending_writes) >= commit_every:
+                batch, signatures = pending_writes, sign_texts(pending_writes)
+                write_futures.append(write_queue.submit(
+                    lambda conn, batch=batch, signatures=signatures: _write_extracted_texts(conn, batch, signatures)
+                ))
+                pending_writes = []
+
+            if not finished and not expired:
+                time.sleep(0.05)
+
+        save_extracted_texts(pending_writes)
+        for future in write_futures:
+            future.result()  # surface a failed batch write
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+    return success_count, failures
 
-def process_batch(batch_id:str):
-    """process all documents in a batch to extract text"""
+def process_batch(batch_id:str, workers:int=1):
+    """process all documents in a batch to extract text (workers > 1 uses a process pool)"""
     conn=sqlite3.connect(DB_PATH)
     cursor=conn.cursor()
-    cursor.execute("""
-        SELECT document_id, file_path FROM documents
-        WHERE batch_id = ?
-    """, (batch_id,))
+    cursor.execute(BATCH_DOCUMENTS_SQL, (batch_id,))
     documents=cursor.fetchall()
     conn.close()
+    if workers > 1:
+        def report(document_id, text, error):
+            if error is None:
+                print(f"Extracted text for document {document_id}")
+            else:
+                print(f"Failed to extract text for document {document_id}: {error}")
+        extract_documents_parallel(documents, workers=workers, on_result=report)
+        return
     for document in documents:
         document_id, file_path = document
         try:
@@ -49,4 +223,4 @@ def process_batch(batch_id:str):
             save_extracted_text(document_id, text)
             print(f"Extracted text for document {document_id}")
         except Exception as e:
-            print(f"Failed to extract text for document {document_id}: {e}")
\ No newline at end of file
+            print(f"Failed to extract text for document {document_id}: {e}")
@@ -0,0 +1,168 @@
+# app/ingestion/near_duplicates.py
+"""
+Near-duplicate detection for extracted resume text (MinHash + LSH).
+
+Exact re-uploads are caught by content_hash at upload time, but candidates
+often resubmit a slightly edited resume, and each version costs a full LLM
+parse plus embeddings. Every extracted text gets a MinHash signature over its
+word shingles. The signature's LSH band hashes are stored in
+`document_lsh_buckets`, and a lookup only compares against documents that
+share at least one (band, bucket) pair, via an index. Lookups therefore stay
+sub-linear as the corpus grows.
+
+A new document whose estimated Jaccard similarity to an earlier one is at
+least NEAR_DUPLICATE_THRESHOLD gets `documents.near_duplicate_of` and
+`near_duplicate_score`. The parse stage then applies NEAR_DUPLICATE_POLICY:
+
+    reparse_changed  parse only the sections whose text changed, reuse the rest (default)
+    skip             do not parse/index the new version (status 'near_duplicate')
+    off              detect and record only; parse as usual
+
+With 128 permutations in 16 bands of 8 rows, pairs at 0.85 similarity share
+a bucket with probability > 99%, and pairs below 0.5 rarely become candidates.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+from typing import Optional
+
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_POLICY = os.getenv("NEAR_DUPLICATE_POLICY", "reparse_changed")  # reparse_changed | skip | off
+
+SHINGLE_SIZE = 5   # words per shingle
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+_PRIME = (1 << 31) - 1  # keeps a*x+b inside 64 bits
+
+# Fixed permutation coefficients: signatures must stay comparable across runs and processes
+_seed = hashlib.sha256(b"resume-minhash-v1").digest()
+_COEFFICIENTS = []
+for _i in range(NUM_PERM):
+    _digest = hashlib.blake2b(_seed + _i.to_bytes(2, "big"), digest_size=8).digest()
+    _COEFFICIENTS.append((int.from_bytes(_digest[:4], "big") % (_PRIME - 1) + 1,
+                          int.from_bytes(_digest[4:], "big") % _PRIME))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str) -> set[int]:
+    """Hashed word n-grams of the lowercased alphanumeric text"""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"), digest_size=4).digest(), "big") % _PRIME
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(text: str) -> list[int]:
+    values = shingles(text)
+    return [min((a * x + b) % _PRIME for x in values) for a, b in _COEFFICIENTS]
+
+
+def estimate_similarity(signature_a, signature_b) -> float:
+    """Estimated Jaccard similarity: share of matching MinHash slots"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def _band_buckets(signature) -> list[tuple[int, int]]:
+    buckets = []
+    for band in range(BANDS):
+        rows = array("I", signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "big", signed=True)
+        buckets.append((band, bucket))
+    return buckets
+
+
+def _pack(signature) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def _unpack(blob: bytes) -> list[int]:
+    signature = array("I")
+    signature.frombytes(blob)
+    return signature.tolist()
+
+
+class NearDuplicateIndex:
+    """LSH index stored in resumes.db; works inside the caller's connection/transaction"""
+
+    def __init__(self, conn: sqlite3.Connection, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.conn = conn
+        self.threshold = threshold
+
+    def candidates(self, signature) -> set[str]:
+        """Documents sharing at least one LSH bucket with the signature"""
+        found = set()
+        for band, bucket in _band_buckets(signature):
+            found.update(row[0] for row in self.conn.execute(
+                "SELECT document_id FROM document_lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+        return found
+
+    def query(self, signature, exclude: Optional[str] = None) -> list[tuple[str, float]]:
+        """[(document_id, similarity), ...] at or above the threshold, best first"""
+        matches = []
+        for document_id in self.candidates(signature) - {exclude}:
+            row = self.conn.execute(
+                "SELECT signature FROM document_minhash WHERE document_id = ?", (document_id,)
+            ).fetchone()
+            if row is None:
+                continue
+            similarity = estimate_similarity(signature, _unpack(row[0]))
+            if similarity >= self.threshold:
+                matches.append((document_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(self, document_id: str, signature) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO document_minhash (document_id, signature) VALUES (?, ?)",
+            (document_id, _pack(signature))
+        )
+        self.conn.execute("DELETE FROM document_lsh_buckets WHERE document_id = ?", (document_id,))
+        self.conn.executemany(
+            "INSERT INTO document_lsh_buckets (band, bucket, document_id) VALUES (?, ?, ?)",
+            [(band, bucket, document_id) for band, bucket in _band_buckets(signature)]
+        )
+
+    def add_and_match(self, document_id: str, signature) -> Optional[tuple[str, float]]:
+        """Index a document's signature and return its closest earlier near-duplicate, if any"""
+        matches = self.query(signature, exclude=document_id)
+        self.add(document_id, signature)
+        return matches[0] if matches else None
+
+
+def sign_texts(results: list[tuple[str, str]]) -> dict[str, list[int]]:
+    """
+    {document_id: MinHash signature} for extracted texts. Tens of ms per text:
+    compute it in the calling thread, before the write, not inside the
+    single-writer transaction.
+    """
+    return {document_id: minhash_signature(text) for document_id, text in results}
+
+
+def index_extracted_texts(conn: sqlite3.Connection, signatures: dict[str, list[int]]) -> dict:
+    """
+    Add signed documents ({document_id: signature}, see sign_texts) to the LSH
+    index and record near-duplicate matches on their documents rows (in the
+    caller's transaction). Returns {document_id: (near_duplicate_of, score)}
+    for the matched ones.
+    """
+    index = NearDuplicateIndex(conn)
+    matches = {}
+    for document_id, signature in signatures.items():
+        match = index.add_and_match(document_id, signature)
+        if match:
+            matches[document_id] = match
+    if matches:
+        conn.executemany("""
+            UPDATE documents
+            SET near_duplicate_of = ?, near_duplicate_score = ?
+            WHERE document_id = ?
+        """, [(original_id, round(score, 3), document_id) for document_id, (original_id, score) in matches.items()])
+    return matches
@@ -1,78 +1,208 @@
+import os
 import uuid
+import shutil
+import hashlib
 import sqlite3
 from pathlib import Path
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
+from app.pipeline.priority import DEFAULT_PRIORITY, priority_value
+
 UPLOAD_ROOT = Path("resumedata/resumedata")
+HASH_CHUNK_SIZE = 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl: share extents between files (btrfs/xfs reflink)
 
 
-def create_upload_batch(recruiter_id: str, upload_type: str, total_files: int):
-    batch_id = str(uuid.uuid4())
+def compute_content_hash(file_path: Path) -> str:
+    """SHA-256 of the file bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
 
+def find_document_by_hash(cursor: sqlite3.Cursor, content_hash: str):
+    """
+    Return (document_id, file_path) of the original upload with this content,
+    or None if the content has not been seen before.
+    """
     cursor.execute("""
-        INSERT INTO upload_batches (batch_id, recruiter_id, upload_type, total_files)
-        VALUES (?, ?, ?, ?)
-    """, (batch_id, recruiter_id, upload_type, total_files))
-
-    conn.commit()
-    conn.close()
-
+        SELECT document_id, file_path
+        FROM documents
+        WHERE content_hash = ? AND duplicate_of IS NULL
+        ORDER BY created_at
+        LIMIT 1
+    """, (content_hash,))
+    return cursor.fetchone()
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    """Copy-on-write clone of source into target; False if the filesystem can't"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        target.unlink(missing_ok=True)
+        return False
+
+
+def place_file(source: Path, target: Path, link_mode: str = "auto") -> str:
+    """
+    Put source at target without loading it into memory.
+
+    link_mode:
+        "auto": hardlink if on the same filesystem, else reflink, else stream copy
+        "copy": always stream copy (use when the source may be edited later)
+
+    Returns the method used: "hardlink", "reflink" or "copy".
+    """
+    if link_mode == "auto":
+        try:
+            if os.stat(source).st_dev == os.stat(target.parent).st_dev:
+                os.link(source, target)
+                return "hardlink"
+        except OSError:
+            pass
+        if _reflink(source, target):
+            return "reflink"
+
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    return "copy"
+
+
+def _unique_target(batch_folder: Path, filename: str, used_names: set) -> Path:
+    """Avoid overwriting an earlier file of the same batch that has the same name"""
+    candidate = filename
+    counter = 1
+    while candidate in used_names:
+        candidate = f"{Path(filename).stem}_{counter}{Path(filename).suffix}"
+        counter += 1
+    used_names.add(candidate)
+    return batch_folder / candidate
+
+
+def bulk_store_pdfs(pdf_paths: list[Path], recruiter_id: str, upload_type: str = "bulk",
+                    link_mode: str = "auto", progress=None, priority: str = DEFAULT_PRIORITY) -> str:
+    """
+    Bulk upload: stream/link every file into a new batch folder, then register
+    the batch and all of its documents in one transaction. If the upload
+    fails, the batch folder and the files placed in it are removed.
+
+    Memory use does not depend on PDF size (files are hashed and copied in
+    chunks). Content already in the database, including content registered
+    by a concurrent upload, is linked via duplicate_of instead of being stored again.
+
+    Args:
+        pdf_paths: Files to upload
+        recruiter_id: Owner of the batch
+        upload_type: Stored on upload_batches
+        link_mode: "auto" (hardlink/reflink when possible) or "copy"
+        progress: Optional callback(done, total, pdf_path, action) where action
+                  is "hardlink", "reflink", "copy" or "duplicate"
+        priority: "interactive", "normal" or "backfill" (order of extract/parse/index work)
+
+    Returns:
+        batch_id
+    """
+    batch_id = str(uuid.uuid4())
+    priority = priority_value(priority)
     batch_folder = UPLOAD_ROOT / batch_id
     batch_folder.mkdir(parents=True, exist_ok=True)
 
-    return batch_id, batch_folder
-
-
-def register_document(batch_id: str, filename: str, file_path: str):
-    document_id = str(uuid.uuid4())
-
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
+    try:
+        rows = []
+        seen_hashes = {}  # content_hash -> (document_id, file_path) within this batch
+        used_names = set()
+        total = len(pdf_paths)
+
+        for done, pdf_path in enumerate(pdf_paths, 1):
+            pdf_path = Path(pdf_path)
+            content_hash = compute_content_hash(pdf_path)
+            document_id = str(uuid.uuid4())
+
+            existing = seen_hashes.get(content_hash) or find_document_by_hash(cursor, content_hash)
+
+            if existing:
+                original_document_id, original_file_path = existing
+                rows.append((document_id, batch_id, pdf_path.name, original_file_path,
+                             "duplicate", content_hash, original_document_id))
+                action = "duplicate"
+            else:
+                target_path = _unique_target(batch_folder, pdf_path.name, used_names)
+                action = place_file(pdf_path, target_path, link_mode)
+                rows.append((document_id, batch_id, pdf_path.name, str(target_path),
+                             "uploaded", content_hash, None))
+                seen_hashes[content_hash] = (document_id, str(target_path))
+
+            if progress:
+                progress(done, total, pdf_path, action)
+
+    except BaseException:
+        shutil.rmtree(batch_folder, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+    # Another upload of the same content may have been registered since the files were
+    # hashed. Re-check inside the write transaction (the partial unique index on
+    # content_hash allows one original) and link such rows to that original instead.
+    def register(conn: sqlite3.Connection) -> list[str]:
+        replaced, unused_files = {}, []  # document_id -> (original document_id, file_path)
+        final_rows = []
+        for row in rows:
+            document_id, _, filename, file_path, status, content_hash, duplicate_of = row
+            if duplicate_of is None:
+                existing = find_document_by_hash(conn.cursor(), content_hash)
+                if existing:
+                    replaced[document_id] = existing
+                    unused_files.append(file_path)
+                    row = (document_id, batch_id, filename, existing[1], "duplicate", content_hash, existing[0])
+            elif duplicate_of in replaced:
+                original_document_id, original_file_path = replaced[duplicate_of]
+                row = (document_id, batch_id, filename, original_file_path, "duplicate",
+                       content_hash, original_document_id)
+            final_rows.append(row)
+
+        conn.execute("""
+            INSERT INTO upload_batches (batch_id, recruiter_id, upload_type, total_files, priority)
+            VALUES (?, ?, ?, ?, ?)
+        """, (batch_id, recruiter_id, upload_type, len(final_rows), priority))
+        conn.executemany("""
+            INSERT INTO documents (document_id, batch_id, original_filename, file_path, status,
+                                   content_hash, duplicate_of)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, final_rows)
+        return unused_files
+
+    try:
+        unused_files = get_write_queue(DB_PATH).submit(register).result()
+    except BaseException:
+        # Nothing was registered: don't leave the placed files behind
+        shutil.rmtree(batch_folder, ignore_errors=True)
+        raise
+
+    for file_path in unused_files:
+        Path(file_path).unlink(missing_ok=True)
 
-    cursor.execute("""
-        INSERT INTO documents (document_id, batch_id, original_filename, file_path, status)
-        VALUES (?, ?, ?, ?, ?)
-    """, (document_id, batch_id, filename, file_path, "uploaded"))
-
-    conn.commit()
-    conn.close()
+    return batch_id
 
 
 def store_uploaded_pdfs(pdf_paths: list[Path], recruiter_id: str):
-    batch_id, batch_folder = create_upload_batch(
+    return bulk_store_pdfs(
+        pdf_paths=pdf_paths,
         recruiter_id=recruiter_id,
         upload_type="multi_pdf",
-        total_files=0  # temporary
+        link_mode="copy",
+        priority="interactive"  # a recruiter is waiting for these
     )
-
-    count = 0
-    for pdf_path in pdf_paths:
-        target_path = batch_folder / pdf_path.name
-        target_path.write_bytes(pdf_path.read_bytes())
-
-        register_document(
-            batch_id=batch_id,
-            filename=pdf_path.name,
-            file_path=str(target_path)
-        )
-        count += 1
-
-    update_batch_file_count(batch_id, count)
-    return batch_id
-
-
-def update_batch_file_count(batch_id: str, total_files: int):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE upload_batches
-        SET total_files = ?
-        WHERE batch_id = ?
-    """, (total_files, batch_id))
-
-    conn.commit()
-    conn.close()
@@ -0,0 +1,180 @@
+# app/ingestion/watcher.py
+"""
+Watch-folder ingestion: poll folders for new PDFs and feed them to the job queue.
+
+A file is picked up once its size and mtime have not changed for
+WATCH_STABLE_SECONDS. Files still being copied or downloaded are not uploaded
+half-written. Ready files are uploaded with bulk_store_pdfs (content-hash
+duplicates are linked as usual), and their documents get "extract" jobs in
+the durable JobQueue. Any running queue worker (scripts/watch_folders.py starts
+them) then takes them through extract → parse → index. A new resume is
+searchable seconds after the LLM parse, without waiting for a batch run.
+
+Uploaded files are remembered in `watched_files` by path, size and mtime, so
+a restart does not upload them again. A file that is later replaced with
+different content is picked up as a new version. A file that cannot be read
+(e.g. permission denied) is recorded there without a batch and skipped until
+it changes, so it does not block the other files of the folder.
+
+Usage:
+    watcher = FolderWatcher(["/data/inbox"])
+    watch_and_ingest(watcher, JobQueue())   # blocks; stop with stop_event or Ctrl+C
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
+from app.ingestion.uploader import bulk_store_pdfs
+
+# os.pathsep-separated list of folders (";" on Windows, ":" elsewhere)
+WATCH_FOLDERS = [folder for folder in os.getenv("WATCH_FOLDERS", "resumedata/inbox").split(os.pathsep) if folder]
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "2"))
+WATCH_STABLE_SECONDS = float(os.getenv("WATCH_STABLE_SECONDS", "3"))
+WATCH_RECRUITER_ID = os.getenv("WATCH_RECRUITER_ID", "watch_folder")
+WATCH_PRIORITY = os.getenv("WATCH_PRIORITY", "normal")  # interactive | normal | backfill
+
+
+class FolderWatcher:
+    """Polling watcher that reports PDFs whose size/mtime stopped changing"""
+
+    def __init__(self, folders: list, recursive: bool = True,
+                 stable_seconds: float = WATCH_STABLE_SECONDS, db_path: str = DB_PATH):
+        self.folders = [Path(folder) for folder in folders]
+        self.recursive = recursive
+        self.stable_seconds = stable_seconds
+        self.db_path = db_path
+        self._pending = {}  # path -> (size, mtime_ns, unchanged since)
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        self._ingested = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM watched_files")
+        }
+        conn.close()
+
+    def _candidates(self):
+        for folder in self.folders:
+            if not folder.is_dir():
+                continue
+            for path in (folder.rglob("*.pdf") if self.recursive else folder.glob("*.pdf")):
+                if path.name.startswith((".", "~$")) or not path.is_file():
+                    continue  # hidden/lock files of editors and sync clients
+                yield path
+
+    def poll(self) -> list[tuple[Path, int, int]]:
+        """
+        One scan of every folder. Returns [(path, size, mtime_ns), ...] for new
+        or changed files that have been stable for stable_seconds.
+        """
+        now = time.monotonic()
+        ready, seen = [], set()
+        for path in self._candidates():
+            key = str(path.resolve())
+            seen.add(key)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # removed or renamed between listing and stat
+            state = (stat.st_size, stat.st_mtime_ns)
+            if self._ingested.get(key) == state:
+                continue
+
+            previous = self._pending.get(key)
+            if previous is None or previous[:2] != state:
+                self._pending[key] = (*state, now)  # new, or still being written
+            elif stat.st_size > 0 and now - previous[2] >= self.stable_seconds:
+                ready.append((Path(key), *state))
+
+        # Forget files that disappeared before they became stable
+        for key in set(self._pending) - seen:
+            del self._pending[key]
+        return ready
+
+    def mark_ingested(self, files: list[tuple[Path, int, int]], batch_id: Optional[str]) -> None:
+        get_write_queue(self.db_path).executemany("""
+            INSERT OR REPLACE INTO watched_files (path, size, mtime_ns, batch_id)
+            VALUES (?, ?, ?, ?)
+        """, [(str(path), size, mtime_ns, batch_id) for path, size, mtime_ns in files]).result()
+        for path, size, mtime_ns in files:
+            self._ingested[str(path)] = (size, mtime_ns)
+            self._pending.pop(str(path), None)
+
+
+def ingest_files(files: list[tuple[Path, int, int]], job_queue, watcher: FolderWatcher,
+                 recruiter_id: str = WATCH_RECRUITER_ID, priority: str = WATCH_PRIORITY) -> tuple[str, int]:
+    """
+    Upload stable files as one batch and queue their extract jobs.
+    Returns (batch_id, number of documents queued); duplicates are not queued.
+    """
+    batch_id = bulk_store_pdfs(
+        pdf_paths=[path for path, _, _ in files],
+        recruiter_id=recruiter_id,
+        upload_type="watch_folder",
+        link_mode="copy",  # the watched file may be edited or replaced later
+        priority=priority
+    )
+    conn = sqlite3.connect(watcher.db_path, timeout=30)
+    document_ids = [row[0] for row in conn.execute(
+        "SELECT document_id FROM documents WHERE batch_id = ? AND status = 'uploaded'", (batch_id,)
+    )]
+    conn.close()
+
+    queued = job_queue.enqueue_many(document_ids, stage="extract") if document_ids else 0
+    watcher.mark_ingested(files, batch_id)
+    return batch_id, queued
+
+
+def _ingest_each(files: list[tuple[Path, int, int]], job_queue, watcher: FolderWatcher,
+                 on_batch: Optional[Callable], on_error: Optional[Callable]) -> None:
+    """Upload files one by one after a batch hit an unreadable file; skip the unreadable ones"""
+    for file in files:
+        try:
+            batch_id, queued = ingest_files([file], job_queue, watcher)
+        except OSError as e:
+            watcher.mark_ingested([file], None)  # skipped until its size/mtime change
+            if on_error is None:
+                raise
+            on_error(e)
+            continue
+        if on_batch:
+            on_batch(batch_id, [file], queued)
+
+
+def watch_and_ingest(
+    watcher: FolderWatcher,
+    job_queue,
+    poll_interval: float = WATCH_POLL_SECONDS,
+    stop_event: Optional[threading.Event] = None,
+    on_batch: Optional[Callable[[str, list, int], None]] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> None:
+    """
+    Poll until stop_event is set. Every batch of newly stable files is
+    uploaded and queued; on_batch(batch_id, files, queued) reports it.
+    A failed upload is reported to on_error and retried on the next poll.
+    If a file cannot be read (OSError), the files are uploaded one by one
+    instead and the unreadable ones are skipped (and reported to on_error).
+    """
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        try:
+            files = watcher.poll()
+            if files:
+                try:
+                    batch_id, queued = ingest_files(files, job_queue, watcher)
+                except OSError:
+                    _ingest_each(files, job_queue, watcher, on_batch, on_error)
+                else:
+                    if on_batch:
+                        on_batch(batch_id, files, queued)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+        stop_event.wait(poll_interval)
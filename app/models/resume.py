@@ -24,6 +24,18 @@ class Project(BaseModel):
     duration: Optional[str] = None
     role: Optional[str] = None  # Role in the project
 
+def _dict_to_text(v):
+    """Convert dict to formatted string if LLM returns dict instead of string"""
+    if v is None:
+        return None
+    if isinstance(v, dict):
+        # Convert dict to readable string format
+        lines = []
+        for key, value in v.items():
+            lines.append(f"{key}: {value}")
+        return "\n".join(lines)
+    return v
+
 class ParsedResume(BaseModel):
     candidate_name: str
     email: Optional[str] = None
@@ -50,12 +62,41 @@ class ParsedResume(BaseModel):
     @classmethod
     def convert_dict_to_string(cls, v):
         """Convert dict to formatted string if LLM returns dict instead of string"""
-        if v is None:
-            return None
-        if isinstance(v, dict):
-            # Convert dict to readable string format
-            lines = []
-            for key, value in v.items():
-                lines.append(f"{key}: {value}")
-            return "\n".join(lines)
-        return v
\ No newline at end of file
+        return _dict_to_text(v)
+
+class ResumeLLMFields(BaseModel):
+    """
+    Reduced schema sent to the LLM after rule-based pre-extraction: contact
+    details and catalogued skills are filled locally (app/parsing/pre_extractor.py)
+    """
+    candidate_name: str
+    location: Optional[str] = None
+    
+    total_experience_years: Optional[float] = None
+    current_role: Optional[str] = None
+    
+    # Skills the pre-extractor did not already find
+    technical_skills: list[str] = Field(default_factory=list)
+    
+    work_experience: list[WorkExperience] = Field(default_factory=list)
+    education: list[Education] = Field(default_factory=list)
+    projects: list[Project] = Field(default_factory=list)
+    
+    additional_information: Optional[str] = None
+    
+    @field_validator('additional_information', mode='before')
+    @classmethod
+    def convert_dict_to_string(cls, v):
+        """Convert dict to formatted string if LLM returns dict instead of string"""
+        return _dict_to_text(v)
+# Sub-schemas for section-parallel parsing of long resumes (app/parsing/section_parser.py)
+class ExperienceSection(BaseModel):
+    work_experience: list[WorkExperience] = Field(default_factory=list)
+    current_role: Optional[str] = None
+    total_experience_years: Optional[float] = None
+
+class ProjectsSection(BaseModel):
+    projects: list[Project] = Field(default_factory=list)
+
+class EducationSection(BaseModel):
+    education: list[Education] = Field(default_factory=list)
@@ -0,0 +1,220 @@
+# app/parsing/async_parser.py
+"""
+AsyncResumeParser - concurrent resume parsing with provider load balancing.
+
+parse_resume_with_llm is synchronous and strictly ordered (OpenAI, then Groq,
+then Gemini), so only one resume is ever in flight. This engine runs many
+parses at once on the async LangChain clients (`ainvoke`), bounded by a
+semaphore (one slot per LLM call), and sends each request to the provider
+with the best live score:
+
+    score = available rate-limit capacity / (EWMA latency × (1 + in-flight))
+
+so traffic spreads across every configured provider in proportion to the
+quota it has left and how fast it is answering. A provider that fails or is
+out of quota is skipped for that request and the next-best one is tried.
+The shared RateLimiter still gates every call, so bulk throughput is bounded
+by provider quotas rather than by serial round-trips.
+
+Usage:
+    results = AsyncResumeParser(max_concurrency=8).parse_many_sync(raw_texts)
+    # → [ParsedResume | Exception, ...] in input order
+
+    # From worker threads (e.g. IngestionPipeline parse stage):
+    parsed = parse_resume_balanced(raw_text)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+from app.models.resume import ParsedResume
+from app.parsing.parse_cache import get_parse_cache, model_name_of
+from app.parsing.resume_parser import PARSE_MAX_TOKENS, PROMPT_HASH, PROVIDERS, prepare_parse
+from app.utils.rate_limiter import (
+    add_usage, get_rate_limiter, is_rate_limit_error, retry_after_from_error
+)
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("PARSE_MAX_CONCURRENCY", "8"))
+LATENCY_EWMA_ALPHA = 0.3       # weight of the newest latency sample
+DEFAULT_LATENCY_SECONDS = 10.0  # assumed latency before a provider has answered once
+ACQUIRE_TIMEOUT_SECONDS = 30.0  # give up on a saturated provider and try the next one
+MAX_ROUNDS = 2                  # passes over all providers before a resume fails
+
+
+class ProviderStats:
+    """Live per-provider numbers used for routing (in-process only)"""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+
+    def record_latency(self, seconds: float) -> None:
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * self.latency
+
+    def as_dict(self) -> dict:
+        return {
+            "latency": round(self.latency, 2) if self.latency is not None else None,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+        }
+
+
+class AsyncResumeParser:
+    """Concurrent, load-balanced resume parser (see module docstring)"""
+
+    def __init__(self, providers: Optional[list] = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 use_cache: bool = True):
+        self.providers = providers or PROVIDERS
+        self.max_concurrency = max(1, max_concurrency)
+        self._cache = get_parse_cache() if use_cache else None
+        self._models = [model_name_of(llm_client) for _, _, llm_client in self.providers]
+        self.stats = {provider: ProviderStats() for provider, _, _ in self.providers}
+        self._rate_limiter = get_rate_limiter()
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop; parse_many_sync may create several
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _score(self, provider: str, capacity: float) -> float:
+        stats = self.stats[provider]
+        latency = stats.latency or DEFAULT_LATENCY_SECONDS
+        return capacity / (latency * (1 + stats.in_flight))
+
+    async def _rank_providers(self) -> list:
+        """Providers ordered best-first by live capacity and latency"""
+        capacities = await asyncio.to_thread(
+            lambda: {provider: self._rate_limiter.available_capacity(provider) for provider, _, _ in self.providers}
+        )
+        return sorted(
+            self.providers,
+            key=lambda entry: self._score(entry[0], capacities[entry[0]]),
+            reverse=True,
+        )
+
+    async def _invoke(self, provider: str, llm_client, prompt_value, finish, estimated_tokens: int,
+                      usage: Optional[dict] = None) -> ParsedResume:
+        stats = self.stats[provider]
+        await self._rate_limiter.acquire_async(provider, estimated_tokens, timeout=ACQUIRE_TIMEOUT_SECONDS)
+
+        stats.in_flight += 1
+        started = time.perf_counter()
+        try:
+            message = await llm_client.ainvoke(prompt_value)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                stats.rate_limited += 1
+                await asyncio.to_thread(self._rate_limiter.on_rate_limited, provider, retry_after_from_error(e))
+            else:
+                stats.failures += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+        stats.record_latency(time.perf_counter() - started)
+        await asyncio.to_thread(self._rate_limiter.record_response, provider, estimated_tokens, message)
+        result = finish(message)
+        stats.successes += 1
+        add_usage(usage, provider, model_name_of(llm_client), message)
+        return result
+
+    async def _parse_balanced(self, prompt_value, finish, usage: Optional[dict] = None) -> tuple:
+        """One planned request on the best available provider, falling over to the others"""
+        async with self._get_semaphore():
+            prompt_text = prompt_value.to_string()
+            errors = []
+            for _ in range(MAX_ROUNDS):
+                for provider, label, llm_client in await self._rank_providers():
+                    estimated_tokens = self._rate_limiter.expected_tokens(provider, prompt_text, PARSE_MAX_TOKENS)
+                    try:
+                        result = await self._invoke(provider, llm_client, prompt_value, finish, estimated_tokens, usage)
+                    except Exception as e:
+                        errors.append(f"{label}: {str(e)[:200]}")
+                        continue
+                    return result, model_name_of(llm_client)
+            raise Exception(f"❌ All LLM providers failed: {' | '.join(errors[-len(self.providers):])}")
+
+    async def parse(self, raw_text: str, usage: Optional[dict] = None) -> ParsedResume:
+        """
+        Parse one resume; long resumes run their section calls concurrently.
+        `usage`, if given, receives the provider/model and token counts (see add_usage).
+        """
+        if self._cache is not None:
+            cached = await asyncio.to_thread(self._cache.get, raw_text, PROMPT_HASH, self._models)
+            if cached is not None:
+                if usage is not None:
+                    usage["cache_hit"] = True
+                return cached
+
+        requests, combine = prepare_parse(raw_text)
+        outcomes = await asyncio.gather(
+            *(self._parse_balanced(prompt_value, finish, usage) for prompt_value, finish in requests)
+        )
+        parsed = combine([result for result, _ in outcomes])
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.put, raw_text, PROMPT_HASH, outcomes[0][1], parsed)
+        return parsed
+
+    async def parse_many(self, raw_texts: list[str]) -> list:
+        """Parse all texts concurrently; failures are returned as exceptions in place"""
+        return await asyncio.gather(*(self.parse(text) for text in raw_texts), return_exceptions=True)
+
+    def parse_many_sync(self, raw_texts: list[str]) -> list:
+        """parse_many() for synchronous callers (Streamlit/Jupyter-safe)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.parse_many(raw_texts))
+        # Already inside an event loop - run in a separate thread
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            return pool.submit(asyncio.run, self.parse_many(raw_texts)).result()
+
+
+# ─── Shared background loop for thread-based callers ─────────────
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_parser: Optional[AsyncResumeParser] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_parser() -> tuple[asyncio.AbstractEventLoop, AsyncResumeParser]:
+    global _background_loop, _background_parser
+    with _background_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, daemon=True).start()
+            _background_parser = AsyncResumeParser()
+        return _background_loop, _background_parser
+
+
+def parse_resume_balanced(raw_text: str, usage: Optional[dict] = None) -> ParsedResume:
+    """
+    Blocking, thread-safe entry point: every calling thread shares one event
+    loop, one concurrency semaphore and one set of provider statistics.
+    """
+    loop, async_parser = _get_background_parser()
+    return asyncio.run_coroutine_threadsafe(async_parser.parse(raw_text, usage), loop).result()
+
+
+def provider_stats() -> dict:
+    """Routing statistics of the shared background parser"""
+    if _background_parser is None:
+        return {}
+    return {provider: stats.as_dict() for provider, stats in _background_parser.stats.items()}
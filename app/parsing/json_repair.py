@@ -0,0 +1,268 @@
+# app/parsing/json_repair.py
+"""
+Local repair of LLM JSON answers that fail PydanticOutputParser validation.
+
+Without this, any malformed answer costs a full LLM round-trip: the same
+provider is called again or the next provider is tried. Most failures are
+mechanical, and fixable locally:
+
+1. Syntax - markdown fences, prose around the JSON, trailing commas, smart
+   quotes, Python literals (None/True/False), and answers truncated at
+   max_tokens (unterminated strings/brackets are closed; a dangling
+   half-written key is dropped).
+2. Types - a string where a list is expected ("Python, SQL" → ["Python", "SQL"]),
+   a list or dict where a string is expected, "5+ years" for a float, the
+   schema echoed back as {"properties": {...}}.
+3. Salvage - list entries that are still invalid (e.g. a project without a
+   name) are dropped individually instead of failing the whole resume.
+
+Required values are never made up: an entry missing one is dropped, and an
+answer without a candidate_name is a failure (re-call), not "Unknown".
+
+Only if all of that fails does the caller fall back to a new LLM call.
+REPAIR_STATS counts clean parses, repairs (= LLM calls saved) and failures
+(= re-calls) per process.
+
+Usage:
+    parser = RepairingOutputParser(pydantic_object=ParsedResume)
+    parsed = parser.invoke(message)    # drop-in for PydanticOutputParser
+    print(repair_report())
+"""
+
+import ast
+import json
+import re
+import threading
+import types
+from typing import Any, Optional, Union, get_args, get_origin
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, ValidationError
+
+MAX_TRUNCATION_BACKOFF = 20  # cut back to an earlier comma at most this many times
+
+REPAIR_STATS = {"clean": 0, "repaired": 0, "salvaged": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_PYTHON_LITERAL = re.compile(r'(?<=[:\[,\s])(None|True|False)(?=\s*[,}\]])')
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_LIST_SEPARATOR = re.compile(r"\s*(?:\n|;|,|•|\|)\s*")
+
+
+def _record(outcome: str) -> None:
+    with _stats_lock:
+        REPAIR_STATS[outcome] += 1
+
+
+def repair_report() -> dict:
+    """Counts for this process plus the share of failed answers fixed without a new call"""
+    with _stats_lock:
+        stats = dict(REPAIR_STATS)
+    broken = stats["repaired"] + stats["failed"]
+    stats["llm_calls_saved"] = stats["repaired"]
+    stats["recalls"] = stats["failed"]
+    stats["repair_rate"] = round(stats["repaired"] / broken, 3) if broken else 0.0
+    return stats
+
+
+# ─── 1. Syntax ──────────────────────────────────────────────────
+
+def _json_candidate(text: str) -> str:
+    """The JSON object inside an answer (fences and surrounding prose removed)"""
+    text = (text or "").strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    start = text.find("{")
+    if start == -1:
+        return text
+    end = text.rfind("}")
+    if end > start and _balanced(text[start:end + 1]):
+        return text[start:end + 1]
+    return text[start:]  # unbalanced: likely truncated, keep the tail for repair
+
+
+def _balanced(text: str) -> bool:
+    depth, in_string, escaped = 0, False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+    return depth == 0 and not in_string
+
+
+def _fix_syntax(text: str) -> str:
+    text = text.replace("“", '"').replace("”", '"').replace("’", "'")
+    text = _TRAILING_COMMA.sub(r"\1", text)
+    return _PYTHON_LITERAL.sub(lambda m: {"None": "null", "True": "true", "False": "false"}[m.group(1)], text)
+
+
+def repair_json(text: str) -> Optional[dict]:
+    """Best-effort dict from a malformed or truncated JSON answer; None if hopeless"""
+    candidate = _json_candidate(text)
+    for attempt in (candidate, _fix_syntax(candidate)):
+        try:
+            data = json.loads(attempt)
+            return data if isinstance(data, dict) else None
+        except json.JSONDecodeError:
+            pass
+    try:
+        data = ast.literal_eval(candidate)  # Python dict syntax ('single quotes', None)
+        if isinstance(data, dict):
+            return data
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+
+    # Truncated answer: close what is open; if the tail is unparseable, cut back to an earlier comma
+    fixed = _fix_syntax(candidate)
+    for _ in range(MAX_TRUNCATION_BACKOFF):
+        try:
+            data = parse_partial_json(fixed)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return data
+        cut = fixed.rfind(",")
+        if cut <= 0:
+            break
+        fixed = fixed[:cut]
+    return None
+
+
+# ─── 2. Types / 3. Salvage ──────────────────────────────────────
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return annotation, False
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_as_text(item)}" for key, item in value.items())
+    if isinstance(value, list):
+        return ", ".join(_as_text(item) for item in value)
+    return str(value)
+
+
+def _coerce_value(value: Any, annotation) -> tuple[Any, bool]:
+    """(coerced value, whether entries had to be dropped)"""
+    annotation, _ = _unwrap_optional(annotation)
+    if value is None:
+        return None, False
+
+    if get_origin(annotation) is list:
+        (item_type,) = get_args(annotation) or (str,)
+        if isinstance(value, str):
+            value = [part for part in _LIST_SEPARATOR.split(value) if part]
+        elif isinstance(value, dict):
+            value = [value] if isinstance(item_type, type) and issubclass(item_type, BaseModel) else list(value.values())
+        elif not isinstance(value, list):
+            value = [value]
+        items, dropped = [], False
+        for item in value:
+            if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+                model = coerce_to_model(item, item_type) if isinstance(item, dict) else None
+                if model is None:
+                    dropped = True
+                    continue
+                items.append(model)
+            elif item is not None and _as_text(item).strip():
+                items.append(_as_text(item).strip())
+        return items, dropped
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return (coerce_to_model(value, annotation) if isinstance(value, dict) else None), False
+    if annotation is str:
+        return _as_text(value), False
+    if annotation in (float, int):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value, False
+        match = _NUMBER.search(str(value))
+        return (annotation(float(match.group(0))) if match else None), False
+    return value, False
+
+
+def coerce_to_model(data: dict, model_cls: type[BaseModel], salvage: Optional[list] = None) -> Optional[BaseModel]:
+    """
+    Validate `data` against `model_cls`, fixing type mismatches field by field
+    and dropping invalid list entries. None if a required field is missing,
+    null or blank (a list entry is then dropped, a whole answer re-requested).
+    """
+    if "properties" in data and isinstance(data["properties"], dict) and not set(data) & set(model_cls.model_fields):
+        data = data["properties"]  # the model echoed the JSON schema with values inside
+
+    clean = {}
+    for name, field in model_cls.model_fields.items():
+        value, dropped = _coerce_value(data.get(name), field.annotation)
+        if dropped and salvage is not None:
+            salvage.append(name)
+        if field.is_required():
+            if value is None or (isinstance(value, str) and not value.strip()):
+                return None
+            clean[name] = value
+        elif name in data:
+            clean[name] = value
+
+    try:
+        return model_cls.model_validate(clean)
+    except ValidationError as e:
+        # Drop optional fields that still fail; give up if a required one does
+        for error in e.errors():
+            name = error["loc"][0] if error["loc"] else None
+            if name in clean and not model_cls.model_fields[name].is_required():
+                clean.pop(name)
+                if salvage is not None:
+                    salvage.append(name)
+        try:
+            return model_cls.model_validate(clean)
+        except ValidationError:
+            return None
+
+
+def repair_to_model(text: str, model_cls: type[BaseModel]) -> tuple[Optional[BaseModel], list]:
+    """(model or None, names of fields where entries were dropped)"""
+    data = repair_json(text)
+    if data is None:
+        return None, []
+    salvage = []
+    return coerce_to_model(data, model_cls, salvage), salvage
+
+
+class RepairingOutputParser(PydanticOutputParser):
+    """PydanticOutputParser that repairs locally before reporting a failure"""
+
+    def parse_result(self, result, *, partial: bool = False):
+        try:
+            parsed = super().parse_result(result, partial=partial)
+        except OutputParserException:
+            repaired, salvaged = repair_to_model(result[0].text, self.pydantic_object)
+            if repaired is None:
+                _record("failed")  # the caller will pay for another LLM call
+                raise
+            _record("repaired")
+            if salvaged:
+                _record("salvaged")
+                print(f"   🩹 Repaired LLM JSON (dropped invalid entries in: {', '.join(sorted(set(salvaged)))})")
+            else:
+                print("   🩹 Repaired LLM JSON locally (no re-call needed)")
+            return repaired
+        if not partial:
+            _record("clean")
+        return parsed
@@ -0,0 +1,245 @@
+# app/parsing/parse_cache.py
+"""
+Persistent cache of LLM parse results.
+
+Re-running process_all_resumes.py after a DB reset, or reparse scripts over
+resumes that did not change, would otherwise send the same text to the LLM
+again. Entries are keyed by:
+
+    sha256(normalized raw_text) + sha256(prompt template + format instructions) + model name
+
+so editing the prompt or the ParsedResume schema invalidates old entries
+automatically, and results from different models never mix. A hit returns the
+stored ParsedResume JSON without a network call.
+
+The cache lives in its own SQLite file (shared by every worker process).
+Entries older than PARSE_CACHE_MAX_AGE_DAYS are evicted, and when the stored
+JSON grows beyond PARSE_CACHE_MAX_MB the least recently used entries go first.
+
+Usage:
+    cache = get_parse_cache()
+    hit = cache.get(raw_text, prompt_hash, ["gpt-4o-mini"])
+    if hit is None:
+        parsed = ...call the LLM...
+        cache.put(raw_text, prompt_hash, "gpt-4o-mini", parsed)
+    print(cache.report())
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Optional
+
+from app.models.resume import ParsedResume
+
+PARSE_CACHE_DB_PATH = os.getenv(
+    "PARSE_CACHE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage", "parse_cache.db"),
+)
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+PARSE_CACHE_MAX_AGE_DAYS = float(os.getenv("PARSE_CACHE_MAX_AGE_DAYS", "90"))
+PARSE_CACHE_MAX_MB = float(os.getenv("PARSE_CACHE_MAX_MB", "200"))
+PRUNE_EVERY = 100  # writes between automatic eviction passes
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(raw_text: str) -> str:
+    """Canonical form for hashing: NFKC, collapsed whitespace, trimmed"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", raw_text or "")).strip()
+
+
+def text_hash(raw_text: str) -> str:
+    return hashlib.sha256(normalize_text(raw_text).encode("utf-8")).hexdigest()
+
+
+def prompt_fingerprint(*parts: str) -> str:
+    """Hash of everything that shapes the LLM output besides the resume text"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def model_name_of(llm_client) -> str:
+    """Model identifier of a LangChain chat model (ChatOpenAI/ChatGroq use model_name, Gemini uses model)"""
+    return str(getattr(llm_client, "model_name", None) or getattr(llm_client, "model", None) or type(llm_client).__name__)
+
+
+class ParseCache:
+    """SQLite-backed ParsedResume cache shared across processes"""
+
+    def __init__(self, db_path: str = PARSE_CACHE_DB_PATH,
+                 max_age_days: float = PARSE_CACHE_MAX_AGE_DAYS,
+                 max_mb: float = PARSE_CACHE_MAX_MB):
+        self.db_path = db_path
+        self.max_age_seconds = max_age_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._writes = 0
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                text_hash TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (text_hash, prompt_hash, model)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_cache_last_used ON parse_cache(last_used_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache_stats (
+                counter TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, counter: str, amount: int = 1) -> None:
+        conn.execute("""
+            INSERT INTO parse_cache_stats (counter, value) VALUES (?, ?)
+            ON CONFLICT(counter) DO UPDATE SET value = value + excluded.value
+        """, (counter, amount))
+
+    def get(self, raw_text: str, prompt_hash: str, models: list[str]) -> Optional[ParsedResume]:
+        """
+        Cached result for this text and prompt from any of `models`, preferring
+        the earliest model in the list. None on a miss.
+        """
+        key = text_hash(raw_text)
+        now = time.time()
+        conn = self._connect()
+        try:
+            placeholders = ",".join("?" * len(models))
+            rows = conn.execute(f"""
+                SELECT model, result_json FROM parse_cache
+                WHERE text_hash = ? AND prompt_hash = ? AND model IN ({placeholders})
+                  AND created_at >= ?
+            """, (key, prompt_hash, *models, now - self.max_age_seconds)).fetchall()
+
+            by_model = dict(rows)
+            for model in models:
+                if model in by_model:
+                    try:
+                        parsed = ParsedResume.model_validate_json(by_model[model])
+                    except ValueError:
+                        continue  # stored under an older schema; treat as a miss
+                    conn.execute("""
+                        UPDATE parse_cache SET hits = hits + 1, last_used_at = ?
+                        WHERE text_hash = ? AND prompt_hash = ? AND model = ?
+                    """, (now, key, prompt_hash, model))
+                    self._count(conn, "hits")
+                    return parsed
+
+            self._count(conn, "misses")
+            return None
+        finally:
+            conn.close()
+
+    def put(self, raw_text: str, prompt_hash: str, model: str, parsed: ParsedResume) -> None:
+        result_json = parsed.model_dump_json()
+        now = time.time()
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR REPLACE INTO parse_cache (
+                text_hash, prompt_hash, model, result_json, size_bytes, created_at, last_used_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (text_hash(raw_text), prompt_hash, model, result_json, len(result_json.encode("utf-8")), now, now))
+        self._count(conn, "stores")
+        conn.close()
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Evict expired entries, then least recently used ones above the size cap"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            evicted = conn.execute(
+                "DELETE FROM parse_cache WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM parse_cache").fetchone()[0]
+            if total > self.max_bytes:
+                doomed, freed = [], 0
+                for row in conn.execute("""
+                    SELECT rowid, size_bytes FROM parse_cache ORDER BY last_used_at
+                """):
+                    if total - freed <= self.max_bytes:
+                        break
+                    doomed.append((row[0],))
+                    freed += row[1]
+                conn.executemany("DELETE FROM parse_cache WHERE rowid = ?", doomed)
+                evicted += len(doomed)
+
+            if evicted:
+                self._count(conn, "evictions", evicted)
+            conn.execute("COMMIT")
+            return evicted
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def clear(self) -> int:
+        conn = self._connect()
+        removed = conn.execute("DELETE FROM parse_cache").rowcount
+        conn.execute("DELETE FROM parse_cache_stats")
+        conn.close()
+        return removed
+
+    def report(self) -> dict:
+        """Hit/miss counters plus current size, per model"""
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT counter, value FROM parse_cache_stats").fetchall())
+        models = {
+            model: {"entries": entries, "size_mb": round(size / (1024 * 1024), 2), "hits": hits}
+            for model, entries, size, hits in conn.execute("""
+                SELECT model, COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hits), 0)
+                FROM parse_cache GROUP BY model ORDER BY model
+            """)
+        }
+        conn.close()
+
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+            "entries": sum(m["entries"] for m in models.values()),
+            "size_mb": round(sum(m["size_mb"] for m in models.values()), 2),
+            "models": models,
+        }
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """Process-wide cache, or None when disabled with PARSE_CACHE_ENABLED=0"""
+    global _parse_cache
+    if not PARSE_CACHE_ENABLED:
+        return None
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
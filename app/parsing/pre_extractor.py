@@ -0,0 +1,371 @@
+# app/parsing/pre_extractor.py
+"""
+Rule-based pre-extraction that runs before the LLM parse call.
+
+Input tokens are the main cost and latency driver of parsing, yet a good part
+of every prompt is text that rules handle reliably:
+
+- contact details: email, phone and profile links (LinkedIn, GitHub, ...)
+- skills from a catalogue of canonical names and their aliases
+  ("sklearn" → "Scikit-learn", "k8s" → "Kubernetes")
+- page headers/footers repeated at the top or bottom of every page, page
+  numbers and boilerplate
+  such as declarations and "references available upon request"
+- runs of whitespace left behind by PDF extraction
+
+pre_extract() fills those fields itself and returns the remaining text; the
+LLM then only receives that text and the smaller ResumeLLMFields schema.
+merge_pre_extraction() combines both halves back into one ParsedResume.
+
+Usage:
+    pre = pre_extract(raw_text)
+    core = llm_parse(pre.text)                 # → ResumeLLMFields
+    parsed = merge_pre_extraction(core, pre)   # → ParsedResume
+"""
+
+import re
+from collections import Counter
+from typing import Optional
+
+from app.models.resume import ParsedResume, ResumeLLMFields
+
+# Bump when the rules change so cached parses made with older rules are not reused
+PRE_EXTRACTOR_VERSION = "3"
+
+# ─── Skill catalogue ────────────────────────────────────────────
+# canonical name → aliases (lowercase). The canonical name itself always matches.
+SKILL_CATALOG = {
+    "programming_languages": {
+        "Python": [],
+        "Java": [],
+        "JavaScript": ["js", "es6"],
+        "TypeScript": [],
+        "C++": ["cpp"],
+        "C#": ["csharp", "c sharp"],
+        "Go": ["golang"],
+        "Rust": [],
+        "Kotlin": [],
+        "Swift": [],
+        "PHP": [],
+        "Ruby": [],
+        "Scala": [],
+        "MATLAB": [],
+        "SQL": [],
+        "Bash": ["shell scripting"],
+        "HTML": ["html5"],
+        "CSS": ["css3"],
+        "Dart": [],
+    },
+    "frameworks": {
+        "PyTorch": [],
+        "TensorFlow": ["tensor flow"],
+        "Keras": [],
+        "Scikit-learn": ["sklearn", "scikit learn"],
+        "Hugging Face": ["huggingface", "hugging face transformers"],
+        "LangChain": ["lang chain"],
+        "LangGraph": [],
+        "OpenCV": ["open cv"],
+        "Pandas": [],
+        "NumPy": [],
+        "Matplotlib": [],
+        "React": ["react.js", "reactjs"],
+        "Angular": ["angularjs", "angular.js"],
+        "Vue.js": ["vue", "vuejs"],
+        "Next.js": ["nextjs"],
+        "Node.js": ["nodejs", "node"],
+        "Express.js": ["expressjs"],
+        "Django": [],
+        "Flask": [],
+        "FastAPI": ["fast api"],
+        "Spring Boot": ["springboot"],
+        "Flutter": [],
+        "Streamlit": [],
+        "Spark": ["pyspark", "apache spark"],
+        ".NET": ["dotnet", "asp.net"],
+        "Bootstrap": [],
+        "Tailwind CSS": ["tailwind", "tailwindcss"],
+    },
+    "tools": {
+        "Git": [],
+        "GitHub": [],
+        "GitLab": [],
+        "Docker": [],
+        "Kubernetes": ["k8s"],
+        "AWS": ["amazon web services"],
+        "Azure": ["microsoft azure"],
+        "GCP": ["google cloud", "google cloud platform"],
+        "Linux": [],
+        "Jenkins": [],
+        "Jira": [],
+        "Postman": [],
+        "VS Code": ["vscode", "visual studio code"],
+        "Jupyter": ["jupyter notebook", "jupyter notebooks"],
+        "Google Colab": ["colab"],
+        "Ollama": [],
+        "MySQL": [],
+        "PostgreSQL": ["postgres"],
+        "MongoDB": ["mongo"],
+        "SQLite": [],
+        "Redis": [],
+        "Firebase": [],
+        "Tableau": [],
+        "Power BI": ["powerbi"],
+        "Excel": ["ms excel", "microsoft excel"],
+        "Figma": [],
+        "ChromaDB": ["chroma"],
+        "Airflow": ["apache airflow"],
+        "Kafka": ["apache kafka"],
+        "Terraform": [],
+    },
+}
+
+# Names that are also ordinary English words: matched only when capitalized
+# like the skill ("Excel", not "excel at"); "go" is never matched, only "golang"
+CASE_SENSITIVE_SKILLS = {"swift", "rust", "ruby", "dart", "excel", "spark", "react", "flask", "node"}
+UNMATCHED_NAMES = {"go"}
+
+# Skills outside the categorized catalogue that are still written several ways.
+# Only used to canonicalize whole skill entries (never searched for in text).
+SKILL_SYNONYMS = {
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Artificial Intelligence": ["ai"],
+    "Natural Language Processing": ["nlp"],
+    "Generative AI": ["gen ai", "genai"],
+    "Large Language Models": ["llm", "llms", "large language model"],
+    "REST API": ["rest", "restful", "rest apis", "restful api", "restful apis"],
+}
+
+# alias/canonical (lowercase) → (category, canonical)
+_SKILL_INDEX = {}
+for _category, _skills in SKILL_CATALOG.items():
+    for _canonical, _aliases in _skills.items():
+        for _alias in [_canonical.lower(), *_aliases]:
+            _SKILL_INDEX[_alias] = (_category, _canonical)
+_MATCHED_ALIASES = [alias for alias in _SKILL_INDEX if alias not in UNMATCHED_NAMES]
+_SYNONYM_INDEX = {
+    alias: canonical
+    for canonical, aliases in SKILL_SYNONYMS.items()
+    for alias in [canonical.lower(), *aliases]
+}
+
+# Longest aliases first so "react.js" wins over "react"; skill chars like + # . may end a token
+_SKILL_PATTERN = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(alias) for alias in sorted(_MATCHED_ALIASES, key=len, reverse=True)) + r")(?![\w+#])",
+    re.IGNORECASE,
+)
+
+# ─── Contact / boilerplate patterns ────────────────────────────
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{8,}\d(?![\w/])")
+LINK_PATTERN = re.compile(
+    r"(?:https?://|www\.)\S+"
+    r"|(?:linkedin\.com|github\.com|gitlab\.com|kaggle\.com|leetcode\.com|medium\.com|behance\.net)/\S+",
+    re.IGNORECASE,
+)
+PAGE_NUMBER_LINE = re.compile(r"^\s*(?:page\s*\d+(?:\s*(?:of|/)\s*\d+)?|-?\s*\d+\s*-?|\d+\s*/\s*\d+)\s*$", re.IGNORECASE)
+BOILERPLATE_LINE = re.compile(
+    r"^\s*(?:curriculum\s+vitae|resume|r[ée]sum[ée]|cv|references?\s+(?:are\s+)?available\s+(?:up)?on\s+request\.?"
+    r"|(?:date|place)\s*:.{0,40})\s*$",
+    re.IGNORECASE,
+)
+PAGE_NUMBER_TEXT = re.compile(r"page\s*\d+(?:\s*(?:of|/)\s*\d+)?", re.IGNORECASE)
+DECLARATION_START = re.compile(r"^\s*(?:declaration\b|i\s+hereby\s+declare)", re.IGNORECASE)
+MIN_REPEATED_LINE_CHARS = 15  # shorter repeated lines are usually real content ("Python", "Intern")
+PAGE_BREAK = "\f"  # extract_text_from_pdf separates pages with a form feed
+HEADER_FOOTER_LINES = 2  # lines at the top and bottom of a page that can be a header/footer
+YEAR_RUN = re.compile(r"(?:(?:19|20)\d\d\D*)+")  # "2016 - 2020 2021" is dates, not a phone
+MIN_PHONE_DIGITS = 10
+MAX_PHONE_DIGITS = 15
+
+
+class PreExtraction:
+    """Fields found by rules plus the reduced text for the LLM"""
+
+    def __init__(self, text: str, email: Optional[str] = None, phone: Optional[str] = None,
+                 links: Optional[list[str]] = None, skills: Optional[dict] = None,
+                 removed_lines: int = 0):
+        self.text = text
+        self.email = email
+        self.phone = phone
+        self.links = links or []
+        # {"programming_languages": [...], "frameworks": [...], "tools": [...]}
+        self.skills = skills or {category: [] for category in SKILL_CATALOG}
+        self.removed_lines = removed_lines
+        self.original_chars = 0
+        # Filled by the parser once prompts are built
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @property
+    def known_skills(self) -> list[str]:
+        return [skill for skills in self.skills.values() for skill in skills]
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+    def savings_report(self) -> str:
+        # Section-parallel calls repeat the instructions, so the change can be positive
+        change = (self.tokens_after - self.tokens_before) / self.tokens_before if self.tokens_before else 0.0
+        return (f"✂️  Pre-extraction: {self.tokens_before:,} → {self.tokens_after:,} input tokens "
+                f"({change:+.0%}, {self.removed_lines} boilerplate lines, {len(self.known_skills)} skills)")
+
+
+def canonicalize_skill(skill: str) -> tuple[Optional[str], str]:
+    """
+    (category, canonical name) for a catalogued skill, (None, canonical name)
+    for a SKILL_SYNONYMS entry, else (None, stripped input)
+    """
+    cleaned = " ".join((skill or "").split())
+    match = _SKILL_INDEX.get(cleaned.lower())
+    if match:
+        return match
+    return None, _SYNONYM_INDEX.get(cleaned.lower(), cleaned)
+
+
+def find_skills(text: str) -> dict:
+    """Catalogued skills mentioned in text, grouped by category, first-seen order"""
+    found = {category: [] for category in SKILL_CATALOG}
+    seen = set()
+    for match in _SKILL_PATTERN.finditer(text):
+        alias = match.group(1).lower()
+        if alias in CASE_SENSITIVE_SKILLS and not match.group(1)[0].isupper():
+            continue
+        category, canonical = _SKILL_INDEX[alias]
+        if canonical not in seen:
+            seen.add(canonical)
+            found[category].append(canonical)
+    return found
+
+
+def _find_phone(text: str) -> Optional[str]:
+    for match in PHONE_PATTERN.finditer(text):
+        digits = re.sub(r"\D", "", match.group(0))
+        if YEAR_RUN.fullmatch(match.group(0).strip()):
+            continue
+        if MIN_PHONE_DIGITS <= len(digits) <= MAX_PHONE_DIGITS:
+            return match.group(0).strip()
+    return None
+
+
+def strip_boilerplate(text: str) -> tuple[str, int]:
+    """
+    Drop page numbers, boilerplate lines, declaration paragraphs and repeated
+    page headers/footers. A header (footer) is a long line found within the first
+    (last) HEADER_FOOTER_LINES lines of two or more pages; only its first
+    occurrence is kept. The same line repeated in the body ("Senior Software
+    Engineer" under two employers) is content and stays. Text without page
+    breaks has no headers/footers to find. Returns (text, removed line count).
+    """
+    pages = [[line.strip() for line in page.splitlines()] for page in text.split(PAGE_BREAK)]
+    # Headers/footers repeat verbatim apart from an embedded page number
+    repeat_key = lambda line: " ".join(PAGE_NUMBER_TEXT.sub(" ", line.lower()).split())
+
+    def edges(lines):
+        # (top, bottom) positions; page numbers do not take up a header/footer slot
+        filled = [position for position, line in enumerate(lines) if line and not PAGE_NUMBER_LINE.match(line)]
+        size = max(1, min(HEADER_FOOTER_LINES, len(filled) // 3))  # top and bottom never reach the middle
+        return set(filled[:size]), set(filled[-size:])
+
+    page_edges = [edges(lines) for lines in pages]
+    # Pages whose top (or bottom) lines contain each key; a header must repeat at the top, a footer at the bottom
+    counts = [Counter(
+        key
+        for lines, positions in zip(pages, page_edges)
+        for key in {repeat_key(lines[position]) for position in positions[side]
+                    if len(lines[position]) >= MIN_REPEATED_LINE_CHARS}
+    ) for side in (0, 1)]
+
+    kept, removed, seen, in_declaration = [], 0, set(), False
+    for lines, positions in zip(pages, page_edges):
+        for position, line in enumerate(lines):
+            if not line:
+                in_declaration = False  # a declaration runs to the end of its paragraph
+                kept.append(line)
+                continue
+            if in_declaration or DECLARATION_START.match(line):
+                in_declaration = True
+                removed += 1
+                continue
+            if PAGE_NUMBER_LINE.match(line) or BOILERPLATE_LINE.match(line):
+                removed += 1
+                continue
+            key = repeat_key(line)
+            if any(position in positions[side] and counts[side][key] > 1 for side in (0, 1)):
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+            kept.append(line)
+    return "\n".join(kept), removed
+
+
+def pre_extract(raw_text: str) -> PreExtraction:
+    """Run all rules over raw_text (see module docstring)"""
+    raw_text = raw_text or ""
+    emails = EMAIL_PATTERN.findall(raw_text)
+    text = EMAIL_PATTERN.sub(" ", raw_text)
+
+    links = []
+    for link in LINK_PATTERN.findall(text):
+        link = link.rstrip(".,;|)")
+        if link not in links:
+            links.append(link)
+    text = LINK_PATTERN.sub(" ", text)
+
+    phone = _find_phone(text)
+    if phone:
+        text = text.replace(phone, " ")
+
+    skills = find_skills(text)
+    text, removed_lines = strip_boilerplate(text)
+
+    # Collapse whitespace and the separators left where contact details were
+    text = re.sub(r"[ \t]*\|[ \t]*(?=\||$)", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^[ \t]*\|[ \t]*", "", text, flags=re.MULTILINE)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+    pre = PreExtraction(
+        text=text,
+        email=emails[0] if emails else None,
+        phone=phone,
+        links=links,
+        skills=skills,
+        removed_lines=removed_lines,
+    )
+    pre.original_chars = len(raw_text)
+    return pre
+
+
+def merge_pre_extraction(core: ResumeLLMFields, pre: PreExtraction) -> ParsedResume:
+    """Combine the LLM's ResumeLLMFields with the rule-extracted fields"""
+    skills = {category: list(found) for category, found in pre.skills.items()}
+    known = {skill.lower() for skill in pre.known_skills}
+    other_skills = []
+    for skill in core.technical_skills:
+        category, canonical = canonicalize_skill(skill)
+        if not canonical or canonical.lower() in known:
+            continue
+        known.add(canonical.lower())
+        if category:
+            skills[category].append(canonical)
+        else:
+            other_skills.append(canonical)
+
+    additional_information = core.additional_information
+    if pre.links:
+        links_line = "Links: " + ", ".join(pre.links)
+        additional_information = f"{additional_information}\n{links_line}" if additional_information else links_line
+
+    return ParsedResume(
+        **core.model_dump(exclude={"technical_skills", "additional_information"}),
+        email=pre.email,
+        phone=pre.phone,
+        programming_languages=skills["programming_languages"],
+        frameworks=skills["frameworks"],
+        tools=skills["tools"],
+        technical_skills=other_skills,
+        additional_information=additional_information,
+    )
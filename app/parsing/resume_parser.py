@@ -2,47 +2,80 @@
 from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
-from app.models.resume import ParsedResume
+from app.models.resume import ParsedResume, ResumeLLMFields
+from app.parsing.json_repair import RepairingOutputParser
+from app.parsing.parse_cache import get_parse_cache, model_name_of, prompt_fingerprint
+from app.parsing.pre_extractor import PRE_EXTRACTOR_VERSION, merge_pre_extraction, pre_extract
+from app.parsing.section_parser import (
+    LONG_RESUME_CHARS, SECTION_INSTRUCTIONS, SECTION_MAX_CHARS, SECTION_PARSE_WORKERS, SECTION_PARSERS, SECTIONS,
+    build_section_prompt, changed_sections, chunk_section, merge_sections, plan_sections, reuse_section,
+    section_prompt
+)
 from app.utils.experience_calculator import calculate_years_of_experience
+from app.utils.rate_limiter import (
+    add_usage, estimate_tokens, get_rate_limiter, is_rate_limit_error, retry_after_from_error
+)
+from app.db.init_db import DB_PATH
+from app.db.resume_facets import normalize_location, write_resume_facets, write_resume_locations
+from app.db.resume_skills import resume_skill_rows, write_resume_skills
+from app.db.write_queue import get_write_queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+import threading
+import time
 import uuid
 import json
 import os
 import sqlite3
-import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # ============= LLM Setup =============
 
+PARSE_MAX_TOKENS = 4096
+# Rule-based pre-extraction of contacts/skills/boilerplate before the LLM call (PRE_EXTRACTION=0 disables)
+PRE_EXTRACTION_ENABLED = os.getenv("PRE_EXTRACTION", "1") not in ("0", "false", "False")
+# Batched persistence: parser workers commit every N resumes or T seconds
+PARSE_COMMIT_EVERY = int(os.getenv("PARSE_COMMIT_EVERY", "20"))
+PARSE_COMMIT_SECONDS = float(os.getenv("PARSE_COMMIT_SECONDS", "2"))
+
 # Primary LLM: OpenAI
 llm_openai = ChatOpenAI(
     model="gpt-4o-mini",
     temperature=0.1,
-    max_tokens=4096,
-    openai_api_key=os.environ["OPENAI_API_KEY"]
+    max_tokens=PARSE_MAX_TOKENS,
+    openai_api_key=os.environ["OPENAI_API_KEY"],
+    include_response_headers=True  # x-ratelimit-* headers feed the rate limiter
 )
 
 # Fallback LLM 1: Groq
 llm_groq = ChatGroq(
     model="llama-3.3-70b-versatile",
     temperature=0.1,
-    max_tokens=4096
+    max_tokens=PARSE_MAX_TOKENS
 )
 
 # Fallback LLM 2: Gemini
 llm_gemini = ChatGoogleGenerativeAI(
     model="gemini-2.0-flash",
     temperature=0.1,
-    max_tokens=4096
+    max_tokens=PARSE_MAX_TOKENS
 )
 
+# Fallback order: OpenAI -> Groq -> Gemini
+PROVIDERS = [
+    ("openai", "OpenAI", llm_openai),
+    ("groq", "Groq", llm_groq),
+    ("gemini", "Gemini", llm_gemini),
+]
+
 # Use OpenAI as default
 llm = llm_openai
 
-parser = PydanticOutputParser(pydantic_object=ParsedResume)
+# Repairs malformed/truncated JSON locally before a failure costs another LLM call
+parser = RepairingOutputParser(pydantic_object=ParsedResume)
 
 prompt = PromptTemplate(
     template="""You are a resume parsing assistant. Extract structured information from the following resume text.
@@ -91,82 +124,208 @@ Return ONLY valid JSON matching the schema above. Be precise and thorough.""",
 # Create OpenAI chain
 chain = prompt | llm | parser
 
+# Reduced prompt used after pre-extraction: no contact fields, no skill categorisation
+core_parser = RepairingOutputParser(pydantic_object=ResumeLLMFields)
+
+compact_prompt = PromptTemplate(
+    template="""You are a resume parsing assistant. Extract structured information from the following resume text.
+Contact details were already extracted and removed from the text.
+
+SKILLS:
+- Already found: {known_skills}
+- technical_skills: list only technical skills, languages, frameworks and tools NOT already found
+
+WORK EXPERIENCE:
+- company (required), role ("Unknown" if not specified), start_date and end_date separately (e.g. "January 2021", "Present"), responsibilities as a list
+- Leave total_experience_years null unless explicitly stated
+
+EDUCATION:
+- institute (required), degree ("Unknown" or descriptive text like "Schooling" if unclear), year
+
+PROJECTS:
+- Every project (personal, academic, professional): name, description, technologies, duration, role
+
+ADDITIONAL INFORMATION:
+- Every other section (achievements, awards, publications, certifications, languages, etc.) as "Section: ..." text
+
+For missing or unclear fields, use "Unknown" or descriptive placeholders instead of null/None.
+
+{format_instructions}
+
+Resume Text:
+{resume_text}
+
+Return ONLY valid JSON matching the schema above.""",
+    input_variables=["resume_text", "known_skills"],
+    partial_variables={"format_instructions": core_parser.get_format_instructions()}
+)
+
+# Parse-cache key component: changes whenever the prompt or ParsedResume schema changes
+if PRE_EXTRACTION_ENABLED:
+    PROMPT_HASH = prompt_fingerprint(
+        compact_prompt.template, core_parser.get_format_instructions(),
+        parser.get_format_instructions(), PRE_EXTRACTOR_VERSION,
+        section_prompt.template, *SECTION_INSTRUCTIONS.values(),
+        *(section_parser.get_format_instructions() for section_parser in SECTION_PARSERS.values()),
+        str(LONG_RESUME_CHARS), str(SECTION_MAX_CHARS)
+    )
+else:
+    PROMPT_HASH = prompt_fingerprint(prompt.template, parser.get_format_instructions())
+PROVIDER_MODELS = [model_name_of(llm_client) for _, _, llm_client in PROVIDERS]
+
+
+def prepare_parse(raw_text: str, verbose: bool = True):
+    """
+    Plan the LLM calls for one resume.
+
+    - Pre-extraction disabled: one call with the full prompt and schema.
+    - Otherwise: rules fill contacts/skills first, then one call with the
+      reduced text and ResumeLLMFields schema - or, for long resumes, one call
+      per section/chunk (see section_parser.py) to be run concurrently.
+      The input-token savings against the full prompt are printed per resume.
+
+    Returns:
+        (requests, combine): requests is a list of (prompt_value, finish) where
+        finish(message) parses one answer; combine(results) -> ParsedResume
+    """
+    if not PRE_EXTRACTION_ENABLED:
+        return [(prompt.invoke({"resume_text": raw_text}), parser.invoke)], lambda results: results[0]
+
+    pre = pre_extract(raw_text)
+    pre.tokens_before = estimate_tokens(prompt.format(resume_text=raw_text))
+
+    sections = plan_sections(pre)
+    if sections:
+        requests = [
+            (build_section_prompt(section, text, pre), SECTION_PARSERS[section].invoke)
+            for section, text in sections
+        ]
+        combine = lambda results: merge_sections(
+            [(section, result) for (section, _), result in zip(sections, results)], pre
+        )
+    else:
+        prompt_value = compact_prompt.invoke({
+            "resume_text": pre.text,
+            "known_skills": ", ".join(pre.known_skills) or "none",
+        })
+        requests = [(prompt_value, core_parser.invoke)]
+        combine = lambda results: merge_pre_extraction(results[0], pre)
+
+    pre.tokens_after = sum(estimate_tokens(prompt_value.to_string()) for prompt_value, _ in requests)
+    if verbose:
+        print(f"   {pre.savings_report()}")
+        if sections:
+            print(f"   📑 Long resume: {len(requests)} concurrent section calls "
+                  f"({', '.join(section for section, _ in sections)})")
+    return requests, combine
+
+
+def _invoke_provider(provider: str, llm_client, prompt_value, finish, usage: Optional[dict] = None):
+    """One LLM call, gated by the shared rate limiter for `provider`"""
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = rate_limiter.expected_tokens(provider, prompt_value.to_string(), PARSE_MAX_TOKENS)
+
+    rate_limiter.acquire(provider, estimated_tokens)
+    try:
+        message = llm_client.invoke(prompt_value)
+    except Exception as e:
+        if is_rate_limit_error(e):
+            rate_limiter.on_rate_limited(provider, retry_after_from_error(e))
+        raise
+    rate_limiter.record_response(provider, estimated_tokens, message)
+    result = finish(message)
+    add_usage(usage, provider, model_name_of(llm_client), message)
+    return result
 
-def parse_resume_with_llm(raw_text: str, max_retries: int = 3) -> ParsedResume:
-    """Parse resume text using LLM with fallback: OpenAI -> Groq -> Gemini"""
+
+def _parse_with_fallback(prompt_value, finish, max_retries: int = 3, usage: Optional[dict] = None):
+    """Run one planned request with fallback: OpenAI -> Groq -> Gemini. Returns (result, model name)"""
     
-    # Try OpenAI first
-    for attempt in range(max_retries):
-        try:
-            result = chain.invoke({"resume_text": raw_text})
-            return result
-        except Exception as e:
-            error_str = str(e).lower()
-            
-            # Check if it's a rate limit error
-            if "rate" in error_str or "429" in error_str or "limit" in error_str or "quota" in error_str:
-                if attempt < max_retries - 1:
-                    wait_time = 10 * (2 ** attempt)
-                    print(f"   ⏸️  OpenAI rate limited (attempt {attempt + 1}/{max_retries}). Waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    # OpenAI exhausted, try Groq
-                    print("   ⚠️  OpenAI rate limit exhausted, falling back to Groq...")
+    for index, (provider, label, llm_client) in enumerate(PROVIDERS):
+        is_last = index == len(PROVIDERS) - 1
+        for attempt in range(max_retries):
+            try:
+                return _invoke_provider(provider, llm_client, prompt_value, finish, usage), model_name_of(llm_client)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    # The limiter now blocks this provider until its quota refills,
+                    # so the next attempt waits in acquire() instead of sleeping here
+                    if attempt < max_retries - 1:
+                        print(f"   ⏸️  {label} rate limited (attempt {attempt + 1}/{max_retries}). Waiting for quota...")
+                        continue
+                    if is_last:
+                        raise Exception(f"❌ All LLMs (OpenAI, Groq, Gemini) rate limited or exhausted after {max_retries} attempts each")
+                    print(f"   ⚠️  {label} rate limit exhausted, falling back to {PROVIDERS[index + 1][1]}...")
                     break
-            else:
-                # Non-rate-limit error from OpenAI, try Groq immediately
-                print(f"   ⚠️  OpenAI error, trying Groq: {str(e)}")
+                if is_last:
+                    raise Exception(f"❌ {label} API error: {str(e)}")
+                print(f"   ⚠️  {label} error, trying {PROVIDERS[index + 1][1]}: {str(e)}")
                 break
     
-    # Fallback to Groq
-    chain_groq = prompt | llm_groq | parser
-    for attempt in range(max_retries):
-        try:
-            result = chain_groq.invoke({"resume_text": raw_text})
-            return result
-        except Exception as e:
-            error_str = str(e).lower()
-            
-            if "rate" in error_str or "429" in error_str or "limit" in error_str:
-                if attempt < max_retries - 1:
-                    wait_time = 15 * (2 ** attempt)
-                    print(f"   ⏸️  Groq rate limited (attempt {attempt + 1}/{max_retries}). Waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    # Groq exhausted, try Gemini
-                    print("   ⚠️  Groq rate limit exhausted, falling back to Gemini...")
-                    break
-            else:
-                # Non-rate-limit error from Groq, try Gemini
-                print(f"   ⚠️  Groq error, trying Gemini: {str(e)}")
-                break
+    raise Exception("❌ Maximum retries exceeded for all LLM providers")
+
+
+def parse_resume_with_llm(raw_text: str, max_retries: int = 3, use_cache: bool = True,
+                          usage: Optional[dict] = None) -> ParsedResume:
+    """
+    Parse resume text using LLM with fallback: OpenAI -> Groq -> Gemini.
+    `usage`, if given, receives the provider/model and token counts of the calls.
+    """
     
-    # Final fallback to Gemini
-    chain_gemini = prompt | llm_gemini | parser
-    for attempt in range(max_retries):
-        try:
-            result = chain_gemini.invoke({"resume_text": raw_text})
-            return result
-        except Exception as e:
-            error_str = str(e).lower()
-            
-            if "rate" in error_str or "429" in error_str or "limit" in error_str:
-                if attempt < max_retries - 1:
-                    wait_time = 20 * (2 ** attempt)
-                    print(f"   ⏸️  Gemini rate limited (attempt {attempt + 1}/{max_retries}). Waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    raise Exception(f"❌ All LLMs (OpenAI, Groq, Gemini) rate limited or exhausted after {max_retries} attempts each")
-            else:
-                raise Exception(f"❌ Gemini API error: {str(e)}")
+    cache = get_parse_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(raw_text, PROMPT_HASH, PROVIDER_MODELS)
+        if cached is not None:
+            if usage is not None:
+                usage["cache_hit"] = True
+            return cached
     
-    raise Exception("❌ Maximum retries exceeded for all LLM providers")
+    requests, combine = prepare_parse(raw_text)
+    if len(requests) == 1:
+        outcomes = [_parse_with_fallback(*requests[0], max_retries, usage)]
+    else:
+        # Long-document mode: sections are independent calls, run them side by side
+        with ThreadPoolExecutor(max_workers=min(len(requests), SECTION_PARSE_WORKERS)) as pool:
+            outcomes = list(pool.map(lambda request: _parse_with_fallback(*request, max_retries, usage), requests))
+    
+    parsed = combine([result for result, _ in outcomes])
+    if cache is not None:
+        cache.put(raw_text, PROMPT_HASH, outcomes[0][1], parsed)
+    return parsed
 
 
-def save_parsed_resume(document_id: str, parsed_resume: ParsedResume) -> str:
-    """Save parsed resume data to database and update document status"""
+def parse_changed_sections(raw_text: str, previous_text: str, previous: ParsedResume,
+                           usage: Optional[dict] = None) -> ParsedResume:
+    """
+    Parse a near-duplicate of an already parsed resume: sections whose text is
+    unchanged are copied from `previous`, only the changed ones go to the LLM.
+    """
+    pre = pre_extract(raw_text)
+    sections, changed = changed_sections(pre.text, pre_extract(previous_text).text)
     
-    resume_id = str(uuid.uuid4())
+    parts, requests = [], []
+    for section in SECTIONS:
+        if section not in sections:
+            continue
+        if section not in changed:
+            parts.append((section, reuse_section(section, previous, changed)))
+            continue
+        for text in chunk_section(sections[section]):
+            parts.append((section, None))
+            requests.append((len(parts) - 1, build_section_prompt(section, text, pre), SECTION_PARSERS[section].invoke))
+    
+    print(f"   ♻️  Near-duplicate: re-parsing {', '.join(changed) or 'nothing'} "
+          f"({len(requests)} LLM calls), reusing {', '.join(s for s in sections if s not in changed) or 'nothing'}")
+    if requests:
+        with ThreadPoolExecutor(max_workers=min(len(requests), SECTION_PARSE_WORKERS)) as pool:
+            outcomes = list(pool.map(lambda request: _parse_with_fallback(request[1], request[2], usage=usage), requests))
+        for (position, _, _), (result, _) in zip(requests, outcomes):
+            parts[position] = (parts[position][0], result)
+    return merge_sections(parts, pre)
+
+
+def _parsed_resume_row(resume_id: str, document_id: str, parsed_resume: ParsedResume) -> tuple:
+    """parsed_resumes row values (fills experience years, merges skill categories)"""
     
     # Auto-calculate total_experience_years if LLM didn't provide it
     if parsed_resume.total_experience_years is None or parsed_resume.total_experience_years == 0:
@@ -182,24 +341,8 @@ def save_parsed_resume(document_id: str, parsed_resume: ParsedResume) -> str:
         parsed_resume.tools + 
         parsed_resume.technical_skills
     ))
-    skills_json = json.dumps(all_skills)
-    
-    work_json = json.dumps([job.model_dump() for job in parsed_resume.work_experience])
-    education_json = json.dumps([edu.model_dump() for edu in parsed_resume.education])
-    projects_json = json.dumps([proj.model_dump() for proj in parsed_resume.projects])
-    
-    # Connect to database
-    conn = sqlite3.connect("resumes.db")
-    cursor = conn.cursor()
-    
-    # Insert parsed resume data with additional_information field
-    cursor.execute("""
-        INSERT INTO parsed_resumes (
-            resume_id, document_id, candidate_name, email, phone, location,
-            total_experience_years, current_role, skills,
-            work_experience, education, projects, additional_information
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    
+    return (
         resume_id,
         document_id,
         parsed_resume.candidate_name,
@@ -208,21 +351,158 @@ def save_parsed_resume(document_id: str, parsed_resume: ParsedResume) -> str:
         parsed_resume.location,
         parsed_resume.total_experience_years,
         parsed_resume.current_role,
-        skills_json,
-        work_json,
-        education_json,
-        projects_json,
-        parsed_resume.additional_information  # NEW
-    ))
+        json.dumps(all_skills),
+        json.dumps([job.model_dump() for job in parsed_resume.work_experience]),
+        json.dumps([edu.model_dump() for edu in parsed_resume.education]),
+        json.dumps([proj.model_dump() for proj in parsed_resume.projects]),
+        parsed_resume.additional_information,
+        normalize_location(parsed_resume.location) or None
+    )
+
+
+def save_parsed_resumes(
+    items: list[tuple[str, ParsedResume]],
+    resume_ids: Optional[list[str]] = None,
+    db_path: str = DB_PATH
+) -> list[str]:
+    """
+    Save many (document_id, ParsedResume) pairs in a single transaction and
+    mark their documents as parsed. Returns the resume_ids in input order.
+    The write goes through the database's single-writer queue.
+    """
+    if not items:
+        return []
+    resume_ids = resume_ids or [str(uuid.uuid4()) for _ in items]
+    rows = [
+        _parsed_resume_row(resume_id, document_id, parsed_resume)
+        for resume_id, (document_id, parsed_resume) in zip(resume_ids, items)
+    ]
+    
+    def write(conn: sqlite3.Connection) -> None:
+        conn.executemany("""
+            INSERT INTO parsed_resumes (
+                resume_id, document_id, candidate_name, email, phone, location,
+                total_experience_years, current_role, skills,
+                work_experience, education, projects, additional_information, location_norm
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        
+        # Normalized skill, employer and education rows for indexed filters
+        write_resume_skills(conn, {
+            row[0]: resume_skill_rows(row[0], json.loads(row[8])) for row in rows
+        })
+        write_resume_facets(conn, {
+            resume_id: (parsed_resume.work_experience, parsed_resume.education)
+            for resume_id, (_, parsed_resume) in zip(resume_ids, items)
+        })
+        write_resume_locations(conn, {
+            resume_id: parsed_resume.location for resume_id, (_, parsed_resume) in zip(resume_ids, items)
+        })
+        
+        # Update document status from 'extracted' to 'parsed'
+        conn.executemany("""
+            UPDATE documents
+            SET status = 'parsed'
+            WHERE document_id = ?
+        """, [(document_id,) for document_id, _ in items])
+    
+    get_write_queue(db_path).submit(write).result()
+    return resume_ids
+
+
+def save_parsed_resume(document_id: str, parsed_resume: ParsedResume) -> str:
+    """Save parsed resume data to database and update document status"""
+    return save_parsed_resumes([(document_id, parsed_resume)])[0]
+
+
+class ParsedResumeWriter:
+    """
+    Buffers parsed resumes from any number of parser threads and writes them
+    with save_parsed_resumes() every `flush_every` resumes or `flush_interval`
+    seconds, whichever comes first, so one commit covers many resumes.
+    
+    Usage:
+        with ParsedResumeWriter(on_flush=forward) as writer:
+            resume_id = writer.add(document_id, parsed)   # row written on next flush
+    
+    on_flush(entries, error) runs after every flush with the flushed
+    [(document_id, resume_id, context), ...] and None, or the error message
+    if the transaction failed (nothing from that batch was saved).
+    """
+    
+    def __init__(
+        self,
+        flush_every: int = PARSE_COMMIT_EVERY,
+        flush_interval: float = PARSE_COMMIT_SECONDS,
+        db_path: str = DB_PATH,
+        on_flush: Optional[Callable[[list[tuple], Optional[str]], None]] = None
+    ):
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.db_path = db_path
+        self.on_flush = on_flush
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # keeps batches in order
+        self._closed = threading.Event()
+        self._timer = None
+    
+    def add(self, document_id: str, parsed_resume: ParsedResume, context=None) -> str:
+        """Queue a resume for the next flush; returns its resume_id right away"""
+        resume_id = str(uuid.uuid4())
+        with self._lock:
+            if self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Thread(target=self._flush_on_interval, daemon=True)
+                self._timer.start()
+            self._buffer.append((document_id, parsed_resume, resume_id, context))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.flush_every
+        if full:
+            self.flush()
+        return resume_id
+    
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of resumes written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer, self._oldest = self._buffer, [], None
+            if not batch:
+                return 0
+            
+            error = None
+            try:
+                save_parsed_resumes(
+                    [(document_id, parsed_resume) for document_id, parsed_resume, _, _ in batch],
+                    resume_ids=[resume_id for _, _, resume_id, _ in batch],
+                    db_path=self.db_path
+                )
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            
+            if self.on_flush:
+                self.on_flush([(document_id, resume_id, context) for document_id, _, resume_id, context in batch], error)
+            elif error:
+                raise Exception(f"❌ Failed to save {len(batch)} parsed resumes: {error}")
+            return 0 if error else len(batch)
+    
+    def _flush_on_interval(self):
+        while not self._closed.wait(max(0.05, min(self.flush_interval / 2, 1.0))):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
     
-    # Update document status from 'extracted' to 'parsed'
-    cursor.execute("""
-        UPDATE documents
-        SET status = 'parsed'
-        WHERE document_id = ?
-    """, (document_id,))
+    def close(self) -> None:
+        """Flush what is left and stop the interval thread"""
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
     
-    conn.commit()
-    conn.close()
+    def __enter__(self):
+        return self
     
-    return resume_id
\ No newline at end of file
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,278 @@
+# app/parsing/section_parser.py
+"""
+Section-parallel parsing for long resumes.
+
+A senior profile with 15+ projects turns into one huge prompt whose JSON answer
+runs into max_tokens and gets truncated, and every retry repeats the whole
+round-trip. In long-document mode the (pre-extracted) text is split into its
+experience, projects, education and other sections; each section - chunked
+further if it is still large - is parsed by its own LLM call with a
+section-specific sub-schema, the calls run concurrently, and the parts are
+merged back into one ParsedResume.
+
+Resume parsers use this through resume_parser.prepare_parse(), which switches
+to section mode when the text is longer than LONG_RESUME_CHARS and at least
+one of experience/projects/education was found.
+"""
+
+import os
+import re
+from typing import Iterable, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+from app.models.resume import (
+    EducationSection, ExperienceSection, ParsedResume, ProjectsSection, ResumeLLMFields
+)
+from app.parsing.json_repair import RepairingOutputParser
+from app.parsing.pre_extractor import PreExtraction, merge_pre_extraction
+
+LONG_RESUME_CHARS = int(os.getenv("LONG_RESUME_CHARS", "12000"))   # ~3k input tokens
+SECTION_MAX_CHARS = int(os.getenv("SECTION_MAX_CHARS", "8000"))    # per call; keeps answers far below max_tokens
+SECTION_PARSE_WORKERS = int(os.getenv("SECTION_PARSE_WORKERS", "4"))  # concurrent section calls (sync parser)
+SECTIONS = ("other", "experience", "projects", "education")
+
+# Heading line (after stripping bullets/colons) → section
+SECTION_HEADINGS = {
+    "experience": re.compile(
+        r"(?:professional |work |relevant |industry |industrial )?(?:experience|experiences)"
+        r"|employment(?: history)?|work history|career history|internships?|internship experience",
+    ),
+    "projects": re.compile(
+        r"(?:academic |personal |key |major |side |technical |selected |notable )?projects?(?: undertaken| experience)?"
+        r"|portfolio",
+    ),
+    "education": re.compile(
+        r"education(?:al)?(?: background| qualifications?| details)?|academic(?:s| background| qualifications?| details)"
+        r"|qualifications?",
+    ),
+    "other": re.compile(
+        r"(?:technical |core |key |professional )?skills(?: summary)?|summary|profile|(?:career )?objective|about me"
+        r"|achievements?|awards?(?: and achievements)?|honou?rs|certifications?|publications?|languages?"
+        r"|hobbies|interests|extra[- ]?curricular(?: activities)?|activities|positions? of responsibility"
+        r"|volunteer(?:ing| work)?|references?|personal (?:details|information)|strengths|training",
+    ),
+}
+MAX_HEADING_CHARS = 45
+
+SECTION_INSTRUCTIONS = {
+    "experience": """- Extract EVERY job/internship: company (required), role ("Unknown" if not specified),
+  start_date and end_date separately (e.g. "January 2021", "Present"), responsibilities as a list
+- current_role: role of the most recent job
+- Leave total_experience_years null unless explicitly stated""",
+    "projects": """- Extract EVERY project (personal, academic, professional): name, description,
+  technologies used, duration (if mentioned), role""",
+    "education": """- Extract every entry: institute (required), degree ("Unknown" or descriptive text like
+  "Schooling" if unclear), year""",
+    "other": """- candidate_name, location, current_role (if stated here)
+- technical_skills: only skills NOT already found: {known_skills}
+- Every other section (summary, achievements, awards, certifications, languages, etc.)
+  goes into additional_information as "Section: ..." text
+- Work experience, projects and education are parsed separately: only fill those lists
+  for entries that appear in THIS text""",
+}
+
+SECTION_PARSERS = {
+    "experience": RepairingOutputParser(pydantic_object=ExperienceSection),
+    "projects": RepairingOutputParser(pydantic_object=ProjectsSection),
+    "education": RepairingOutputParser(pydantic_object=EducationSection),
+    "other": RepairingOutputParser(pydantic_object=ResumeLLMFields),
+}
+
+section_prompt = PromptTemplate(
+    template="""You are a resume parsing assistant. The text below is the {section_title} part of a longer resume;
+the other parts are parsed separately. Contact details were already extracted and removed.
+
+{instructions}
+
+For missing or unclear fields, use "Unknown" or descriptive placeholders instead of null/None.
+
+{format_instructions}
+
+Resume section:
+{resume_text}
+
+Return ONLY valid JSON matching the schema above.""",
+    input_variables=["section_title", "instructions", "format_instructions", "resume_text"],
+)
+
+SECTION_TITLES = {
+    "experience": "WORK EXPERIENCE",
+    "projects": "PROJECTS",
+    "education": "EDUCATION",
+    "other": "PROFILE / SKILLS / OTHER SECTIONS",
+}
+
+
+def _heading_section(line: str) -> Optional[str]:
+    """Section a heading line starts, or None if the line is not a heading"""
+    candidate = re.sub(r"^[\W_]+|[\W_]+$", "", line).lower()
+    if not candidate or len(candidate) > MAX_HEADING_CHARS:
+        return None
+    candidate = " ".join(candidate.replace("&", "and").split())
+    for section, pattern in SECTION_HEADINGS.items():
+        if pattern.fullmatch(candidate):
+            return section
+    return None
+
+
+def split_sections(text: str) -> dict[str, str]:
+    """
+    Split resume text at recognised section headings. Text before the first
+    heading (name, headline) and under unrecognised headings goes to "other".
+    """
+    parts = {section: [] for section in SECTIONS}
+    current = "other"
+    for line in text.splitlines():
+        section = _heading_section(line)
+        if section:
+            current = section
+        parts[current].append(line)
+    return {section: "\n".join(lines).strip() for section, lines in parts.items() if "\n".join(lines).strip()}
+
+
+def chunk_section(text: str, max_chars: int = SECTION_MAX_CHARS) -> list[str]:
+    """Split a section into pieces of at most ~max_chars, at blank lines where possible"""
+    if len(text) <= max_chars:
+        return [text]
+    blocks = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if len(paragraph) <= max_chars:
+            blocks.append(paragraph)
+        else:
+            blocks.extend(paragraph.splitlines())
+
+    chunks, current = [], ""
+    for block in blocks:
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = block
+        else:
+            current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def plan_sections(pre: PreExtraction) -> Optional[list[tuple[str, str]]]:
+    """
+    [(section, text), ...] for long-document mode, or None when the resume is
+    short enough (or has no recognisable structure) for a single call.
+    """
+    if len(pre.text) <= LONG_RESUME_CHARS:
+        return None
+    sections = split_sections(pre.text)
+    if not any(section in sections for section in ("experience", "projects", "education")):
+        return None
+    return [
+        (section, chunk)
+        for section in SECTIONS if section in sections
+        for chunk in chunk_section(sections[section])
+    ]
+
+
+def build_section_prompt(section: str, text: str, pre: PreExtraction):
+    instructions = SECTION_INSTRUCTIONS[section]
+    if section == "other":
+        instructions = instructions.format(known_skills=", ".join(pre.known_skills) or "none")
+    return section_prompt.invoke({
+        "section_title": SECTION_TITLES[section],
+        "instructions": instructions,
+        "format_instructions": SECTION_PARSERS[section].get_format_instructions(),
+        "resume_text": text,
+    })
+
+
+def merge_sections(parts: list[tuple[str, object]], pre: PreExtraction) -> ParsedResume:
+    """Merge per-section results (in plan order) into one ParsedResume"""
+    candidate_name = None
+    location = current_role = total_years = None
+    technical_skills, work, education, projects, additional = [], [], [], [], []
+
+    for section, result in parts:
+        if section == "other":
+            if result.candidate_name and result.candidate_name != "Unknown" and not candidate_name:
+                candidate_name = result.candidate_name
+            location = location or result.location
+            technical_skills.extend(result.technical_skills)
+            if result.additional_information:
+                additional.append(result.additional_information)
+            work.extend(result.work_experience)
+            education.extend(result.education)
+            projects.extend(result.projects)
+        elif section == "experience":
+            work.extend(result.work_experience)
+            current_role = current_role or result.current_role
+            total_years = total_years or result.total_experience_years
+        elif section == "projects":
+            projects.extend(result.projects)
+        else:
+            education.extend(result.education)
+
+    # A role stated in the profile only counts when no experience chunk named one
+    for section, result in parts:
+        if section == "other":
+            current_role = current_role or result.current_role
+            total_years = total_years or result.total_experience_years
+
+    core = ResumeLLMFields(
+        candidate_name=candidate_name or "Unknown",
+        location=location,
+        total_experience_years=total_years,
+        current_role=current_role,
+        technical_skills=technical_skills,
+        work_experience=work,
+        education=education,
+        projects=projects,
+        additional_information="\n".join(additional) or None,
+    )
+    return merge_pre_extraction(core, pre)
+
+
+# ─── Near-duplicate re-parse: reuse unchanged sections ──────────
+
+def _section_key(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def changed_sections(text: str, previous_text: str) -> tuple[dict[str, str], list[str]]:
+    """(sections of `text`, names of the sections whose content differs from previous_text)"""
+    sections = split_sections(text)
+    previous = split_sections(previous_text)
+    changed = [
+        section for section in SECTIONS
+        if section in sections and _section_key(sections[section]) != _section_key(previous.get(section))
+    ]
+    return sections, changed
+
+
+def reuse_section(section: str, previous: ParsedResume, changed: Iterable[str] = ()):
+    """
+    Section result rebuilt from an earlier version's ParsedResume (no LLM call).
+    `changed` are the sections being re-parsed: when experience changed, the
+    old current role and total years (often computed from the old work history)
+    are not carried over, so _parsed_resume_row recalculates them.
+    """
+    if section == "experience":
+        return ExperienceSection(
+            work_experience=previous.work_experience,
+            current_role=previous.current_role,
+            total_experience_years=previous.total_experience_years,
+        )
+    if section == "projects":
+        return ProjectsSection(projects=previous.projects)
+    if section == "education":
+        return EducationSection(education=previous.education)
+    # Links are re-added from the new text by merge_pre_extraction
+    additional = "\n".join(
+        line for line in (previous.additional_information or "").splitlines() if not line.startswith("Links: ")
+    )
+    experience_changed = "experience" in changed
+    return ResumeLLMFields(
+        candidate_name=previous.candidate_name,
+        location=previous.location,
+        current_role=None if experience_changed else previous.current_role,
+        total_experience_years=None if experience_changed else previous.total_experience_years,
+        technical_skills=previous.programming_languages + previous.frameworks + previous.tools + previous.technical_skills,
+        additional_information=additional or None,
+    )
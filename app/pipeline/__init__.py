@@ -0,0 +1,9 @@
+# app/pipeline/__init__.py
+# Concurrent ingestion pipeline: extract → parse → index with bounded queues between stages,
+# plus a durable SQLite job queue for multi-process workers that survive restarts.
+
+from .ingestion_pipeline import IngestionPipeline, StageConfig
+from .job_queue import JobQueue
+from .queue_worker import run_worker
+
+__all__ = ["IngestionPipeline", "StageConfig", "JobQueue", "run_worker"]
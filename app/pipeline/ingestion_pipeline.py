@@ -0,0 +1,347 @@
+# app/pipeline/ingestion_pipeline.py
+"""
+IngestionPipeline - staged, concurrent resume ingestion.
+
+    uploaded docs ─▶ [extract] ─queue─▶ [parse] ─queue─▶ [index] ─▶ searchable
+
+Each stage has its own worker threads and a bounded input queue. When a
+queue is full the upstream stage blocks (backpressure), so a slow LLM stage
+never lets thousands of extracted texts pile up in memory. A resume is
+searchable as soon as it leaves the index stage, instead of after every
+other resume in the corpus has been parsed.
+
+Extraction is CPU-bound: extract threads hand PDFs to a process pool of the
+same size. Parsing (LLM round-trips) and indexing run in threads.
+
+The pipeline is resumable: on start it also feeds each stage the work left
+behind by an earlier run (extracted-but-unparsed, parsed-but-unindexed).
+Each stage's backlog is fed in upload-batch priority order (interactive,
+normal, backfill; oldest first within a class - see app/pipeline/priority.py).
+
+Every run is recorded in the ingestion run ledger (app/pipeline/run_ledger.py):
+per document and stage, the queue wait, the stage time, and the LLM
+provider/tokens for parsing.
+"""
+
+import multiprocessing
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from app.db.init_db import DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+from app.ingestion.extractor import EXTRACT_TIMEOUT_SECONDS, _extract_worker, save_extracted_text
+from app.pipeline.priority import priority_order_sql
+from app.pipeline.run_ledger import LEDGER_ENABLED, RunLedger
+from app.pipeline.stages import STAGES, index_stage, parse_stage, parsed_resume_from_row
+
+_STOP = object()  # sentinel: one per worker tells it to exit
+_DEFERRED = object()  # handler result: the item is recorded/forwarded later (batched parse writes)
+
+# Work left by an earlier run, one key per row in priority order
+_DOCUMENT_ORDER = priority_order_sql("ub.priority", "d.created_at")
+BACKLOG_KEYS_SQL = {
+    "extract": f"""
+        SELECT d.document_id
+        FROM documents d
+        LEFT JOIN upload_batches ub ON d.batch_id = ub.batch_id
+        WHERE d.status = 'uploaded'
+          AND d.raw_text IS NULL
+        ORDER BY {_DOCUMENT_ORDER}
+    """,
+    "parse": f"""
+        SELECT d.document_id
+        FROM documents d
+        LEFT JOIN upload_batches ub ON d.batch_id = ub.batch_id
+        WHERE d.status = 'extracted'
+        AND NOT EXISTS (
+            SELECT 1 FROM parsed_resumes pr WHERE pr.document_id = d.document_id
+        )
+        ORDER BY {_DOCUMENT_ORDER}
+    """,
+    "index": f"""
+        SELECT pr.resume_id
+        FROM parsed_resumes pr
+        JOIN documents d ON pr.document_id = d.document_id
+        LEFT JOIN upload_batches ub ON d.batch_id = ub.batch_id
+        WHERE pr.indexed_at IS NULL
+        ORDER BY {priority_order_sql("ub.priority", "pr.parsed_at")}
+    """,
+}
+
+
+def backlog_rows_sql(stage: str, count: int) -> str:
+    """Rows for `count` backlog keys of a stage (documents, or parsed resumes with their text)"""
+    placeholders = ",".join("?" * count)
+    if stage == "extract":
+        return f"""
+            SELECT document_id, file_path, original_filename FROM documents
+            WHERE document_id IN ({placeholders})
+        """
+    if stage == "parse":
+        return f"""
+            SELECT document_id, raw_text, original_filename, near_duplicate_of FROM documents
+            WHERE document_id IN ({placeholders})
+        """
+    return f"""
+        SELECT pr.*, {RAW_TEXT_SQL} AS raw_text, d.original_filename
+        FROM parsed_resumes pr
+        JOIN documents d ON pr.document_id = d.document_id
+        {RAW_TEXT_JOIN}
+        WHERE pr.resume_id IN ({placeholders})
+    """
+
+
+class StageConfig:
+    """Concurrency settings for one pipeline stage"""
+
+    def __init__(self, workers: int = 1, queue_size: int = 8):
+        self.workers = max(1, workers)
+        # Max items waiting in front of this stage before upstream blocks
+        self.queue_size = max(1, queue_size)
+
+
+class IngestionPipeline:
+    """
+    Usage:
+        pipeline = IngestionPipeline(
+            extract=StageConfig(workers=4, queue_size=32),
+            parse=StageConfig(workers=2, queue_size=8),
+            index=StageConfig(workers=1, queue_size=8),
+        )
+        stats = pipeline.run()
+        # → {"extract": {"ok": 120, "failed": 2}, "parse": {...}, "index": {...}}
+    """
+
+    def __init__(
+        self,
+        extract: Optional[StageConfig] = None,
+        parse: Optional[StageConfig] = None,
+        index: Optional[StageConfig] = None,
+        vector_store_path: str = "storage/chroma",
+        on_event: Optional[Callable[[str, str, Optional[str]], None]] = None,
+        record_ledger: bool = LEDGER_ENABLED,
+    ):
+        self.config = {
+            "extract": extract or StageConfig(workers=multiprocessing.cpu_count(), queue_size=32),
+            "parse": parse or StageConfig(workers=2, queue_size=8),
+            "index": index or StageConfig(workers=1, queue_size=8),
+        }
+        self.vector_store_path = vector_store_path
+        # on_event(stage, document_id, error) after every item (error is None on success)
+        self.on_event = on_event
+        self.record_ledger = record_ledger
+        self.run_id = None
+
+        self._queues = {stage: queue.Queue(maxsize=self.config[stage].queue_size) for stage in STAGES}
+        self._stats = {stage: {"ok": 0, "failed": 0} for stage in STAGES}
+        self._stats_lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._retired_pools = []  # pools with a timed-out (possibly hung) extraction
+        self._vector_store = None
+        self._writer = None
+        self._ledger = None
+
+    # ─── Backlog (resume where an earlier run stopped) ──────────
+
+    def _backlog_keys(self) -> dict[str, list[str]]:
+        """Keys of the work left by an earlier run, in priority order (rows are loaded while feeding)"""
+        conn = sqlite3.connect(DB_PATH)
+        keys = {stage: [row[0] for row in conn.execute(sql)] for stage, sql in BACKLOG_KEYS_SQL.items()}
+        conn.close()
+        return keys
+
+    def _backlog_items(self, stage: str, keys: list[str]):
+        """
+        Yield backlog items for `keys` in order, loading one queue-full of rows
+        at a time. The feeder blocks on the stage queue between chunks, so a
+        resumed run never holds more than a few chunks of texts in memory.
+        """
+        chunk_size = self.config[stage].queue_size
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            conn = register_text_functions(sqlite3.connect(DB_PATH))
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(backlog_rows_sql(stage, len(chunk)), chunk).fetchall()
+            conn.close()
+
+            key = "resume_id" if stage == "index" else "document_id"
+            items = {row[key]: dict(row) for row in rows}
+            for item_key in chunk:
+                item = items.get(item_key)
+                if item is None:
+                    continue  # removed since the backlog was listed
+                if stage == "index":
+                    item["parsed_resume"] = parsed_resume_from_row(item)
+                yield item
+
+    # ─── Stage handlers (return the item for the next stage) ────
+
+    def _extract(self, item: dict) -> dict:
+        with self._pool_lock:
+            pool = self._pool
+        async_result = pool.apply_async(_extract_worker, ((item["document_id"], item["file_path"]),))
+        try:
+            _, text, error = async_result.get(timeout=EXTRACT_TIMEOUT_SECONDS)
+        except multiprocessing.TimeoutError:
+            self._retire_pool(pool)
+            raise TimeoutError(f"Extraction timed out after {EXTRACT_TIMEOUT_SECONDS:.0f}s")
+        if error:
+            raise ValueError(error)
+        match = save_extracted_text(item["document_id"], text)
+        item["raw_text"] = text
+        item["near_duplicate_of"] = match[0] if match else None
+        return item
+
+    def _retire_pool(self, pool) -> None:
+        """
+        A hung worker cannot be cancelled individually: new extractions go to a
+        fresh pool, the old one finishes its other tasks and is terminated at
+        the end of the run (joining it would wait for the hung task forever).
+        """
+        with self._pool_lock:
+            if self._pool is not pool:
+                return  # another extract thread already replaced it
+            self._pool = multiprocessing.Pool(processes=self.config["extract"].workers)
+            self._retired_pools.append(pool)
+        pool.close()
+
+    def _parse(self, item: dict):
+        if item.get("resume_id"):
+            return item  # parsed in an earlier run
+        parse_stage(item, writer=self._writer)
+        if item.get("status") == "near_duplicate":
+            return None  # NEAR_DUPLICATE_POLICY=skip: never reaches the writer, nothing to index
+        return _DEFERRED
+
+    def _on_parse_flush(self, entries: list[tuple], error: Optional[str]) -> None:
+        """Parsed rows are committed: count them and hand them to the index stage"""
+        for _, _, item in entries:
+            if error:
+                item.pop("resume_id", None)
+            self._record("parse", item, error)
+            if not error:
+                item["_queued_at"] = time.time()
+                self._queues["index"].put(item)
+
+    def _index(self, item: dict) -> None:
+        index_stage(item, self._vector_store)
+        return None
+
+    # ─── Worker plumbing ────────────────────────────────────────
+
+    def _record(self, stage: str, item: dict, error: Optional[str]) -> None:
+        with self._stats_lock:
+            self._stats[stage]["failed" if error else "ok"] += 1
+        if self._ledger is not None:
+            queued_at, started_at, finished_at = item.get("_timings", {}).get(stage, (None, None, None))
+            # A writer flush inside parse_stage can record an item before its handler returned
+            finished_at = finished_at or time.time()
+            self._ledger.record(stage, item["document_id"], error, queued_at, started_at, finished_at,
+                                usage=item.get("parse_usage") if stage == "parse" else None)
+        if self.on_event:
+            self.on_event(stage, item["document_id"], error)
+
+    def _worker(self, stage: str, handler: Callable, outbox: Optional[queue.Queue]) -> None:
+        inbox = self._queues[stage]
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            started = time.time()
+            timings = item.setdefault("_timings", {})
+            timings[stage] = (item.pop("_queued_at", started), started, None)
+            try:
+                result = handler(item)
+            except Exception as e:
+                timings[stage] = (*timings[stage][:2], time.time())
+                self._record(stage, item, str(e))
+                continue
+            timings[stage] = (*timings[stage][:2], time.time())
+            if result is _DEFERRED:
+                continue
+            self._record(stage, item, None)
+            if outbox is not None and result is not None:
+                result["_queued_at"] = time.time()
+                outbox.put(result)  # blocks while the next stage is saturated
+
+    @staticmethod
+    def _feed(target: queue.Queue, items) -> None:
+        for item in items:
+            item["_queued_at"] = time.time()
+            target.put(item)
+
+    def _start_threads(self, count: int, target: Callable, args: tuple) -> list[threading.Thread]:
+        threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    # ─── Public API ─────────────────────────────────────────────
+
+    def run(self) -> dict:
+        """Drain all pending ingestion work; returns per-stage ok/failed counts"""
+        from app.parsing.resume_parser import ParsedResumeWriter
+        from app.vectorstore.chroma_store import ResumeVectorStore
+
+        backlog = self._backlog_keys()
+        if not any(backlog.values()):
+            return self._stats
+
+        if self.record_ledger:
+            self._ledger = RunLedger("pipeline", config={
+                stage: {"workers": self.config[stage].workers, "queue_size": self.config[stage].queue_size}
+                for stage in STAGES
+            })
+            self.run_id = self._ledger.run_id
+        self._vector_store = ResumeVectorStore(persist_directory=self.vector_store_path)
+        self._pool = multiprocessing.Pool(processes=self.config["extract"].workers)
+        # Parse workers buffer their rows; one transaction per PARSE_COMMIT_EVERY resumes / PARSE_COMMIT_SECONDS
+        self._writer = ParsedResumeWriter(on_flush=self._on_parse_flush)
+        started = time.perf_counter()
+
+        handlers = {"extract": self._extract, "parse": self._parse, "index": self._index}
+        outboxes = {"extract": self._queues["parse"], "parse": self._queues["index"], "index": None}
+
+        try:
+            workers = {
+                stage: self._start_threads(
+                    self.config[stage].workers, self._worker, (stage, handlers[stage], outboxes[stage])
+                )
+                for stage in STAGES
+            }
+            feeders = {
+                stage: self._start_threads(
+                    1, self._feed, (self._queues[stage], self._backlog_items(stage, backlog[stage]))
+                )
+                for stage in STAGES
+            }
+
+            # Shut stages down front to back: a stage stops once its backlog is
+            # fed and every upstream worker has exited.
+            for stage in STAGES:
+                for thread in feeders[stage]:
+                    thread.join()
+                for _ in workers[stage]:
+                    self._queues[stage].put(_STOP)
+                for thread in workers[stage]:
+                    thread.join()
+                if stage == "parse":
+                    self._writer.close()  # last partial batch goes to the index stage before it stops
+
+            # Every extraction has returned or timed out; timed-out ones retired their pool
+            self._pool.close()
+            self._pool.join()
+        finally:
+            self._pool.terminate()
+            for pool in self._retired_pools:
+                pool.terminate()
+
+        self._stats["seconds"] = round(time.perf_counter() - started, 1)
+        if self._ledger is not None:
+            self._ledger.finish(self._stats)
+            self._stats["run_id"] = self.run_id
+        return self._stats
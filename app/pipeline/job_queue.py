@@ -0,0 +1,331 @@
+# app/pipeline/job_queue.py
+"""
+JobQueue - durable, SQLite-backed ingestion job queue.
+
+One row in `ingestion_jobs` per (document, stage). Workers lease jobs for a
+limited time and renew the lease with heartbeats while they work. A worker
+that crashes simply stops heartbeating: its lease expires and another worker
+picks the job up. Failed jobs are retried with exponential backoff until
+max_attempts, then dead-lettered (status = 'dead') with the last error.
+
+Completing a job enqueues the document's next stage in the same transaction,
+so a restart resumes exactly where the previous run stopped.
+
+Jobs carry their upload batch's priority (app/pipeline/priority.py). lease()
+hands out interactive work before normal and backfill work, and reserves a
+share of leases for lower-priority jobs that have waited too long.
+
+Every write goes through the process's write queue (app/db/write_queue.py),
+so a lease, heartbeat or completion never competes for the write lock with
+the pipeline's other writes in the same process.
+
+    pending ──lease──▶ leased ──complete──▶ done  (+ next stage pending)
+       ▲                 │
+       └──fail/expire────┤ (attempts < max_attempts)
+                         └──▶ dead              (attempts exhausted)
+"""
+
+import sqlite3
+import time
+from typing import Optional
+
+from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
+from app.pipeline.priority import (
+    DEFAULT_PRIORITY, PRIORITIES, PRIORITY_MAX_WAIT_SECONDS, PRIORITY_RESERVED_EVERY, priority_value
+)
+from app.pipeline.stages import NEXT_STAGE, STAGES
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 30
+
+# Priority of a document's upload batch (documents uploaded without a batch are "normal")
+_DOCUMENT_PRIORITY_SQL = f"""COALESCE((
+    SELECT ub.priority FROM documents d JOIN upload_batches ub ON d.batch_id = ub.batch_id
+    WHERE d.document_id = ?
+), {PRIORITIES[DEFAULT_PRIORITY]})"""
+
+_RUNNABLE_COLUMNS = """job_id, document_id, stage, attempts, max_attempts, priority, available_at,
+                       MAX(CAST(strftime('%s', created_at) AS REAL), available_at) AS queued_at"""
+
+
+def runnable_jobs_sql(status: str, stage_count: int) -> str:
+    """
+    lease() candidates: pending jobs past their backoff, or leased jobs past
+    their expiry, in lease order. Params: (now, *stages, limit)
+    """
+    due_column = "available_at" if status == "pending" else "lease_expires_at"
+    placeholders = ",".join("?" * stage_count)
+    return f"""
+        SELECT {_RUNNABLE_COLUMNS}
+        FROM ingestion_jobs
+        WHERE status = '{status}' AND {due_column} <= ? AND stage IN ({placeholders})
+        ORDER BY priority, available_at, job_id
+        LIMIT ?
+    """
+
+
+def starving_jobs_sql(stage_count: int) -> str:
+    """Pending jobs of one priority level runnable since a cutoff, oldest first. Params: (priority, cutoff, *stages, limit)"""
+    placeholders = ",".join("?" * stage_count)
+    return f"""
+        SELECT {_RUNNABLE_COLUMNS}
+        FROM ingestion_jobs
+        WHERE status = 'pending' AND priority = ? AND available_at <= ?
+          AND stage IN ({placeholders})
+        ORDER BY available_at, job_id
+        LIMIT ?
+    """
+
+
+def _fetch_rows(conn: sqlite3.Connection, sql: str, params) -> list[sqlite3.Row]:
+    # The writer's connection returns tuples; lease() reads columns by name
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(sql, params).fetchall()
+
+
+class JobQueue:
+    """Lease-based job queue shared by any number of worker processes"""
+
+    def __init__(self, db_path: str = DB_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._leases = 0  # jobs leased through this instance (every PRIORITY_RESERVED_EVERY-th is reserved)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Reads only; writes go through the process's write queue
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _write(self, work):
+        """Run work(conn) in the database's single-writer transaction and return its result"""
+        return get_write_queue(self.db_path).submit(work).result()
+
+    # ─── Producers ──────────────────────────────────────────────
+
+    def enqueue(self, document_id: str, stage: str = "extract") -> None:
+        """Add a job (no-op if this document already has a job for the stage)"""
+        get_write_queue(self.db_path).execute(f"""
+            INSERT OR IGNORE INTO ingestion_jobs (document_id, stage, max_attempts, available_at, priority)
+            VALUES (?, ?, ?, ?, {_DOCUMENT_PRIORITY_SQL})
+        """, (document_id, stage, self.max_attempts, time.time(), document_id)).result()
+
+    def enqueue_many(self, document_ids: list[str], stage: str = "extract") -> int:
+        """Add jobs for many documents in one transaction; returns how many were new"""
+        now = time.time()
+        return get_write_queue(self.db_path).executemany(f"""
+            INSERT OR IGNORE INTO ingestion_jobs (document_id, stage, max_attempts, available_at, priority)
+            VALUES (?, ?, ?, ?, {_DOCUMENT_PRIORITY_SQL})
+        """, [(document_id, stage, self.max_attempts, now, document_id) for document_id in document_ids]).result()
+
+    def sync_from_documents(self) -> int:
+        """
+        Create jobs for documents that have no job for their current stage yet
+        (documents uploaded without the queue, or tracked only by status before
+        this table existed). Returns the number of jobs created.
+        """
+        def sync(conn: sqlite3.Connection) -> int:
+            created = 0
+            for stage, where_sql in (
+                ("extract", "d.status = 'uploaded' AND d.raw_text IS NULL"),
+                ("parse", "d.status = 'extracted' AND NOT EXISTS "
+                          "(SELECT 1 FROM parsed_resumes pr WHERE pr.document_id = d.document_id)"),
+                ("index", "EXISTS (SELECT 1 FROM parsed_resumes pr "
+                          "WHERE pr.document_id = d.document_id AND pr.indexed_at IS NULL)"),
+            ):
+                cursor = conn.execute(f"""
+                    INSERT OR IGNORE INTO ingestion_jobs (document_id, stage, max_attempts, available_at, priority)
+                    SELECT d.document_id, ?, ?, ?, COALESCE(ub.priority, {PRIORITIES[DEFAULT_PRIORITY]})
+                    FROM documents d
+                    LEFT JOIN upload_batches ub ON d.batch_id = ub.batch_id
+                    WHERE {where_sql}
+                    ORDER BY d.created_at
+                """, (stage, self.max_attempts, time.time()))
+                created += cursor.rowcount
+            return created
+
+        return self._write(sync)
+
+    # ─── Consumers ──────────────────────────────────────────────
+
+    def lease(self, worker_id: str, stages=STAGES, limit: int = 1,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> list[dict]:
+        """
+        Atomically claim up to `limit` runnable jobs for `worker_id`.
+
+        Runnable = pending and past its retry backoff, or leased by a worker
+        whose lease has expired. Higher priority class first, then the job that
+        became runnable earliest; every PRIORITY_RESERVED_EVERY-th lease goes to
+        the oldest lower-priority job that has waited PRIORITY_MAX_WAIT_SECONDS.
+        The writer's transaction (BEGIN IMMEDIATE) holds the write lock while
+        the candidates are read, so two workers can never claim the same job.
+        """
+        stage_params = list(stages)
+        leases_before = self._leases
+
+        def claim(conn: sqlite3.Connection) -> list[dict]:
+            now = time.time()
+            # Expired leases that already used every attempt go to the dead-letter state
+            conn.execute("""
+                UPDATE ingestion_jobs
+                SET status = 'dead',
+                    last_error = COALESCE(last_error, 'lease expired (worker lost)'),
+                    lease_owner = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'leased' AND lease_expires_at <= ? AND attempts >= max_attempts
+            """, (now,))
+
+            candidates = _fetch_rows(conn, runnable_jobs_sql("pending", len(stage_params)),
+                                     (now, *stage_params, limit))
+            candidates += _fetch_rows(conn, runnable_jobs_sql("leased", len(stage_params)),
+                                      (now, *stage_params, limit))
+            candidates.sort(key=lambda row: (row["priority"], row["available_at"], row["job_id"]))
+
+            # Reserved share: starving lower-priority jobs, oldest first
+            reserved = sum(1 for n in range(leases_before + 1, leases_before + limit + 1) if n % PRIORITY_RESERVED_EVERY == 0)
+            starving = []
+            if reserved and candidates:
+                for level in sorted(set(PRIORITIES.values())):
+                    if level <= candidates[0]["priority"]:
+                        continue
+                    starving += _fetch_rows(conn, starving_jobs_sql(len(stage_params)),
+                                            (level, now - PRIORITY_MAX_WAIT_SECONDS, *stage_params, reserved))
+                starving = sorted(starving, key=lambda row: (row["available_at"], row["job_id"]))[:reserved]
+            starving_ids = {row["job_id"] for row in starving}
+            rows = (starving + [row for row in candidates if row["job_id"] not in starving_ids])[:limit]
+
+            jobs = []
+            for row in rows:
+                conn.execute("""
+                    UPDATE ingestion_jobs
+                    SET status = 'leased', lease_owner = ?, lease_expires_at = ?,
+                        attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE job_id = ?
+                """, (worker_id, now + lease_seconds, row["job_id"]))
+                job = dict(row)
+                job["attempts"] += 1
+                jobs.append(job)
+            return jobs
+
+        jobs = self._write(claim)
+        self._leases += len(jobs)
+        return jobs
+
+    def heartbeat(self, job_id: int, worker_id: str,
+                  lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease; False means the lease was lost to another worker"""
+        return get_write_queue(self.db_path).execute("""
+            UPDATE ingestion_jobs
+            SET lease_expires_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND lease_owner = ? AND status = 'leased'
+        """, (time.time() + lease_seconds, job_id, worker_id)).result() == 1
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        """Mark a job done and enqueue the document's next stage atomically"""
+        def finish(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute("""
+                UPDATE ingestion_jobs
+                SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND lease_owner = ? AND status = 'leased'
+            """, (job_id, worker_id))
+            if cursor.rowcount != 1:
+                return False
+
+            document_id, stage, priority = conn.execute(
+                "SELECT document_id, stage, priority FROM ingestion_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            next_stage = NEXT_STAGE.get(stage)
+            if next_stage:
+                conn.execute("""
+                    INSERT OR IGNORE INTO ingestion_jobs (document_id, stage, max_attempts, available_at, priority)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (document_id, next_stage, self.max_attempts, time.time(), priority))
+            return True
+
+        return self._write(finish)
+
+    def fail(self, job_id: int, worker_id: str, error: str, retryable: bool = True) -> str:
+        """
+        Record a failure. Retries with exponential backoff while attempts
+        remain, otherwise dead-letters the job. Returns the new status.
+        """
+        def record(conn: sqlite3.Connection) -> str:
+            row = conn.execute("""
+                SELECT attempts, max_attempts FROM ingestion_jobs
+                WHERE job_id = ? AND lease_owner = ? AND status = 'leased'
+            """, (job_id, worker_id)).fetchone()
+            if row is None:
+                return "lost"
+
+            attempts, max_attempts = row
+            if retryable and attempts < max_attempts:
+                status = "pending"
+                available_at = time.time() + RETRY_BASE_DELAY_SECONDS * (2 ** (attempts - 1))
+            else:
+                status = "dead"
+                available_at = 0
+
+            conn.execute("""
+                UPDATE ingestion_jobs
+                SET status = ?, available_at = ?, last_error = ?,
+                    lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            """, (status, available_at, error[:2000], job_id))
+            return status
+
+        return self._write(record)
+
+    # ─── Operations ─────────────────────────────────────────────
+
+    def requeue_dead(self, stage: Optional[str] = None) -> int:
+        """Give dead-lettered jobs a fresh set of attempts (after fixing the cause)"""
+        return get_write_queue(self.db_path).execute(f"""
+            UPDATE ingestion_jobs
+            SET status = 'pending', attempts = 0, available_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'dead' {"AND stage = ?" if stage else ""}
+        """, (time.time(), stage) if stage else (time.time(),)).result()
+
+    def set_batch_priority(self, batch_id: str, priority: str) -> int:
+        """Re-prioritize a batch and its unfinished jobs; returns the number of jobs changed"""
+        level = priority_value(priority)
+
+        def reprioritize(conn: sqlite3.Connection) -> int:
+            conn.execute("UPDATE upload_batches SET priority = ? WHERE batch_id = ?", (level, batch_id))
+            return conn.execute("""
+                UPDATE ingestion_jobs
+                SET priority = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE status IN ('pending', 'leased')
+                  AND document_id IN (SELECT document_id FROM documents WHERE batch_id = ?)
+            """, (level, batch_id)).rowcount
+
+        return self._write(reprioritize)
+
+    def stats(self) -> dict:
+        """{stage: {status: count}}"""
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT stage, status, COUNT(*) AS n
+            FROM ingestion_jobs
+            GROUP BY stage, status
+        """).fetchall()
+        conn.close()
+        result = {stage: {} for stage in STAGES}
+        for row in rows:
+            result.setdefault(row["stage"], {})[row["status"]] = row["n"]
+        return result
+
+    def dead_letters(self, limit: int = 20) -> list[dict]:
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT job_id, document_id, stage, attempts, last_error, updated_at
+            FROM ingestion_jobs
+            WHERE status = 'dead'
+            ORDER BY updated_at DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
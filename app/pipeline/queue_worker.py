@@ -0,0 +1,140 @@
+# app/pipeline/queue_worker.py
+"""
+Job-queue worker: leases extract/parse/index jobs from JobQueue and runs the
+matching stage function. Start as many worker processes as you like; the
+queue's leases guarantee that each job is worked on by one worker at a time.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from app.pipeline.job_queue import DEFAULT_LEASE_SECONDS, JobQueue
+from app.pipeline.run_ledger import LEDGER_ENABLED, RunLedger
+from app.pipeline.stages import STAGES, extract_stage, index_stage, load_stage_item, parse_stage
+
+
+class DocumentMissingError(Exception):
+    """The job's document was deleted; retrying cannot succeed"""
+
+
+class _Heartbeat:
+    """Renews a job lease in the background while the stage runs"""
+
+    def __init__(self, job_queue: JobQueue, job_id: int, worker_id: str, lease_seconds: float):
+        self._job_queue = job_queue
+        self._job_id = job_id
+        self._worker_id = worker_id
+        self._lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(1.0, self._lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self._job_queue.heartbeat(self._job_id, self._worker_id, self._lease_seconds):
+                return  # lease lost; complete()/fail() will notice
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(
+    worker_id: Optional[str] = None,
+    stages=STAGES,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = 2.0,
+    exit_when_idle: bool = False,
+    vector_store_path: str = "storage/chroma",
+    on_event: Optional[Callable[[str, str, Optional[str]], None]] = None,
+    record_ledger: bool = LEDGER_ENABLED,
+) -> dict:
+    """
+    Process jobs until stopped (or until the queue is empty if exit_when_idle).
+
+    Args:
+        worker_id: Lease owner name (default: host:pid:random)
+        stages: Which stages this worker takes, e.g. ("parse",) for an LLM-only worker
+        lease_seconds: Lease length; renewed every lease_seconds/3 while working
+        poll_interval: Sleep between polls when there is no runnable job
+        exit_when_idle: Return once no runnable job is left
+        vector_store_path: Chroma directory for the index stage
+        on_event: Optional callback(stage, document_id, error) after every job
+        record_ledger: Record the session and every job in the ingestion run ledger
+
+    Returns:
+        {"done": n, "retry": n, "dead": n, "lost": n}
+    """
+    worker_id = worker_id or default_worker_id()
+    job_queue = JobQueue()
+    counts = {"done": 0, "retry": 0, "dead": 0, "lost": 0}
+    ledger = RunLedger("worker", config={"worker_id": worker_id, "stages": list(stages)}) if record_ledger else None
+
+    try:
+        while True:
+            jobs = job_queue.lease(worker_id, stages=stages, limit=1, lease_seconds=lease_seconds)
+            if not jobs:
+                if exit_when_idle:
+                    return counts
+                time.sleep(poll_interval)
+                continue
+            _run_job(jobs[0], job_queue, worker_id, lease_seconds, vector_store_path, counts, ledger, on_event)
+    finally:
+        if ledger is not None:
+            ledger.finish(counts)
+
+
+_vector_stores = {}  # persist_directory -> ResumeVectorStore (loaded on the first index job)
+
+
+def _run_job(job: dict, job_queue: JobQueue, worker_id: str, lease_seconds: float, vector_store_path: str,
+             counts: dict, ledger: Optional[RunLedger], on_event) -> None:
+    stage, document_id = job["stage"], job["document_id"]
+    error = None
+    retryable = True
+    item = None
+    started = time.time()
+
+    with _Heartbeat(job_queue, job["job_id"], worker_id, lease_seconds):
+        try:
+            item = load_stage_item(stage, document_id)
+            if item is None:
+                raise DocumentMissingError(f"Document {document_id} no longer exists")
+            if stage == "extract":
+                extract_stage(item)
+            elif stage == "parse":
+                parse_stage(item)
+            else:
+                if vector_store_path not in _vector_stores:
+                    from app.vectorstore.chroma_store import ResumeVectorStore
+                    _vector_stores[vector_store_path] = ResumeVectorStore(persist_directory=vector_store_path)
+                index_stage(item, _vector_stores[vector_store_path])
+        except DocumentMissingError as e:
+            error, retryable = str(e), False
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+    finished = time.time()
+
+    if error is None:
+        counts["done" if job_queue.complete(job["job_id"], worker_id) else "lost"] += 1
+    else:
+        status = job_queue.fail(job["job_id"], worker_id, error, retryable=retryable)
+        counts["retry" if status == "pending" else status] += 1
+
+    if ledger is not None:
+        ledger.record(stage, document_id, error, job.get("queued_at"), started, finished,
+                      usage=(item or {}).get("parse_usage"))
+    if on_event:
+        on_event(stage, document_id, error)
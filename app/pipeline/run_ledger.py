@@ -0,0 +1,227 @@
+# app/pipeline/run_ledger.py
+"""
+Ingestion run ledger: where does the pipeline time go?
+
+Every IngestionPipeline run and every queue worker session gets an
+`ingestion_runs` row. Each document passing a stage adds an
+`ingestion_stage_events` row with:
+
+    queue_wait_seconds   time between being queued for the stage and a worker starting it
+    duration_seconds     extraction / LLM parse / embedding time
+    provider, model,     parse stage only: who answered, how many calls and tokens,
+    llm_calls, tokens,   and whether the parse cache answered instead
+    cache_hit
+    error                failure reason (status 'failed')
+
+Events are buffered and handed to the database's single-writer queue in
+batches, so recording never adds a transaction per document, and never makes
+a worker wait for the write. run_report() turns a run into throughput, p50/p95
+latency per stage, token totals, the slowest documents and the most common
+failures (see scripts/ingestion_report.py).
+"""
+
+import json
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
+from app.pipeline.stages import STAGES
+
+LEDGER_ENABLED = os.getenv("INGESTION_LEDGER", "1") not in ("0", "false", "False")
+LEDGER_FLUSH_EVERY = 50       # buffered events per write transaction
+LEDGER_FLUSH_SECONDS = 10.0   # ...or sooner, so long-running workers show up in reports
+
+
+class RunLedger:
+    """Records one run and its per-document stage events (thread-safe)"""
+
+    def __init__(self, source: str, config: Optional[dict] = None, db_path: str = DB_PATH,
+                 flush_every: int = LEDGER_FLUSH_EVERY):
+        self.run_id = str(uuid.uuid4())
+        self.source = source
+        self.db_path = db_path
+        self.flush_every = flush_every
+        self._events = []
+        self._last_write = time.monotonic()
+        self._lock = threading.Lock()
+
+        config = dict(config or {}, host=socket.gethostname(), pid=os.getpid())
+        self._writes = get_write_queue(db_path)
+        self._writes.execute("""
+            INSERT INTO ingestion_runs (run_id, source, started_at, config)
+            VALUES (?, ?, ?, ?)
+        """, (self.run_id, source, time.time(), json.dumps(config)))
+
+    def record(self, stage: str, document_id: str, error: Optional[str] = None,
+               queued_at: Optional[float] = None, started_at: Optional[float] = None,
+               finished_at: Optional[float] = None, usage: Optional[dict] = None) -> None:
+        """
+        Add one stage event. Times are unix timestamps (time.time()); usage is
+        the dict filled by the parsers (provider, model, llm_calls, tokens, cache_hit).
+        """
+        usage = usage or {}
+        wait = started_at - queued_at if started_at is not None and queued_at is not None else None
+        duration = finished_at - started_at if finished_at is not None and started_at is not None else None
+        event = (
+            self.run_id, document_id, stage, "failed" if error else "ok",
+            round(max(wait, 0.0), 3) if wait is not None else None,
+            round(duration, 3) if duration is not None else None,
+            started_at, finished_at,
+            usage.get("provider"), usage.get("model"), usage.get("llm_calls"),
+            usage.get("input_tokens"), usage.get("output_tokens"),
+            int(usage["cache_hit"]) if "cache_hit" in usage else None,
+            error[:2000] if error else None,
+        )
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) < self.flush_every and time.monotonic() - self._last_write < LEDGER_FLUSH_SECONDS:
+                return
+            events, self._events = self._events, []
+            self._last_write = time.monotonic()
+        self._write(events)
+
+    def _write(self, events: list[tuple]) -> None:
+        # Fire and forget: the writer commits in order, finish() waits for everything
+        self._writes.executemany("""
+            INSERT INTO ingestion_stage_events (
+                run_id, document_id, stage, status, queue_wait_seconds, duration_seconds,
+                started_at, finished_at, provider, model, llm_calls, input_tokens, output_tokens,
+                cache_hit, error
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, events)
+
+    def flush(self) -> None:
+        with self._lock:
+            events, self._events = self._events, []
+        if events:
+            self._write(events)
+
+    def finish(self, stats: Optional[dict] = None) -> None:
+        """Write the remaining events and close the run"""
+        self.flush()
+        self._writes.execute("""
+            UPDATE ingestion_runs SET status = 'finished', finished_at = ?, stats = ?
+            WHERE run_id = ?
+        """, (time.time(), json.dumps(stats) if stats is not None else None, self.run_id)).result()
+
+
+# ─── Reports ────────────────────────────────────────────────────
+
+def percentile(values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def list_runs(limit: int = 10, db_path: str = DB_PATH) -> list[dict]:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("""
+        SELECT r.run_id, r.source, r.status, r.started_at, r.finished_at,
+               (SELECT COUNT(DISTINCT e.document_id) FROM ingestion_stage_events e WHERE e.run_id = r.run_id) AS documents
+        FROM ingestion_runs r
+        ORDER BY r.started_at DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def run_report(run_id: Optional[str] = None, slowest: int = 10, db_path: str = DB_PATH) -> Optional[dict]:
+    """
+    Summary of one run (default: the latest). None if there is no such run.
+
+    Returns:
+        {"run": {...}, "wall_seconds", "documents", "completed", "docs_per_minute",
+         "stages": {stage: {"ok", "failed", "p50", "p95", "max", "wait_p50", "wait_p95", "busy_seconds"}},
+         "providers": {provider: {"documents", "llm_calls", "input_tokens", "output_tokens"}},
+         "cache_hits", "slowest": [...], "failures": [...]}
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if run_id is None:
+        run = conn.execute("SELECT * FROM ingestion_runs ORDER BY started_at DESC LIMIT 1").fetchone()
+    else:
+        run = conn.execute("SELECT * FROM ingestion_runs WHERE run_id = ?", (run_id,)).fetchone()
+    if run is None:
+        conn.close()
+        return None
+    run = dict(run)
+    events = [dict(row) for row in conn.execute("""
+        SELECT e.*, d.original_filename
+        FROM ingestion_stage_events e
+        LEFT JOIN documents d ON e.document_id = d.document_id
+        WHERE e.run_id = ?
+    """, (run["run_id"],))]
+    conn.close()
+
+    last_finished = max((e["finished_at"] for e in events if e["finished_at"]), default=None)
+    end = run["finished_at"] or last_finished or time.time()
+    wall_seconds = max(end - run["started_at"], 0.001)
+
+    stages = {}
+    for stage in STAGES:
+        stage_events = [e for e in events if e["stage"] == stage]
+        durations = [e["duration_seconds"] for e in stage_events if e["status"] == "ok" and e["duration_seconds"] is not None]
+        waits = [e["queue_wait_seconds"] for e in stage_events if e["queue_wait_seconds"] is not None]
+        stages[stage] = {
+            "ok": sum(1 for e in stage_events if e["status"] == "ok"),
+            "failed": sum(1 for e in stage_events if e["status"] == "failed"),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": max(durations, default=None),
+            "wait_p50": percentile(waits, 50),
+            "wait_p95": percentile(waits, 95),
+            "busy_seconds": round(sum(durations), 1),
+        }
+
+    providers = {}
+    for e in events:
+        if e["stage"] != "parse" or e["status"] != "ok" or not e["provider"]:
+            continue
+        entry = providers.setdefault(e["provider"], {"documents": 0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0})
+        entry["documents"] += 1
+        for key in ("llm_calls", "input_tokens", "output_tokens"):
+            entry[key] += e[key] or 0
+
+    per_document = {}
+    for e in events:
+        entry = per_document.setdefault(e["document_id"], {
+            "document_id": e["document_id"], "filename": e["original_filename"], "seconds": 0.0, "stages": {}
+        })
+        seconds = (e["duration_seconds"] or 0) + (e["queue_wait_seconds"] or 0)
+        entry["seconds"] += seconds
+        # A retried stage has one event per attempt: report the time of all of them
+        entry["stages"][e["stage"]] = entry["stages"].get(e["stage"], 0) + (e["duration_seconds"] or 0)
+    slowest_documents = sorted(per_document.values(), key=lambda entry: entry["seconds"], reverse=True)[:slowest]
+    for entry in slowest_documents:
+        entry["stages"] = {stage: round(seconds, 2) for stage, seconds in entry["stages"].items()}
+
+    failures = Counter((e["stage"], (e["error"] or "")[:120]) for e in events if e["status"] == "failed")
+    completed = stages[STAGES[-1]]["ok"]
+    return {
+        "run": run,
+        "wall_seconds": round(wall_seconds, 1),
+        "documents": len(per_document),
+        "completed": completed,
+        "docs_per_minute": round(completed / wall_seconds * 60, 2),
+        "stages": stages,
+        "providers": providers,
+        "cache_hits": sum(1 for e in events if e["stage"] == "parse" and e["cache_hit"]),
+        "slowest": slowest_documents,
+        "failures": [
+            {"stage": stage, "error": error, "count": count}
+            for (stage, error), count in failures.most_common(10)
+        ],
+    }
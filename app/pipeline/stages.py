@@ -0,0 +1,179 @@
+# app/pipeline/stages.py
+"""
+Per-document ingestion stage functions, shared by IngestionPipeline (in-process
+queues) and the durable job-queue workers.
+
+Every stage takes an item dict with at least "document_id", does its work,
+persists the result and returns the item enriched for the next stage.
+Stages are idempotent: re-running a stage for a document that already
+finished it (e.g. after a crash between commit and job completion) is a no-op.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+from app.db.init_db import DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, archive_document_texts, register_text_functions
+from app.db.write_queue import get_write_queue
+from app.ingestion.extractor import extract_text_from_pdf, save_extracted_text
+from app.models.resume import Education, ParsedResume, Project, WorkExperience
+
+STAGES = ("extract", "parse", "index")
+NEXT_STAGE = {"extract": "parse", "parse": "index", "index": None}
+RESUME_BY_DOCUMENT_SQL = "SELECT * FROM parsed_resumes WHERE document_id = ?"
+
+
+def parsed_resume_from_row(row: dict) -> ParsedResume:
+    """Rebuild a ParsedResume from a parsed_resumes row (skills are stored merged)"""
+    return ParsedResume(
+        candidate_name=row["candidate_name"],
+        email=row.get("email"),
+        phone=row.get("phone"),
+        location=row.get("location"),
+        total_experience_years=row.get("total_experience_years"),
+        current_role=row.get("current_role"),
+        technical_skills=json.loads(row["skills"]) if row.get("skills") else [],
+        work_experience=[WorkExperience(**job) for job in json.loads(row.get("work_experience") or "[]")],
+        education=[Education(**edu) for edu in json.loads(row.get("education") or "[]")],
+        projects=[Project(**proj) for proj in json.loads(row.get("projects") or "[]")],
+        additional_information=row.get("additional_information"),
+    )
+
+
+def load_stage_item(stage: str, document_id: str) -> Optional[dict]:
+    """Load what `stage` needs for a document; None if the document is gone"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    register_text_functions(conn)
+    cursor.execute(f"""
+        SELECT d.document_id, d.file_path, d.original_filename, {RAW_TEXT_SQL} AS raw_text,
+               d.status, d.near_duplicate_of
+        FROM documents d
+        {RAW_TEXT_JOIN}
+        WHERE d.document_id = ?
+    """, (document_id,))
+    document = cursor.fetchone()
+    if document is None:
+        conn.close()
+        return None
+    item = dict(document)
+
+    cursor.execute(RESUME_BY_DOCUMENT_SQL, (document_id,))
+    parsed_row = cursor.fetchone()
+    conn.close()
+
+    if parsed_row is not None:
+        row = dict(parsed_row)
+        item["resume_id"] = row["resume_id"]
+        item["indexed_at"] = row["indexed_at"]
+        if stage == "index":
+            item["parsed_resume"] = parsed_resume_from_row(row)
+    return item
+
+
+def extract_stage(item: dict) -> dict:
+    if item.get("raw_text"):
+        return item  # already extracted
+    text = extract_text_from_pdf(item["file_path"])
+    match = save_extracted_text(item["document_id"], text)
+    item["raw_text"] = text
+    item["near_duplicate_of"] = match[0] if match else None
+    return item
+
+
+def load_near_duplicate_source(document_id: str) -> Optional[tuple[str, ParsedResume]]:
+    """(raw_text, ParsedResume) of the earlier version a near-duplicate points at, if it was parsed"""
+    conn = register_text_functions(sqlite3.connect(DB_PATH, timeout=30))
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(f"""
+        SELECT pr.*, {RAW_TEXT_SQL} AS raw_text
+        FROM parsed_resumes pr
+        JOIN documents d ON pr.document_id = d.document_id
+        {RAW_TEXT_JOIN}
+        WHERE pr.document_id = ?
+    """, (document_id,)).fetchone()
+    conn.close()
+    if row is None:
+        return None
+    row = dict(row)
+    return row["raw_text"] or "", parsed_resume_from_row(row)
+
+
+def _mark_near_duplicate(document_id: str) -> None:
+    get_write_queue().execute(
+        "UPDATE documents SET status = 'near_duplicate' WHERE document_id = ?", (document_id,)
+    ).result()
+
+
+def parse_stage(item: dict, writer=None) -> dict:
+    """
+    Parse and persist one document. With a ParsedResumeWriter the row is only
+    buffered: it is written (and the item should move on) on the writer's next flush.
+    """
+    if item.get("resume_id"):
+        return item  # already parsed - never pay for a second LLM call
+    if not item.get("raw_text"):
+        raise ValueError("Document has no extracted text")
+
+    from app.ingestion.near_duplicates import NEAR_DUPLICATE_POLICY
+    from app.parsing.async_parser import parse_resume_balanced
+    from app.parsing.resume_parser import parse_changed_sections, save_parsed_resume
+
+    source = None
+    if item.get("near_duplicate_of") and NEAR_DUPLICATE_POLICY != "off":
+        source = load_near_duplicate_source(item["near_duplicate_of"])
+
+    if source is not None and NEAR_DUPLICATE_POLICY == "skip":
+        _mark_near_duplicate(item["document_id"])
+        item["status"] = "near_duplicate"
+        return item
+    # Provider/model and token counts for the run ledger
+    usage = item["parse_usage"] = {}
+    if source is not None:
+        parsed = parse_changed_sections(item["raw_text"], *source, usage=usage)
+    else:
+        # Concurrent parse workers share one load-balanced async engine
+        parsed = parse_resume_balanced(item["raw_text"], usage=usage)
+    item["parsed_resume"] = parsed
+    if writer is not None:
+        item["resume_id"] = writer.add(item["document_id"], parsed, context=item)
+    else:
+        item["resume_id"] = save_parsed_resume(item["document_id"], parsed)
+    return item
+
+
+def index_stage(item: dict, vector_store) -> dict:
+    if item.get("indexed_at") or item.get("status") == "near_duplicate":
+        return item  # already indexed / skipped as a near-duplicate
+
+    from app.vectorstore.embeddings import create_resume_chunks, create_resume_metadata
+
+    chunks = create_resume_chunks(
+        parsed_resume=item["parsed_resume"],
+        raw_text=item.get("raw_text") or ""
+    )
+    metadata = create_resume_metadata(
+        parsed_resume=item["parsed_resume"],
+        document_id=item["document_id"],
+        resume_id=item["resume_id"]
+    )
+    vector_store.add_resume_chunks(
+        resume_id=item["resume_id"],
+        chunks=chunks,
+        metadata=metadata
+    )
+
+    indexed_at = datetime.now().isoformat()
+
+    def write(conn):
+        conn.execute("UPDATE parsed_resumes SET indexed_at = ? WHERE resume_id = ?", (indexed_at, item["resume_id"]))
+        # Indexed: the full text moves to compressed storage (app/db/text_store.py)
+        archive_document_texts(conn, [item["document_id"]])
+
+    get_write_queue().submit(write).result()
+    item["indexed_at"] = indexed_at
+    return item
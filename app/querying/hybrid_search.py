@@ -1,12 +1,13 @@
 # app/querying/hybrid_search.py
-import sqlite3
 from typing import List, Dict
+from app.db.connection import get_cursor
+from app.db.resume_skills import skill_filter_sql
 from app.vectorstore.chroma_store import ResumeVectorStore
 
 class HybridResumeSearch:
     """Combines SQL filtering + Vector search for accurate results"""
     
-    def __init__(self, db_path: str = "resumes.db"):
+    def __init__(self, db_path: str = None):
         self.db_path = db_path
         self.vector_store = ResumeVectorStore(persist_directory="storage/chroma")
     
@@ -34,8 +35,7 @@ class HybridResumeSearch:
     
     def _sql_filter(self, filters: Dict) -> List[str]:
         """Filter resumes using SQL based on structured criteria"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = get_cursor(db_path=self.db_path)
         
         where_clauses = []
         params = []
@@ -45,11 +45,12 @@ class HybridResumeSearch:
             where_clauses.append("total_experience_years >= ?")
             params.append(filters["min_experience"])
         
-        # Filter by skills (single column now)
+        # Filter by skills (indexed resume_skills lookups; every skill required)
         if "skills" in filters:
-            for skill in filters["skills"]:
-                where_clauses.append("skills LIKE ?")
-                params.append(f"%{skill}%")
+            skill_sql, skill_params = skill_filter_sql([[skill] for skill in filters["skills"]], match_all=True)
+            if skill_sql:
+                where_clauses.append(skill_sql)
+                params.extend(skill_params)
         
         # Filter by location
         if "location" in filters:
@@ -62,6 +63,5 @@ class HybridResumeSearch:
         
         cursor.execute(query, params)
         resume_ids = [row[0] for row in cursor.fetchall()]
-        conn.close()
         
         return resume_ids
\ No newline at end of file
@@ -0,0 +1,371 @@
+# app/utils/rate_limiter.py
+"""
+Cross-process adaptive rate limiter for LLM providers.
+
+Each provider (openai, groq, gemini) has two token buckets: requests/min and
+tokens/min. The bucket state lives in a small SQLite file, so every worker
+process on the machine draws from the same quota instead of each one
+guessing with sleeps.
+
+Adaptation:
+- A 429 halves the provider's refill rate and blocks it until Retry-After.
+- Every successful call raises the rate back by 5% of the configured limit.
+- Rate-limit headers (x-ratelimit-remaining-*/reset-*, retry-after) clamp the
+  local buckets to what the provider says is actually left.
+
+A call reserves its prompt plus the provider's average completion size so
+far (expected_tokens), not the whole max_tokens budget; record_response
+settles the difference with the actual usage. Reserving max_tokens would let
+Groq's 6,000 TPM through about one parse a minute.
+
+Limits come from PROVIDER_LIMITS and can be overridden per provider with
+environment variables, e.g. OPENAI_RPM=500 OPENAI_TPM=200000.
+
+Usage:
+    limiter = get_rate_limiter()
+    estimated_tokens = limiter.expected_tokens("openai", prompt_text, max_output_tokens=4096)
+    limiter.acquire("openai", tokens=estimated_tokens)
+    try:
+        message = llm.invoke(prompt_text)
+        limiter.record_response("openai", estimated_tokens, message)
+    except Exception as e:
+        if is_rate_limit_error(e):
+            limiter.on_rate_limited("openai", retry_after_from_error(e))
+        raise
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+RATE_LIMIT_DB_PATH = os.getenv(
+    "RATE_LIMIT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "storage", "rate_limits.db"),
+)
+
+# Conservative defaults (OpenAI Tier 1 gpt-4o-mini, Groq/Gemini free tiers)
+PROVIDER_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200_000},
+    "groq": {"rpm": 30, "tpm": 6_000},
+    "gemini": {"rpm": 15, "tpm": 1_000_000},
+}
+
+MIN_RATE_SCALE = 0.1          # never slow below 10% of the configured rate
+RATE_DECREASE_FACTOR = 0.5    # multiplicative decrease on 429
+RATE_INCREASE_STEP = 0.05     # additive increase per successful call
+DEFAULT_RETRY_AFTER = 5.0     # seconds to block a provider when a 429 has no Retry-After
+MAX_SLEEP_SLICE = 5.0         # re-check shared state at least this often while waiting
+DEFAULT_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1000"))  # before any completion was seen
+OUTPUT_AVERAGE_WEIGHT = 0.2   # weight of the newest completion in the rolling average
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_usage_lock = threading.Lock()
+
+
+def add_usage(usage: Optional[dict], provider: str, model: str, message) -> None:
+    """
+    Add one finished call to a caller-supplied usage dict (no-op for None):
+    providers/models used, number of calls and input/output tokens.
+    """
+    if usage is None:
+        return
+    counts = getattr(message, "usage_metadata", None) or {}
+    with _usage_lock:
+        for key, value in (("provider", provider), ("model", model)):
+            names = set(filter(None, (usage.get(key) or "").split("+"))) | {value}
+            usage[key] = "+".join(sorted(names))
+        usage["llm_calls"] = usage.get("llm_calls", 0) + 1
+        usage["input_tokens"] = usage.get("input_tokens", 0) + (counts.get("input_tokens") or 0)
+        usage["output_tokens"] = usage.get("output_tokens", 0) + (counts.get("output_tokens") or 0)
+
+
+class RateLimitTimeout(TimeoutError):
+    """acquire() gave up waiting; callers treat it like a 429 and fall back"""
+
+
+def estimate_tokens(text: str, max_output_tokens: int = 0) -> int:
+    """Rough token count (~4 chars/token) plus the output budget the provider reserves"""
+    return len(text or "") // 4 + max_output_tokens
+
+
+def _header_number(value) -> Optional[float]:
+    """Numeric rate-limit header value; None if missing or malformed"""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_duration(value) -> Optional[float]:
+    """Parse header durations like '20ms', '1s', '6m0s', '1h2m' or plain seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect 429/quota errors across OpenAI, Groq and Gemini client exceptions"""
+    if isinstance(error, RateLimitTimeout):
+        return True
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    name = error.__class__.__name__
+    if name in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "rate_limit" in text or "resource_exhausted" in text
+
+
+def retry_after_from_error(error: Exception) -> Optional[float]:
+    """Read Retry-After / reset headers from an SDK exception, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for key in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        seconds = _parse_duration(headers.get(key)) if hasattr(headers, "get") else None
+        if seconds:
+            return seconds
+    match = re.search(r"try again in (\d+(?:\.\d+)?)(ms|s)", str(error).lower())
+    if match:
+        return _parse_duration(match.group(1) + match.group(2))
+    return None
+
+
+class RateLimiter:
+    """Token buckets per provider, shared across processes through SQLite"""
+
+    def __init__(self, state_path: str = RATE_LIMIT_DB_PATH, limits: Optional[dict] = None):
+        self.state_path = state_path
+        self.limits = {}
+        for provider, default in (limits or PROVIDER_LIMITS).items():
+            prefix = provider.upper()
+            self.limits[provider] = {
+                "rpm": float(os.getenv(f"{prefix}_RPM", default["rpm"])),
+                "tpm": float(os.getenv(f"{prefix}_TPM", default["tpm"])),
+            }
+        # Rolling average of completion tokens per provider (this process)
+        self._output_tokens: dict[str, float] = {}
+        self._output_lock = threading.Lock()
+        parent = os.path.dirname(state_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                provider TEXT PRIMARY KEY,
+                request_tokens REAL NOT NULL,
+                token_tokens REAL NOT NULL,
+                rate_scale REAL NOT NULL DEFAULT 1.0,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+
+    def _load(self, conn: sqlite3.Connection, provider: str, now: float) -> dict:
+        """Read the bucket and refill it for the time elapsed since the last update"""
+        limit = self.limits[provider]
+        row = conn.execute("""
+            SELECT request_tokens, token_tokens, rate_scale, blocked_until, updated_at
+            FROM rate_limit_buckets WHERE provider = ?
+        """, (provider,)).fetchone()
+        if row is None:
+            return {"requests": limit["rpm"], "tokens": limit["tpm"], "scale": 1.0, "blocked_until": 0.0}
+
+        requests, tokens, scale, blocked_until, updated_at = row
+        elapsed = max(0.0, now - updated_at)
+        return {
+            "requests": min(limit["rpm"], requests + elapsed * limit["rpm"] / 60 * scale),
+            "tokens": min(limit["tpm"], tokens + elapsed * limit["tpm"] / 60 * scale),
+            "scale": scale,
+            "blocked_until": blocked_until,
+        }
+
+    @staticmethod
+    def _save(conn: sqlite3.Connection, provider: str, bucket: dict, now: float) -> None:
+        conn.execute("""
+            INSERT INTO rate_limit_buckets (provider, request_tokens, token_tokens, rate_scale, blocked_until, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(provider) DO UPDATE SET
+                request_tokens = excluded.request_tokens,
+                token_tokens = excluded.token_tokens,
+                rate_scale = excluded.rate_scale,
+                blocked_until = excluded.blocked_until,
+                updated_at = excluded.updated_at
+        """, (provider, bucket["requests"], bucket["tokens"], bucket["scale"], bucket["blocked_until"], now))
+
+    def _update(self, provider: str, change) -> object:
+        """Run change(bucket, now) on the refilled bucket inside one write transaction"""
+        if provider not in self.limits:
+            return None
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            bucket = self._load(conn, provider, now)
+            result = change(bucket, now)
+            self._save(conn, provider, bucket, now)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ─── Acquire ────────────────────────────────────────────────
+
+    def try_acquire(self, provider: str, tokens: int = 0) -> float:
+        """Take one request + `tokens` if available. Returns 0 on success, else seconds to wait"""
+        limit = self.limits.get(provider)
+        if limit is None:
+            return 0.0
+        tokens = min(float(tokens), limit["tpm"])  # an oversized request waits for a full bucket
+
+        def take(bucket, now):
+            if now < bucket["blocked_until"]:
+                return bucket["blocked_until"] - now
+            request_rate = limit["rpm"] / 60 * bucket["scale"]
+            token_rate = limit["tpm"] / 60 * bucket["scale"]
+            wait = max(
+                (1 - bucket["requests"]) / request_rate if bucket["requests"] < 1 else 0.0,
+                (tokens - bucket["tokens"]) / token_rate if bucket["tokens"] < tokens else 0.0,
+            )
+            if wait > 0:
+                return wait
+            bucket["requests"] -= 1
+            bucket["tokens"] -= tokens
+            return 0.0
+
+        return self._update(provider, take)
+
+    def acquire(self, provider: str, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Block until the provider has capacity for one request of `tokens` tokens.
+        Returns the seconds spent waiting; raises RateLimitTimeout after `timeout`.
+        """
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(provider, tokens)
+            if wait <= 0:
+                return time.monotonic() - started
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                raise RateLimitTimeout(f"Rate limiter: no {provider} capacity within {timeout:.0f}s")
+            time.sleep(min(wait, MAX_SLEEP_SLICE))
+
+    async def acquire_async(self, provider: str, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """acquire() for asyncio code: waits with asyncio.sleep, never blocks the event loop"""
+        started = time.monotonic()
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, provider, tokens)
+            if wait <= 0:
+                return time.monotonic() - started
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                raise RateLimitTimeout(f"Rate limiter: no {provider} capacity within {timeout:.0f}s")
+            await asyncio.sleep(min(wait, MAX_SLEEP_SLICE))
+
+    def available_capacity(self, provider: str) -> float:
+        """Fraction (0-1) of the provider's request bucket currently available"""
+        limit = self.limits.get(provider)
+        if limit is None:
+            return 0.0
+        conn = self._connect()
+        try:
+            now = time.time()
+            bucket = self._load(conn, provider, now)
+        finally:
+            conn.close()
+        if now < bucket["blocked_until"]:
+            return 0.0
+        return min(bucket["requests"] / limit["rpm"], bucket["tokens"] / limit["tpm"]) * bucket["scale"]
+
+    def expected_tokens(self, provider: str, text: str, max_output_tokens: int) -> int:
+        """Tokens to reserve for one call: the prompt plus the provider's average completion (capped)"""
+        with self._output_lock:
+            expected_output = self._output_tokens.get(provider, DEFAULT_OUTPUT_TOKENS)
+        return estimate_tokens(text) + int(min(max_output_tokens, expected_output))
+
+    # ─── Feedback ───────────────────────────────────────────────
+
+    def record_response(self, provider: str, estimated_tokens: int, message=None) -> None:
+        """
+        Settle a finished call: correct the token estimate with actual usage,
+        apply rate-limit headers and count the success towards rate recovery.
+        """
+        metadata = getattr(message, "response_metadata", None) or {}
+        headers = metadata.get("headers") or {}
+        usage = getattr(message, "usage_metadata", None) or {}
+        actual_tokens = usage.get("total_tokens")
+        output_tokens = usage.get("output_tokens")
+        if output_tokens is not None:
+            with self._output_lock:
+                average = self._output_tokens.get(provider)
+                self._output_tokens[provider] = float(output_tokens) if average is None else (
+                    average + OUTPUT_AVERAGE_WEIGHT * (output_tokens - average)
+                )
+        limit = self.limits.get(provider)
+        if limit is None:
+            return
+
+        def settle(bucket, now):
+            if actual_tokens is not None:
+                bucket["tokens"] = min(limit["tpm"], bucket["tokens"] + estimated_tokens - actual_tokens)
+            self._apply_headers(bucket, headers, now)
+            bucket["scale"] = min(1.0, bucket["scale"] + RATE_INCREASE_STEP)
+
+        self._update(provider, settle)
+
+    @staticmethod
+    def _apply_headers(bucket: dict, headers, now: float) -> None:
+        lower = {str(key).lower(): value for key, value in dict(headers).items()}
+        remaining_requests = _header_number(lower.get("x-ratelimit-remaining-requests"))
+        remaining_tokens = _header_number(lower.get("x-ratelimit-remaining-tokens"))
+        if remaining_requests is not None:
+            bucket["requests"] = min(bucket["requests"], remaining_requests)
+            if remaining_requests <= 0:
+                reset = _parse_duration(lower.get("x-ratelimit-reset-requests")) or DEFAULT_RETRY_AFTER
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + reset)
+        if remaining_tokens is not None:
+            bucket["tokens"] = min(bucket["tokens"], remaining_tokens)
+            if remaining_tokens <= 0:
+                reset = _parse_duration(lower.get("x-ratelimit-reset-tokens")) or DEFAULT_RETRY_AFTER
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + reset)
+        retry_after = _parse_duration(lower.get("retry-after"))
+        if retry_after:
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + retry_after)
+
+    def on_rate_limited(self, provider: str, retry_after: Optional[float] = None) -> None:
+        """A 429 arrived: back off (block until retry_after, halve the refill rate)"""
+
+        def back_off(bucket, now):
+            bucket["scale"] = max(MIN_RATE_SCALE, bucket["scale"] * RATE_DECREASE_FACTOR)
+            bucket["requests"] = min(bucket["requests"], 0.0)
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + (retry_after or DEFAULT_RETRY_AFTER))
+
+        self._update(provider, back_off)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter (state is still shared with other processes via SQLite)"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
@@ -1,7 +1,6 @@
-import chromadb
 from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-import os
+
+from app.vectorstore.model_registry import EMBEDDING_MODEL, get_chroma_client, get_embedder, model_cache_dir
 
 class ResumeVectorStore:
     """Production-grade vector store for resume embeddings"""
@@ -9,22 +8,11 @@ class ResumeVectorStore:
     def __init__(self, persist_directory: str = "storage/chroma"):
         # ✅ FIX: Set cache directories to D drive to avoid C drive full issues
         # HuggingFace/SentenceTransformer cache (where models are downloaded)
-        cache_dir = os.path.join(os.path.dirname(os.path.abspath(persist_directory)), "model_cache")
-        os.makedirs(cache_dir, exist_ok=True)
-        os.environ['HF_HOME'] = cache_dir
-        os.environ['TRANSFORMERS_CACHE'] = cache_dir
-        os.environ['SENTENCE_TRANSFORMERS_HOME'] = cache_dir
-        
-        # Chroma data directory (where vector embeddings are stored)
-        abs_persist_dir = os.path.abspath(persist_directory)
-        os.makedirs(abs_persist_dir, exist_ok=True)
+        self.cache_dir = model_cache_dir(persist_directory)
         
-        # ChromaDB 1.4.0: PersistentClient is the CORRECT new API
-        self.client = chromadb.PersistentClient(path=abs_persist_dir)
-        
-        # Best balance of speed and quality
-        # Will use the cache_dir set above instead of C drive default
-        self.embedder = SentenceTransformer('all-mpnet-base-v2', cache_folder=cache_dir)
+        # One PersistentClient per directory and one model per process, shared
+        # by every store (see model_registry) - constructing a store is cheap
+        self.client = get_chroma_client(persist_directory)
         
         # Create collection with metadata indexing
         self.collection = self.client.get_or_create_collection(
@@ -32,6 +20,11 @@ class ResumeVectorStore:
             metadata={"hnsw:space": "cosine"}  # Better for semantic similarity
         )
     
+    @property
+    def embedder(self):
+        # Best balance of speed and quality; loaded on first encode, not on construction
+        return get_embedder(EMBEDDING_MODEL, self.cache_dir)
+    
     def add_resume_chunks(
         self, resume_id: str, chunks: List[Dict[str, str]], metadata: Dict):
         """
@@ -1,31 +1,25 @@
-import os
 from typing import Dict, List, Optional
 
-import chromadb
-from sentence_transformers import SentenceTransformer
+from app.vectorstore.model_registry import EMBEDDING_MODEL, get_chroma_client, get_embedder, model_cache_dir
 
 
 class JDVectorStore:
     """Dedicated vector store for job descriptions."""
 
     def __init__(self, persist_directory: str = "storage/chroma_jd"):
-        cache_dir = os.path.join(os.path.dirname(os.path.abspath(persist_directory)), "model_cache")
-        os.makedirs(cache_dir, exist_ok=True)
-        os.environ["HF_HOME"] = cache_dir
-        os.environ["TRANSFORMERS_CACHE"] = cache_dir
-        os.environ["SENTENCE_TRANSFORMERS_HOME"] = cache_dir
-
-        abs_persist_dir = os.path.abspath(persist_directory)
-        os.makedirs(abs_persist_dir, exist_ok=True)
-
-        self.client = chromadb.PersistentClient(path=abs_persist_dir)
-        self.embedder = SentenceTransformer("all-mpnet-base-v2", cache_folder=cache_dir)
+        self.cache_dir = model_cache_dir(persist_directory)
+        self.client = get_chroma_client(persist_directory)
 
         self.collection = self.client.get_or_create_collection(
             name="job_descriptions",
             metadata={"hnsw:space": "cosine"},
         )
 
+    @property
+    def embedder(self):
+        """The process-wide embedding model, shared with ResumeVectorStore."""
+        return get_embedder(EMBEDDING_MODEL, self.cache_dir)
+
     def add_jd_chunks(self, jd_id: str, chunks: List[Dict[str, object]], metadata: Dict[str, object]) -> None:
         """Add chunks for a JD after removing any stale chunks for the same jd_id."""
         self.delete_jd_chunks(jd_id)
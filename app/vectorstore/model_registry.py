@@ -0,0 +1,114 @@
+# app/vectorstore/model_registry.py
+"""
+Process-wide registry of embedding models and Chroma clients.
+
+ResumeVectorStore, JDVectorStore and HybridResumeSearch used to load their
+own SentenceTransformer (all-mpnet-base-v2, ~420 MB) and open their own
+PersistentClient, and the agent built a new ResumeVectorStore on every
+vector search. Now every store asks this registry instead:
+
+- get_embedder(model_name): one loaded model per name, created on first use
+- get_chroma_client(persist_directory): one PersistentClient per directory
+
+Both are lazy and thread-safe. Concurrent first callers wait for a single
+load instead of loading twice. A forked child starts with an empty registry.
+
+warm_up() loads the model and clients in a background thread at startup
+(ResumeIntelligenceAgent does this unless VECTOR_WARMUP=0), so not even the
+first query waits for the model.
+
+Usage:
+    embedder = get_embedder()
+    client = get_chroma_client("storage/chroma")
+    warm_up(["storage/chroma"])
+"""
+
+import os
+import threading
+from typing import Iterable, Optional
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-mpnet-base-v2")
+VECTOR_WARMUP = os.getenv("VECTOR_WARMUP", "1") not in ("0", "false", "False")
+
+_lock = threading.Lock()
+_pid = None
+_embedders = {}     # model name -> SentenceTransformer
+_clients = {}       # absolute persist directory -> chromadb.PersistentClient
+_load_locks = {}    # registry key -> lock held while that entry loads
+
+
+def model_cache_dir(persist_directory: str) -> str:
+    """
+    Model download cache next to the vector store (storage/model_cache), also
+    exported for HuggingFace so downloads do not land on the system drive
+    """
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(persist_directory)), "model_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ["HF_HOME"] = cache_dir
+    os.environ["TRANSFORMERS_CACHE"] = cache_dir
+    os.environ["SENTENCE_TRANSFORMERS_HOME"] = cache_dir
+    return cache_dir
+
+
+def _load_lock(key: tuple) -> threading.Lock:
+    global _pid
+    with _lock:
+        # A forked child must not reuse its parent's models and clients
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _embedders.clear()
+            _clients.clear()
+            _load_locks.clear()
+        return _load_locks.setdefault(key, threading.Lock())
+
+
+def get_embedder(model_name: str = EMBEDDING_MODEL, cache_dir: Optional[str] = None):
+    """The shared SentenceTransformer for model_name (loaded on the first call)"""
+    with _load_lock(("embedder", model_name)):
+        embedder = _embedders.get(model_name)
+        if embedder is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"   🧠 Loading embedding model {model_name}...")
+            embedder = _embedders[model_name] = SentenceTransformer(
+                model_name, cache_folder=cache_dir or model_cache_dir("storage/chroma")
+            )
+        return embedder
+
+
+def get_chroma_client(persist_directory: str):
+    """The shared PersistentClient for persist_directory (opened on the first call)"""
+    path = os.path.abspath(persist_directory)
+    with _load_lock(("chroma", path)):
+        client = _clients.get(path)
+        if client is None:
+            import chromadb
+            os.makedirs(path, exist_ok=True)
+            client = _clients[path] = chromadb.PersistentClient(path=path)
+        return client
+
+
+def warm_up(persist_directories: Iterable[str] = ("storage/chroma",), model_name: str = EMBEDDING_MODEL,
+            background: bool = True) -> Optional[threading.Thread]:
+    """
+    Load the embedding model and open the Chroma clients ahead of the first
+    query. In the background by default (returns the daemon thread); failures
+    are reported, not raised - the first query simply loads them itself.
+    """
+    persist_directories = list(persist_directories)
+
+    def load():
+        try:
+            for persist_directory in persist_directories:
+                get_chroma_client(persist_directory)
+            cache_dir = model_cache_dir(persist_directories[0]) if persist_directories else None
+            get_embedder(model_name, cache_dir)
+            print(f"   ✅ Vector search warmed up ({model_name})")
+        except Exception as e:
+            print(f"   ⚠️ Vector search warm-up failed: {e}")
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, name="vector-warmup", daemon=True)
+    thread.start()
+    return thread
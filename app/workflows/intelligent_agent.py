@@ -23,6 +23,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from querying.hybrid_search import HybridResumeSearch 
 from querying.jd_resume_matcher import rank_resumes_for_jd
 from generation.answer_generation import generate_answer
+from app.db.connection import get_cursor
+from app.db.resume_facets import (
+    education_filter_sql, employment_filter_sql, location_filter_sql, normalize_degree, normalize_institute
+)
+from app.db.resume_fts import fts_column_filter, text_match_sql
+from app.db.resume_skills import skill_filter_sql
 import sqlite3
 
 
@@ -74,6 +80,8 @@ class FiltersModel(BaseModel):
     required_skills: list[str] = Field(default_factory=list, description="Required skills")
     location: str | None = Field(default=None, description="Location filter")
     company: str | None = Field(default=None, description="Company filter")
+    employed_from: str | None = Field(default=None, description="Worked (at company, if given) on or after this date: 'YYYY' or 'YYYY-MM'")
+    employed_to: str | None = Field(default=None, description="Worked (at company, if given) on or before this date: 'YYYY' or 'YYYY-MM'")
     job_title: str | None = Field(default=None, description="Job title filter")
     current_role: str | None = Field(default=None, description="Current role filter")
     phone: str | None = Field(default=None, description="Filter by phone number")
@@ -205,9 +213,13 @@ COLUMNS:
 │   │   └── Phone number (may include country code, formatting varies)
 │   │   └── Examples: "+91-8374106843", "9876543210", "(555) 123-4567"
 │   │
-│   └── location (TEXT)
-│       └── Current location/city
-│       └── Examples: "Bangalore", "New Delhi", "Mumbai, Maharashtra"
+│   ├── location (TEXT)
+│   │   └── Current location/city
+│   │   └── Examples: "Bangalore", "New Delhi", "Mumbai, Maharashtra"
+│   │
+│   └── location_norm (TEXT)
+│       └── Lowercased location with city aliases merged (search locations in resume_location)
+│       └── Examples: "bangalore karnataka" (for "Bengaluru, Karnataka"), "delhi", "mumbai maharashtra"
 │
 ├── PROFESSIONAL SUMMARY:
 │   ├── total_experience_years (REAL)
@@ -222,7 +234,7 @@ COLUMNS:
 │   └── skills (TEXT)
 │       └── JSON array of all technical and non-technical skills
 │       └── Format: ["Python", "Java", "Machine Learning", "AWS", "React"]
-│       └── Search using: skills LIKE '%Python%'
+│       └── For display only; SEARCH skills through the resume_skills table below
 │
 ├── WORK EXPERIENCE (JSON stored as TEXT):
 │   └── work_experience (TEXT)
@@ -236,8 +248,7 @@ COLUMNS:
 │             },
 │             ...
 │           ]
-│       └── Search companies: work_experience LIKE '%Google%'
-│       └── Search roles: work_experience LIKE '%Engineer%'
+│       └── Search companies through resume_employment, roles through resume_fts (see below)
 │
 ├── EDUCATION (JSON stored as TEXT):
 │   └── education (TEXT)
@@ -252,8 +263,7 @@ COLUMNS:
 │             },
 │             ...
 │           ]
-│       └── Search institutes: education LIKE '%IIT%' OR education LIKE '%National Institute of Technology%'
-│       └── Search degrees: education LIKE '%MBA%' OR education LIKE '%B.Tech%'
+│       └── Search institutes/degrees through resume_education (see below)
 │
 ├── PROJECTS (JSON stored as TEXT):
 │   └── projects (TEXT)
@@ -267,7 +277,7 @@ COLUMNS:
 │             },
 │             ...
 │           ]
-│       └── Search: projects LIKE '%RAG%' OR projects LIKE '%Healthcare%'
+│       └── Search through resume_fts: projects : ("RAG" OR "Healthcare")
 │
 ├── ACHIEVEMENTS & CERTIFICATIONS (JSON stored as TEXT):
 │   └── additional_information (TEXT)
@@ -278,7 +288,7 @@ COLUMNS:
 │             "languages": ["English", "Hindi"],
 │             "hobbies": ["Photography", "Chess"]
 │           }
-│       └── Search: additional_information LIKE '%AWS Certified%'
+│       └── Search through resume_fts: additional_information : "AWS Certified"
 │
 └── METADATA:
     ├── parsed_at (TIMESTAMP)
@@ -289,6 +299,66 @@ COLUMNS:
 
 ═══════════════════════════════════════════════════════════════════════════
 
+TABLE: resume_skills
+─────────────────────────────────────────────────────────────────────────────
+One row per resume and skill (indexed; use it for EVERY skill filter).
+
+COLUMNS:
+├── resume_id (TEXT, FOREIGN KEY → parsed_resumes.resume_id)
+├── skill_canonical (TEXT) - lowercase skill name, aliases merged
+│   └── Examples: 'python', 'javascript' (also for "JS"), 'aws', 'machine learning'
+└── skill_raw (TEXT) - the skill as written in the resume
+
+Exact match only: skill_canonical = 'java' does NOT match JavaScript.
+
+═══════════════════════════════════════════════════════════════════════════
+
+TABLE: resume_location (one row per location part; indexed; use it for EVERY location filter)
+─────────────────────────────────────────────────────────────────────────────
+COLUMNS:
+├── token (TEXT) - lowercase city/area/state, city aliases merged, plus the whole location
+│   └── Examples: 'whitefield', 'bangalore', 'karnataka' (for "Whitefield, Bengaluru, Karnataka")
+└── resume_id (TEXT, FOREIGN KEY → parsed_resumes.resume_id)
+
+TABLE: resume_employment (one row per job; indexed; use it for EVERY company or tenure filter)
+─────────────────────────────────────────────────────────────────────────────
+COLUMNS:
+├── resume_id (TEXT, FOREIGN KEY → parsed_resumes.resume_id)
+├── company (TEXT) - as written in the resume
+├── company_norm (TEXT) - lowercase, no punctuation or legal suffix
+│   └── Examples: 'google india' (for "Google India Pvt. Ltd."), 'tata consultancy services'
+├── role (TEXT)
+├── start_date (TEXT) - 'YYYY-MM'
+└── end_date (TEXT) - 'YYYY-MM', 'present' for the current job, NULL if unknown
+
+TABLE: resume_education (one row per degree; indexed; use it for EVERY institute or degree filter)
+─────────────────────────────────────────────────────────────────────────────
+COLUMNS:
+├── resume_id (TEXT, FOREIGN KEY → parsed_resumes.resume_id)
+├── institute_norm (TEXT) - lowercase, abbreviations written out
+│   └── Examples: 'indian institute of technology delhi' (for "IIT Delhi"),
+│       'national institute of technology trichy', 'delhi university'
+├── degree_norm (TEXT) - degree code: 'btech', 'be', 'mtech', 'bsc', 'msc', 'bca', 'mca', 'mba', 'phd', ...
+└── year (TEXT)
+
+═══════════════════════════════════════════════════════════════════════════
+
+TABLE: resume_fts (FTS5 full-text index, one row per resume)
+─────────────────────────────────────────────────────────────────────────────
+Use it for EVERY job title, project, achievement or free-text keyword filter
+instead of LIKE on the JSON columns.
+
+COLUMNS:
+├── resume_id (not searchable; join key to parsed_resumes.resume_id)
+└── candidate_name, current_role, work_experience, education, projects,
+    additional_information, raw_text (full resume text)
+
+MATCH syntax: column : "phrase", {col1 col2} : ("a" OR "b"), AND / OR / NOT between terms.
+Whole words only ("Data" does not match "Database"); add * for a prefix ("Micro"*).
+Rank best matches first with ORDER BY bm25(resume_fts).
+
+═══════════════════════════════════════════════════════════════════════════
+
 TABLE: documents
 ─────────────────────────────────────────────────────────────────────────────
 Stores original uploaded PDF documents and extracted text.
@@ -296,7 +366,7 @@ Stores original uploaded PDF documents and extracted text.
 COLUMNS:
 ├── document_id (TEXT, PRIMARY KEY)
 ├── batch_id (TEXT, FOREIGN KEY → upload_batches.batch_id)
-├── raw_text (TEXT) - Full extracted text from PDF
+├── raw_text (TEXT) - Extracted text; NULL once indexed (search text through resume_fts raw_text instead)
 ├── original_filename (TEXT) - Original PDF filename
 ├── file_path (TEXT) - Path to stored PDF
 ├── status (TEXT) - Processing status: 'uploaded', 'extracted', 'parsed'
@@ -310,26 +380,39 @@ IMPORTANT SEARCH PATTERNS:
 1. PHONE NUMBER SEARCH (handles different formats):
    WHERE REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '(', ''), ')', ''), '+', '') LIKE '%8374106843%'
 
-2. EDUCATION INSTITUTE SEARCH (flexible matching):
-   WHERE education LIKE '%IIT%' OR education LIKE '%Indian Institute of Technology%'
-
-3. SKILLS SEARCH (JSON array search):
-   WHERE skills LIKE '%Python%' AND skills LIKE '%AWS%'
+2. EDUCATION INSTITUTE SEARCH (indexed, abbreviations written out):
+   Prefix matches on *_norm columns and resume_location.token are written as an
+   index range, never LIKE (LIKE cannot use the index): a value equal to 'x', or
+   starting with 'x ' (next word), is  (col = 'x' OR (col >= 'x ' AND col < 'x!'))
+   WHERE resume_id IN (SELECT resume_id FROM resume_education
+                       WHERE (institute_norm = 'indian institute of technology'
+                              OR (institute_norm >= 'indian institute of technology '
+                                  AND institute_norm < 'indian institute of technology!')))
+
+3. SKILLS SEARCH (indexed, lowercase canonical names):
+   Has Python AND AWS:
+   WHERE resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python')
+     AND resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'aws')
+   Has ML OR AI (list the variations):
+   WHERE resume_id IN (SELECT resume_id FROM resume_skills
+                       WHERE skill_canonical IN ('ml', 'machine learning', 'ai', 'artificial intelligence'))
 
 4. EXPERIENCE RANGE:
    WHERE total_experience_years BETWEEN 3 AND 5
 
-5. COMPANY SEARCH:
-   WHERE work_experience LIKE '%Google%' OR work_experience LIKE '%Microsoft%'
+5. COMPANY SEARCH (indexed, lowercase; one row per job, so select DISTINCT or use IN):
+   SELECT DISTINCT resume_id FROM resume_employment
+   WHERE (company_norm = 'google' OR (company_norm >= 'google ' AND company_norm < 'google!'))
+      OR (company_norm = 'microsoft' OR (company_norm >= 'microsoft ' AND company_norm < 'microsoft!'))
 
 6. MULTI-CRITERIA:
-   WHERE skills LIKE '%Python%' 
+   WHERE resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python')
      AND total_experience_years >= 5 
-     AND education LIKE '%IIT%'
+     AND resume_id IN (SELECT resume_id FROM resume_education WHERE (institute_norm = 'indian institute of technology' OR (institute_norm >= 'indian institute of technology ' AND institute_norm < 'indian institute of technology!')))
 
 7. AGGREGATIONS:
-   SELECT COUNT(*) FROM parsed_resumes WHERE skills LIKE '%Python%'
-   SELECT AVG(total_experience_years) FROM parsed_resumes WHERE education LIKE '%IIT%'
+   SELECT COUNT(*) FROM resume_skills WHERE skill_canonical = 'python'
+   SELECT AVG(total_experience_years) FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_education WHERE (institute_norm = 'indian institute of technology' OR (institute_norm >= 'indian institute of technology ' AND institute_norm < 'indian institute of technology!')))
    SELECT candidate_name, total_experience_years FROM parsed_resumes ORDER BY total_experience_years DESC LIMIT 5
 
 ═══════════════════════════════════════════════════════════════════════════
@@ -685,18 +768,11 @@ def _normalize_text_list(value: Any) -> list[str]:
     return [str(value).strip()] if str(value).strip() else []
 
 
-def _get_resumes_db_path() -> str:
-    return os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-
-
 @lru_cache(maxsize=1)
 def _candidate_name_inventory() -> tuple[str, ...]:
     """Load distinct candidate names once for heuristic fallback matching."""
     try:
-        conn = sqlite3.connect(_get_resumes_db_path())
-        cursor = conn.cursor()
+        cursor = get_cursor()
         cursor.execute(
             """
             SELECT DISTINCT candidate_name
@@ -705,7 +781,6 @@ def _candidate_name_inventory() -> tuple[str, ...]:
             """
         )
         names = [row[0].strip() for row in cursor.fetchall() if row and row[0] and row[0].strip()]
-        conn.close()
         return tuple(sorted(set(names), key=lambda item: (-len(item), item.lower())))
     except Exception:
         return tuple()
@@ -870,6 +945,8 @@ def _build_fallback_query_analysis(state: AgentState) -> dict[str, Any]:
         "required_skills": [],
         "location": None,
         "company": None,
+        "employed_from": None,
+        "employed_to": None,
         "job_title": None,
         "current_role": None,
         "phone": None,
@@ -1336,6 +1413,11 @@ Extract ALL criteria mentioned in the query:
 - "worked at Google" → filters.company = "Google"
 - "built chatbot" → filters.project_keyword = "chatbot"
 
+**Tenure window:** When they worked (at the company, if one is named)
+- "worked at Infosys between 2018 and 2020" → filters.company = "Infosys", filters.employed_from = "2018", filters.employed_to = "2020"
+- "at Google since 2022" → filters.company = "Google", filters.employed_from = "2022"
+- "worked anywhere before 2015" → filters.employed_to = "2015"
+
 **MULTI-CRITERIA CRITICAL:** Extract ALL filters even if query has multiple types!
 - "Python developers from IIT with 5+ years" → extract ALL three filters
 - DO NOT skip any criteria
@@ -1666,14 +1748,8 @@ def jd_resume_match_node(state: AgentState) -> AgentState:
 
     print("\n🎯 EXECUTING JD-RESUME MATCHING...")
 
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_cursor(row_factory=sqlite3.Row)
 
         analysis = state.get("query_analysis", {})
         requested_jd_id = analysis.get("requested_jd_id")
@@ -1686,12 +1762,10 @@ def jd_resume_match_node(state: AgentState) -> AgentState:
             state["candidate_ids"] = []
             state["should_retry"] = False
             state["answer"] = "I couldn't find any indexed job description to match against. Please run JD indexing first."
-            conn.close()
             return state
 
         cursor.execute("SELECT * FROM parsed_resumes")
         resumes = [dict(row) for row in cursor.fetchall()]
-        conn.close()
 
         if not resumes:
             state["selected_jd"] = jd_record
@@ -1735,14 +1809,8 @@ def jd_info_node(state: AgentState) -> AgentState:
 
     print("\n📋 FETCHING JD INFORMATION...")
 
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = get_cursor(row_factory=sqlite3.Row)
 
         analysis = state.get("query_analysis", {})
         conversation_context = state.get("conversation_context", {})
@@ -1750,7 +1818,6 @@ def jd_info_node(state: AgentState) -> AgentState:
         requested_jd_id = analysis.get("requested_jd_id") or active_jd.get("jd_id")
 
         jd_record = _fetch_jd_record(cursor, requested_jd_id)
-        conn.close()
 
         if not jd_record:
             state["selected_jd"] = {}
@@ -1858,51 +1925,32 @@ def validate_assumptions_node(state: AgentState) -> AgentState:
         params_local = [f"%{part}%" for part in name_parts]
         return clause, params_local
 
-    def _extract_company_suggestions(work_experience_text: str) -> list[str]:
-        """Extract likely company names from serialized work_experience text."""
-        suggestions: list[str] = []
-        if not work_experience_text:
-            return suggestions
-
-        # Common JSON style: "company": "Samsung"
-        json_companies = re.findall(r'"company"\s*:\s*"([^"]+)"', work_experience_text, flags=re.IGNORECASE)
-        for comp in json_companies:
-            comp_clean = comp.strip()
-            if comp_clean:
-                suggestions.append(comp_clean)
-
-        # Fallback narrative style: "at <Company Name>"
-        text_companies = re.findall(r'\bat\s+([A-Z][A-Za-z0-9&.,\- ]{1,40})', work_experience_text)
-        for comp in text_companies:
-            comp_clean = comp.strip(" .,-")
-            if len(comp_clean) >= 2:
-                suggestions.append(comp_clean)
-
+    def _extract_company_suggestions(cursor, resume_id: str) -> list[str]:
+        """Companies the candidate worked at (resume_employment), most recent first."""
+        cursor.execute(
+            "SELECT company, company_norm FROM resume_employment WHERE resume_id = ? "
+            "ORDER BY end_date DESC, start_date DESC",  # 'present' sorts first
+            (resume_id,)
+        )
         # De-duplicate while preserving order
         unique: list[str] = []
         seen: set[str] = set()
-        for comp in suggestions:
-            key = comp.lower()
-            if key in seen:
+        for company, company_norm in cursor.fetchall():
+            if company_norm in seen:
                 continue
-            seen.add(key)
-            unique.append(comp)
+            seen.add(company_norm)
+            unique.append(company)
         return unique[:4]
 
     if names:
-        db_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-        )
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            cursor = get_cursor()
             missing_names = []
             for name in names:
                 name_clause, name_params = _build_name_where_clause(name)
                 cursor.execute(f"SELECT 1 FROM parsed_resumes WHERE {name_clause} LIMIT 1", name_params)
                 if not cursor.fetchone():
                     missing_names.append(name)
-            conn.close()
             
             if missing_names:
                 analysis["is_ambiguous"] = True
@@ -1913,36 +1961,38 @@ def validate_assumptions_node(state: AgentState) -> AgentState:
 
             # Validate assumption: person + company asked, but company not found in person's experience
             if requested_company:
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-
-                matched_rows: list[tuple[str, str, str, str, float | None]] = []
+                matched_rows: list[tuple[str, str, str, float | None]] = []
                 for name in names:
                     name_clause, name_params = _build_name_where_clause(name)
                     sql = (
-                        "SELECT resume_id, candidate_name, work_experience, current_role, total_experience_years "
+                        "SELECT resume_id, candidate_name, current_role, total_experience_years "
                         f"FROM parsed_resumes WHERE {name_clause}"
                     )
                     cursor.execute(sql, name_params)
                     matched_rows.extend(cursor.fetchall())
 
-                conn.close()
-
-                requested_company_lower = requested_company.lower()
+                # Employer lookup in resume_employment (indexed); current_role may name the company too
                 company_matches = []
-                for row in matched_rows:
-                    work_exp = (row[2] or "")
-                    current_role = (row[3] or "")
-                    haystack = f"{work_exp} {current_role}".lower()
-                    if requested_company_lower in haystack:
-                        company_matches.append(row)
-
-                if matched_rows and not company_matches:
+                employment_sql, employment_params = employment_filter_sql(requested_company)
+                if matched_rows and employment_sql:
+                    placeholders = ",".join("?" * len(matched_rows))
+                    cursor.execute(
+                        f"SELECT resume_id FROM parsed_resumes WHERE resume_id IN ({placeholders}) AND {employment_sql}",
+                        [row[0] for row in matched_rows] + employment_params
+                    )
+                    employed_ids = {row[0] for row in cursor.fetchall()}
+                    requested_company_lower = requested_company.lower()
+                    company_matches = [
+                        row for row in matched_rows
+                        if row[0] in employed_ids or requested_company_lower in (row[2] or "").lower()
+                    ]
+
+                if matched_rows and employment_sql and not company_matches:
                     candidate_name = matched_rows[0][1] or names[0]
-                    current_role = matched_rows[0][3] or "their current role"
-                    total_exp = matched_rows[0][4]
+                    current_role = matched_rows[0][2] or "their current role"
+                    total_exp = matched_rows[0][3]
 
-                    alternatives = _extract_company_suggestions(matched_rows[0][2] or "")
+                    alternatives = _extract_company_suggestions(cursor, matched_rows[0][0])
                     alt_phrase = ""
                     if alternatives:
                         if len(alternatives) == 1:
@@ -2060,13 +2110,7 @@ def sql_filter_node(state: AgentState) -> AgentState:
         # Strategy: Keep candidate_ids filter + only NEW criteria mentioned in current query
 
     # Build SQL query dynamically
-    import os
-
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    cursor = get_cursor()
 
     where_clauses = []
     params = []
@@ -2144,9 +2188,12 @@ def sql_filter_node(state: AgentState) -> AgentState:
 
     # Location filter
     # Skip if tool action with explicit names (location may refer to interview venue, not candidate)
+    # Indexed prefix match on location tokens ("Bengaluru" finds "Whitefield, Bangalore")
     if filters.get("location") and not should_skip_job_filters:
-        where_clauses.append("location LIKE ?")
-        params.append(f"%{filters['location']}%")
+        location_sql, location_params = location_filter_sql(filters["location"])
+        if location_sql:
+            where_clauses.append(location_sql)
+            params.extend(location_params)
 
     # Skills filter with intelligent expansion for abbreviations and synonyms
     if filters.get("required_skills"):
@@ -2200,65 +2247,63 @@ def sql_filter_node(state: AgentState) -> AgentState:
         # - If context filtering is active: Use AND (all skills must match within the filtered set)
         # - If no context filtering: Use OR (any skill can match)
         
-        skill_groups = []  # Each group is a list of OR conditions for one skill
+        skill_groups = []  # Each group is the accepted variations of one skill
         
         for skill in filters["required_skills"]:
             skill_lower = skill.lower().strip()
-            skill_conditions = []
             
             # Check if skill has known expansions
             if skill_lower in skill_expansions:
-                # Add OR conditions for all variations of this ONE skill
                 variations = skill_expansions[skill_lower]
-                for variation in variations:
-                    skill_conditions.append("skills LIKE ?")
-                    params.append(f"%{variation}%")
                 print(f"   💡 Skill '{skill}' expanded to: {', '.join(variations)}")
             else:
                 # No expansion - use as-is
-                skill_conditions.append("skills LIKE ?")
-                params.append(f"%{skill}%")
-            
-            # Group the variations for this skill (OR within the group)
-            if skill_conditions:
-                skill_groups.append(f"({' OR '.join(skill_conditions)})")
+                variations = [skill]
+            skill_groups.append(variations)
         
-        # Now combine skill groups based on context
-        if skill_groups:
-            if is_context_filter and len(skill_groups) > 1:
-                # Context filtering with multiple skills: Use AND
-                # Example: "out of these JavaScript developers, who has machine learning"
-                # → Must have BOTH JavaScript AND Machine Learning
-                where_clauses.append(f"({' AND '.join(skill_groups)})")
+        # Indexed lookups in resume_skills: intersection (AND) or union (OR) of skill groups
+        # Context filtering with multiple skills: Use AND
+        # Example: "out of these JavaScript developers, who has machine learning"
+        # → Must have BOTH JavaScript AND Machine Learning
+        # Normal search or single skill: Use OR
+        # Example: "Find JavaScript or Python developers"
+        match_all_skills = is_context_filter and len(skill_groups) > 1
+        skill_sql, skill_params = skill_filter_sql(skill_groups, match_all_skills)
+        if skill_sql:
+            where_clauses.append(skill_sql)
+            params.extend(skill_params)
+            if match_all_skills:
                 print(f"   🔗 Context mode: Requiring ALL {len(skill_groups)} skills (AND logic)")
-            else:
-                # Normal search or single skill: Use OR
-                # Example: "Find JavaScript or Python developers"
-                where_clauses.append(f"({' OR '.join(skill_groups)})")
-                if len(skill_groups) > 1:
-                    print(f"   🔍 Normal mode: Matching ANY of {len(skill_groups)} skills (OR logic)")
+            elif len(skill_groups) > 1:
+                print(f"   🔍 Normal mode: Matching ANY of {len(skill_groups)} skills (OR logic)")
 
     # (should_skip_job_filters was already computed above, before the location filter)
 
     # Job title filter (searches in work_experience JSON and current_role)
     # Skip if email action with explicit names
+    # Text filters below are FTS5 column matches (resume_fts), all required, ranked by BM25
+    text_match_terms = []
     if filters.get("job_title") and not should_skip_job_filters:
         job_title = filters["job_title"]
         # Search in both work_experience JSON and current_role column
-        where_clauses.append("(work_experience LIKE ? OR current_role LIKE ?)")
-        params.append(f"%{job_title}%")
-        params.append(f"%{job_title}%")
+        text_match_terms.append(fts_column_filter(["work_experience", "current_role"], [job_title]))
 
-    # Company filter (searches in work_experience JSON)
+    # Company and tenure filter (one resume_employment row must match both)
     # Skip if email action with explicit names
-    if filters.get("company") and not should_skip_job_filters:
-        where_clauses.append("work_experience LIKE ?")
-        params.append(f"%{filters['company']}%")
-
-    # Current role filter (exact match in current_role column)
+    if not should_skip_job_filters:
+        employment_sql, employment_params = employment_filter_sql(
+            filters.get("company"), filters.get("employed_from"), filters.get("employed_to")
+        )
+        if employment_sql:
+            where_clauses.append(employment_sql)
+            params.extend(employment_params)
+            if filters.get("employed_from") or filters.get("employed_to"):
+                print(f"   🏢 Employment filter: {filters.get('company') or 'any company'} "
+                      f"({filters.get('employed_from') or '…'} – {filters.get('employed_to') or '…'})")
+
+    # Current role filter (current_role column)
     if filters.get("current_role"):
-        where_clauses.append("current_role LIKE ?")
-        params.append(f"%{filters['current_role']}%")
+        text_match_terms.append(fts_column_filter(["current_role"], [filters["current_role"]]))
 
     # Phone filter (flexible matching - removes formatting characters)
     if filters.get("phone"):
@@ -2275,62 +2320,24 @@ def sql_filter_node(state: AgentState) -> AgentState:
         params.append(f"%{filters['email']}%")
         print(f"   📧 Email filter: {filters['email']}")
 
-    # Institute filter (searches in education JSON)
-    # Smart expansion for common institutes (IIT, NIT, BITS, etc.)
-    if filters.get("institute"):
-        institute_name = filters["institute"]
-        
-        # Define common institute abbreviation expansions
-        institute_expansions = {
-            "IIT": ["IIT", "Indian Institute of Technology"],
-            "NIT": ["NIT", "National Institute of Technology"],
-            "BITS": ["BITS", "Birla Institute of Technology and Science"],
-            "IIIT": ["IIIT", "Indian Institute of Information Technology"],
-            "IIM": ["IIM", "Indian Institute of Management"],
-            "ISI": ["ISI", "Indian Statistical Institute"],
-            "AIIMS": ["AIIMS", "All India Institute of Medical Sciences"],
-        }
-        
-        # Check if the institute matches any known abbreviation (case-insensitive)
-        institute_upper = institute_name.upper().strip()
-        expanded_names = None
-        
-        # Exact match or starts with the abbreviation
-        for abbrev, expansions in institute_expansions.items():
-            if institute_upper == abbrev or institute_upper.startswith(abbrev + " "):
-                expanded_names = expansions
-                break
-        
-        if expanded_names:
-            # Create OR clause for all variations
-            institute_conditions = []
-            for variation in expanded_names:
-                institute_conditions.append("education LIKE ?")
-                params.append(f"%{variation}%")
-            where_clauses.append(f"({' OR '.join(institute_conditions)})")
-            print(f"   🎓 Institute filter: {institute_name} → Searching for: {', '.join(expanded_names)}")
-        else:
-            # No expansion needed - use as-is
-            where_clauses.append("education LIKE ?")
-            params.append(f"%{institute_name}%")
-            print(f"   🎓 Institute filter: {institute_name}")
-
-    # Degree filter (searches in education JSON)
-    if filters.get("degree"):
-        where_clauses.append("education LIKE ?")
-        params.append(f"%{filters['degree']}%")
-        print(f"   📜 Degree filter: {filters['degree']}")
+    # Institute and degree filter (resume_education; abbreviations like IIT/NIT/BITS
+    # were expanded at parse time, so "IIT" finds "Indian Institute of Technology Delhi")
+    education_sql, education_params = education_filter_sql(filters.get("institute"), filters.get("degree"))
+    if education_sql:
+        where_clauses.append(education_sql)
+        params.extend(education_params)
+        if filters.get("institute"):
+            print(f"   🎓 Institute filter: {filters['institute']} → {normalize_institute(filters['institute'])}")
+        if filters.get("degree"):
+            print(f"   📜 Degree filter: {filters['degree']} → {normalize_degree(filters['degree'])}")
 
     # Project keyword filter (searches in projects JSON)
     if filters.get("project_keyword"):
-        where_clauses.append("projects LIKE ?")
-        params.append(f"%{filters['project_keyword']}%")
+        text_match_terms.append(fts_column_filter(["projects"], [filters["project_keyword"]]))
         print(f"   💼 Project filter: {filters['project_keyword']}")
 
-    # Build final query
-    sql = "SELECT resume_id FROM parsed_resumes"
-    if where_clauses:
-        sql += " WHERE " + " AND ".join(where_clauses)
+    # Build final query (best text match first when there are text filters)
+    sql, params = text_match_sql(text_match_terms, where_clauses, params)
 
     print(f"   SQL: {sql}")
     print(f"   Params: {params}")
@@ -2340,11 +2347,11 @@ def sql_filter_node(state: AgentState) -> AgentState:
 
     # --- GRACEFUL FILTER RELAXATION ---
     dropped_filters = []
-    if not results and where_clauses:
+    if not results and (where_clauses or text_match_terms):
         print("   ⚠️ Zero results found with strict SQL filters. Attempting graceful filter relaxation...")
         
         # Define optional filters that might over-constrain the query
-        filters_to_try_dropping = ["location", "company", "institute", "degree", "max_experience", "min_experience", "project_keyword", "job_title", "current_role"]
+        filters_to_try_dropping = ["location", "company", "employed_from", "employed_to", "institute", "degree", "max_experience", "min_experience", "project_keyword", "job_title", "current_role"]
         
         # Identify which constraints are actually present in the query
         active_filters = {k: v for k, v in filters.items() if v}
@@ -2395,26 +2402,16 @@ def sql_filter_node(state: AgentState) -> AgentState:
 
             # 3. Skills
             if filters.get("required_skills"):
-                skill_groups_relaxed = []
-                for skill in filters["required_skills"]:
-                    skill_lower = skill.lower().strip()
-                    skill_conditions = []
-                    if skill_lower in skill_expansions:
-                        variations = skill_expansions[skill_lower]
-                        for variation in variations:
-                            skill_conditions.append("skills LIKE ?")
-                            relaxed_params.append(f"%{variation}%")
-                    else:
-                        skill_conditions.append("skills LIKE ?")
-                        relaxed_params.append(f"%{skill}%")
-                    if skill_conditions:
-                        skill_groups_relaxed.append(f"({' OR '.join(skill_conditions)})")
-
-                if skill_groups_relaxed:
-                    if is_context_filter and len(skill_groups_relaxed) > 1:
-                        relaxed_clauses.append(f"({' AND '.join(skill_groups_relaxed)})")
-                    else:
-                        relaxed_clauses.append(f"({' OR '.join(skill_groups_relaxed)})")
+                skill_groups_relaxed = [
+                    skill_expansions.get(skill.lower().strip(), [skill])
+                    for skill in filters["required_skills"]
+                ]
+                skill_sql, skill_params = skill_filter_sql(
+                    skill_groups_relaxed, is_context_filter and len(skill_groups_relaxed) > 1
+                )
+                if skill_sql:
+                    relaxed_clauses.append(skill_sql)
+                    relaxed_params.extend(skill_params)
 
             # Execute relaxed query
             sql_relaxed = "SELECT resume_id FROM parsed_resumes"
@@ -2436,8 +2433,6 @@ def sql_filter_node(state: AgentState) -> AgentState:
             else:
                 print("   ❌ Still zero results after filter relaxation.")
 
-    conn.close()
-
     candidate_ids = [row[0] for row in results]
     state["candidate_ids"] = candidate_ids
     state["dropped_filters"] = dropped_filters
@@ -2508,27 +2503,32 @@ USER QUESTION: {state["query"]}
 RULES:
 1. ONLY return the SQL query, nothing else
 {select_instruction}
-3. Use LIKE for text matching with % wildcards
+3. For company, institute and degree filters use the indexed resume_employment / resume_education tables; for project, job title, achievement and keyword filters use the resume_fts full-text index (MATCH, ORDER BY bm25(resume_fts)); use LIKE with % wildcards only for name, email and phone
 4. For experience, use total_experience_years (it's a number)
-5. For skills, search in the skills column (JSON array as text)
+5. For skills, use the indexed resume_skills table with lowercase names: resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python')
 6. For phone numbers, use: REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '+', '') LIKE '%cleanednumber%'
 7. For email, use: email LIKE '%emailpattern%'
-8. For education/institute, search in education column: education LIKE '%institutename%'
-9. For degree, search in education column: education LIKE '%degreename%'
-10. For projects, search in projects column: projects LIKE '%projectname%'
-11. For companies, search in work_experience column: work_experience LIKE '%companyname%'
-12. For achievements/certifications, search in additional_information column
+8. For education/institute: resume_id IN (SELECT resume_id FROM resume_education WHERE (institute_norm = 'indian institute of technology' OR (institute_norm >= 'indian institute of technology ' AND institute_norm < 'indian institute of technology!'))) - lowercase, abbreviations written out; never LIKE on the *_norm columns or resume_location.token (it cannot use the index), always this = / >= 'x ' / < 'x!' range
+9. For degree: resume_id IN (SELECT resume_id FROM resume_education WHERE degree_norm = 'mba') - degree codes like 'btech', 'mtech', 'bsc', 'msc', 'mba', 'phd'
+10. For projects: resume_fts MATCH 'projects : "projectname"'
+11. For companies: resume_id IN (SELECT resume_id FROM resume_employment WHERE (company_norm = 'companyname' OR (company_norm >= 'companyname ' AND company_norm < 'companyname!'))) - lowercase
+12. For achievements/certifications: resume_fts MATCH 'additional_information : "certification"'
+13. For location: resume_id IN (SELECT resume_id FROM resume_location WHERE (token = 'cityname' OR (token >= 'cityname ' AND token < 'cityname!'))) (lowercase; Bengaluru → bangalore, Gurugram → gurgaon, Bombay → mumbai)
+14. For when someone worked somewhere: resume_employment start_date / end_date ('YYYY-MM', end_date 'present' = current job, NULL = unknown); overlap with a window is end_date >= 'from' AND start_date <= 'to'; current job is end_date = 'present'
 
 EXAMPLES:
 
 CANDIDATE SEARCH QUERIES (return resume_id):
 - "whose contact is 8374106843" → SELECT resume_id FROM parsed_resumes WHERE REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '(', ''), ')', ''), '+', '') LIKE '%8374106843%'
 - "find email john@example.com" → SELECT resume_id FROM parsed_resumes WHERE email LIKE '%john@example.com%'
-- "candidates with Python" → SELECT resume_id FROM parsed_resumes WHERE skills LIKE '%Python%'
-- "who studied at IIT Delhi" → SELECT resume_id FROM parsed_resumes WHERE education LIKE '%IIT Delhi%'
-- "MBA graduates" → SELECT resume_id FROM parsed_resumes WHERE education LIKE '%MBA%'
-- "worked at Google" → SELECT resume_id FROM parsed_resumes WHERE work_experience LIKE '%Google%'
-- "Python developers with 5+ years from IIT" → SELECT resume_id FROM parsed_resumes WHERE skills LIKE '%Python%' AND total_experience_years >= 5 AND education LIKE '%IIT%'
+- "candidates with Python" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python')
+- "who studied at IIT Delhi" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_education WHERE (institute_norm = 'indian institute of technology delhi' OR (institute_norm >= 'indian institute of technology delhi ' AND institute_norm < 'indian institute of technology delhi!')))
+- "MBA graduates" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_education WHERE degree_norm = 'mba')
+- "worked at Google" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_employment WHERE (company_norm = 'google' OR (company_norm >= 'google ' AND company_norm < 'google!')))
+- "worked at Infosys between 2018 and 2020" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_employment WHERE (company_norm = 'infosys' OR (company_norm >= 'infosys ' AND company_norm < 'infosys!')) AND end_date >= '2018-01' AND start_date <= '2020-12')
+- "candidates in Bengaluru" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_location WHERE (token = 'bangalore' OR (token >= 'bangalore ' AND token < 'bangalore!')))
+- "mentions Kafka anywhere in the resume" → SELECT resume_id FROM resume_fts WHERE resume_fts MATCH 'raw_text : "Kafka"' ORDER BY bm25(resume_fts)
+- "Python developers with 5+ years from IIT" → SELECT resume_id FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python') AND total_experience_years >= 5 AND resume_id IN (SELECT resume_id FROM resume_education WHERE (institute_norm = 'indian institute of technology' OR (institute_norm >= 'indian institute of technology ' AND institute_norm < 'indian institute of technology!')))
 
 EMAIL ACTION QUERIES (filter by names ONLY - ignore job/company details):
 - "Send email to Shubham Baghel and Anshika Chaudhary for ML Intern at Google" → SELECT resume_id FROM parsed_resumes WHERE (candidate_name LIKE '%Shubham%' AND candidate_name LIKE '%Baghel%') OR (candidate_name LIKE '%Anshika%' AND candidate_name LIKE '%Chaudhary%')
@@ -2536,11 +2536,11 @@ EMAIL ACTION QUERIES (filter by names ONLY - ignore job/company details):
 - CRITICAL: Use proper parentheses for OR logic! Each full name in its own parentheses: (Name1_Part1 AND Name1_Part2) OR (Name2_Part1 AND Name2_Part2)
 
 AGGREGATION QUERIES (return COUNT/AVG/SUM/MAX/MIN):
-- "How many Python developers?" → SELECT COUNT(*) FROM parsed_resumes WHERE skills LIKE '%Python%'
-- "How many candidates from IIT?" → SELECT COUNT(*) FROM parsed_resumes WHERE education LIKE '%IIT%'
+- "How many Python developers?" → SELECT COUNT(*) FROM resume_skills WHERE skill_canonical = 'python'
+- "How many candidates from IIT?" → SELECT COUNT(DISTINCT resume_id) FROM resume_education WHERE (institute_norm = 'indian institute of technology' OR (institute_norm >= 'indian institute of technology ' AND institute_norm < 'indian institute of technology!'))
 - "What's the average experience?" → SELECT AVG(total_experience_years) FROM parsed_resumes
-- "Average experience of Python developers?" → SELECT AVG(total_experience_years) FROM parsed_resumes WHERE skills LIKE '%Python%'
-- "Total candidates with AWS" → SELECT COUNT(*) FROM parsed_resumes WHERE skills LIKE '%AWS%'
+- "Average experience of Python developers?" → SELECT AVG(total_experience_years) FROM parsed_resumes WHERE resume_id IN (SELECT resume_id FROM resume_skills WHERE skill_canonical = 'python')
+- "Total candidates with AWS" → SELECT COUNT(*) FROM resume_skills WHERE skill_canonical = 'aws'
 
 RANKING QUERIES (return resume_id with ORDER BY LIMIT):
 - "Who has the most experience?" → SELECT resume_id FROM parsed_resumes ORDER BY total_experience_years DESC LIMIT 1
@@ -2562,18 +2562,10 @@ SQL QUERY:
 
         print(f"   Generated SQL: {generated_sql}")
 
-        # Execute the generated SQL
-        import os
-
-        db_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-        )
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
+        # Execute the generated SQL (the pooled connection is read-only)
+        cursor = get_cursor()
         cursor.execute(generated_sql)
         results = cursor.fetchall()
-        conn.close()
 
         # Check if this is an aggregation query
         analysis = state.get("query_analysis", {})
@@ -2637,8 +2629,9 @@ def vector_search_node(state: AgentState) -> AgentState:
     print(f"   Strategy: {state['search_strategy']} - Using semantic ranking")
 
     try:
-        # Use vector store directly (not HybridResumeSearch) to apply ChromaDB filters correctly
-        from vectorstore.chroma_store import ResumeVectorStore
+        # Use vector store directly (not HybridResumeSearch) to apply ChromaDB filters correctly.
+        # The model and client come from the shared registry, so this is cheap per query.
+        from app.vectorstore.chroma_store import ResumeVectorStore
 
         vector_store = ResumeVectorStore()
 
@@ -2721,28 +2714,14 @@ def enrich_results_node(state: AgentState) -> AgentState:
     )
 
     # Fetch full data from SQLite
-    import os
-
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_cursor(row_factory=sqlite3.Row)
 
     placeholders = ",".join("?" * len(unique_ids))
-    query = f"""
-        SELECT 
-            pr.*,
-            d.raw_text
-        FROM parsed_resumes pr
-        LEFT JOIN documents d ON pr.document_id = d.document_id
-        WHERE pr.resume_id IN ({placeholders})
-    """
+    # Full resume text is not selected: generate_answer loads it only when it shows it
+    query = f"SELECT * FROM parsed_resumes WHERE resume_id IN ({placeholders})"
 
     cursor.execute(query, unique_ids)
     rows = cursor.fetchall()
-    conn.close()
 
     final_results = []
     for row in rows:
@@ -2789,28 +2768,14 @@ def fetch_context_candidates_node(state: AgentState) -> AgentState:
         print(f"      {i}. {name} ({cid})")
     
     # Fetch full data from SQLite
-    import os
-    
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "resumes.db"
-    )
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_cursor(row_factory=sqlite3.Row)
 
     placeholders = ",".join("?" * len(candidate_ids))
-    query = f"""
-        SELECT 
-            pr.*,
-            d.raw_text
-        FROM parsed_resumes pr
-        LEFT JOIN documents d ON pr.document_id = d.document_id
-        WHERE pr.resume_id IN ({placeholders})
-    """
+    # Full resume text is not selected: generate_answer loads it only when it shows it
+    query = f"SELECT * FROM parsed_resumes WHERE resume_id IN ({placeholders})"
 
     cursor.execute(query, candidate_ids)
     rows = cursor.fetchall()
-    conn.close()
 
     final_results = []
     for row in rows:
@@ -3806,9 +3771,14 @@ class ResumeIntelligenceAgent:
         answer = agent.query("Find Python developers with 5+ years")
     """
 
-    def __init__(self):
+    def __init__(self, warm_up: bool = None):
         self.graph = create_intelligent_agent()
 
+        # Load the embedding model in the background so the first vector query does not wait for it
+        from app.vectorstore.model_registry import VECTOR_WARMUP, warm_up as warm_up_vector_search
+        if VECTOR_WARMUP if warm_up is None else warm_up:
+            warm_up_vector_search(["storage/chroma"])
+
     def query(
         self, user_query: str, session_id: str = None, verbose: bool = True,
         conversation_context: dict = None
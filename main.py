@@ -6,7 +6,7 @@ from pathlib import Path
 # Add app directory to Python path
 sys.path.append(str(Path(__file__).parent))
 
-from app.db.init_db import init_db
+from app.db.init_db import DB_PATH, init_db
 
 print("🚀 Resume Intelligence Platform")
 print("=" * 50)
@@ -17,7 +17,7 @@ init_db()
 
 # Check what's in the database
 import sqlite3
-conn = sqlite3.connect("resumes.db")
+conn = sqlite3.connect(DB_PATH)
 cursor = conn.cursor()
 
 # Count documents
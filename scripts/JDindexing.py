@@ -18,13 +18,14 @@ from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 
+from app.db.init_db import DB_PATH
+from app.db.write_queue import get_write_queue
 from app.models.jd import JobDescription
 from app.vectorstore.jd_embeddings import create_jd_chunks, create_jd_metadata
 from app.vectorstore.jd_store import JDVectorStore
 
 load_dotenv()
 
-DB_PATH = "resumes.db"
 DEFAULT_JD_ID = "primary_jd"
 
 
@@ -182,36 +183,30 @@ def upsert_jd_document(jd_id: str, source_path: str, raw_text: str) -> str:
     """Store raw JD text in jd_documents table (replace mode)."""
     document_id = str(uuid.uuid4())
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("DELETE FROM jd_documents WHERE jd_id = ?", (jd_id,))
-    cur.execute(
-        """
-        INSERT INTO jd_documents (document_id, jd_id, original_filename, source_path, raw_text, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            document_id,
-            jd_id,
-            Path(source_path).name,
-            source_path,
-            raw_text,
-            "parsed",
-        ),
-    )
+    def replace(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM jd_documents WHERE jd_id = ?", (jd_id,))
+        conn.execute(
+            """
+            INSERT INTO jd_documents (document_id, jd_id, original_filename, source_path, raw_text, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                document_id,
+                jd_id,
+                Path(source_path).name,
+                source_path,
+                raw_text,
+                "parsed",
+            ),
+        )
 
-    conn.commit()
-    conn.close()
+    get_write_queue(DB_PATH).submit(replace).result()
     return document_id
 
 
 def upsert_job_description(jd: JobDescription, document_id: str) -> None:
     """Upsert parsed JD object into job_descriptions table (replace mode)."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute(
+    get_write_queue(DB_PATH).execute(
         """
         INSERT OR REPLACE INTO job_descriptions (
             jd_id, document_id, job_title, job_level, department, location,
@@ -240,21 +235,14 @@ def upsert_job_description(jd: JobDescription, document_id: str) -> None:
             None,
             datetime.now().isoformat(),
         ),
-    )
-
-    conn.commit()
-    conn.close()
+    ).result()
 
 
 def mark_jd_indexed(jd_id: str) -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
+    get_write_queue(DB_PATH).execute(
         "UPDATE job_descriptions SET indexed_at = ?, updated_at = ? WHERE jd_id = ?",
         (datetime.now().isoformat(), datetime.now().isoformat(), jd_id),
-    )
-    conn.commit()
-    conn.close()
+    ).result()
 
 
 def index_jd(jd: JobDescription, document_id: str) -> None:
@@ -0,0 +1,131 @@
+# scripts/benchmark_extraction.py
+"""
+Benchmark PDF extraction engines on a local PDF corpus.
+
+For each engine (pymupdf, pdfplumber, auto) reports:
+- pages/sec and docs/sec
+- failures (exceptions / empty output)
+- text equivalence against pdfplumber (token-level F1 on normalized words)
+- for "auto": how many pages needed the pdfplumber fallback
+
+Usage:
+    python scripts/benchmark_extraction.py --folder resumedata/resumedata --limit 200
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import re
+import statistics
+import time
+from collections import Counter
+
+from app.ingestion.extraction_engines import FallbackEngine, get_extraction_engine
+
+REFERENCE_ENGINE = "pdfplumber"
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def token_f1(text: str, reference: str) -> float:
+    """Bag-of-words F1 between two texts (1.0 = same words, order ignored)"""
+    tokens = Counter(WORD_PATTERN.findall(text.lower()))
+    ref_tokens = Counter(WORD_PATTERN.findall(reference.lower()))
+    if not tokens and not ref_tokens:
+        return 1.0
+    overlap = sum((tokens & ref_tokens).values())
+    if overlap == 0:
+        return 0.0
+    precision = overlap / sum(tokens.values())
+    recall = overlap / sum(ref_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_engine(name: str, pdf_files: list[Path]) -> dict:
+    engine = get_extraction_engine(name)
+    texts = {}
+    pages = 0
+    failures = 0
+    fallback_pages = 0
+
+    start = time.perf_counter()
+    for pdf in pdf_files:
+        try:
+            page_texts = engine.extract_pages(str(pdf))
+        except Exception:
+            failures += 1
+            continue
+        pages += len(page_texts)
+        text = "\n".join(page_texts)
+        if not text.strip():
+            failures += 1
+        texts[pdf] = text
+        if isinstance(engine, FallbackEngine):
+            fallback_pages += len(engine.last_fallback_pages)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "engine": name,
+        "texts": texts,
+        "pages": pages,
+        "failures": failures,
+        "fallback_pages": fallback_pages,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction engines.")
+    parser.add_argument("--folder", default="resumedata/resumedata", help="Folder with PDFs (searched recursively)")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N PDFs (0 = all)")
+    parser.add_argument("--engines", default="pymupdf,pdfplumber,auto", help="Comma-separated engine names")
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.folder).rglob("*.pdf"))
+    if args.limit:
+        pdf_files = pdf_files[:args.limit]
+    if not pdf_files:
+        print(f"❌ No PDFs found in {args.folder}")
+        return
+
+    print("=" * 70)
+    print(f"📊 Extraction benchmark: {len(pdf_files)} PDFs from {args.folder}")
+    print("=" * 70)
+
+    engine_names = [name.strip() for name in args.engines.split(",") if name.strip()]
+    if REFERENCE_ENGINE not in engine_names:
+        engine_names.append(REFERENCE_ENGINE)
+
+    results = {}
+    for name in engine_names:
+        try:
+            results[name] = run_engine(name, pdf_files)
+        except RuntimeError as e:
+            print(f"⚠️  Skipping {name}: {e}")
+
+    reference = results.get(REFERENCE_ENGINE, {}).get("texts", {})
+
+    print(f"\n{'engine':<12}{'pages/s':>10}{'docs/s':>10}{'failed':>8}{'fallback':>10}{'F1 mean':>10}{'F1 min':>9}{'>=0.95':>8}")
+    print("-" * 77)
+    for name, result in results.items():
+        seconds = result["seconds"] or 1e-9
+        scores = [
+            token_f1(text, reference[pdf])
+            for pdf, text in result["texts"].items()
+            if pdf in reference
+        ]
+        mean_f1 = statistics.mean(scores) if scores else 0.0
+        min_f1 = min(scores) if scores else 0.0
+        equivalent = sum(1 for score in scores if score >= 0.95)
+        print(
+            f"{name:<12}{result['pages'] / seconds:>10.1f}{len(pdf_files) / seconds:>10.1f}"
+            f"{result['failures']:>8}{result['fallback_pages']:>10}"
+            f"{mean_f1:>10.3f}{min_f1:>9.3f}{equivalent:>5}/{len(scores):<3}"
+        )
+
+    print("\nF1 is measured against pdfplumber output (word multiset, order ignored).")
+
+
+if __name__ == "__main__":
+    main()
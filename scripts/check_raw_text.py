@@ -1,14 +1,20 @@
 import sqlite3
 import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Get raw_text for Vishnu Vikas
-conn = sqlite3.connect('resumes.db')
+from app.db.init_db import DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+
+# Get raw_text for Vishnu Vikas (indexed documents keep it compressed in document_text)
+conn = register_text_functions(sqlite3.connect(DB_PATH))
 cursor = conn.cursor()
 
-cursor.execute("""
-    SELECT raw_text 
-    FROM documents 
-    WHERE document_id IN (
+cursor.execute(f"""
+    SELECT {RAW_TEXT_SQL}
+    FROM documents d
+    {RAW_TEXT_JOIN}
+    WHERE d.document_id IN (
         SELECT document_id 
         FROM parsed_resumes 
         WHERE candidate_name LIKE '%Vishnu Vikas%'
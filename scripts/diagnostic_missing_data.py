@@ -7,6 +7,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 import sqlite3
 import json
 
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+
 def show_missing_data():
     """Show what information is LOST when we only use hardcoded fields"""
     
@@ -15,15 +17,16 @@ def show_missing_data():
     print("="*80)
     
     db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resumes.db")
-    conn = sqlite3.connect(db_path)
+    conn = register_text_functions(sqlite3.connect(db_path))
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
     # Get a sample resume
-    cursor.execute("""
-        SELECT pr.*, d.raw_text 
+    cursor.execute(f"""
+        SELECT pr.*, {RAW_TEXT_SQL} AS raw_text
         FROM parsed_resumes pr
         JOIN documents d ON pr.document_id = d.document_id
+        {RAW_TEXT_JOIN}
         WHERE pr.candidate_name LIKE '%BINEESHA%'
         LIMIT 1
     """)
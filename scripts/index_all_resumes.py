@@ -8,8 +8,10 @@ from datetime import datetime
 from app.vectorstore.chroma_store import ResumeVectorStore
 from app.vectorstore.embeddings import create_resume_chunks, create_resume_metadata
 from app.models.resume import ParsedResume, WorkExperience, Education, Project
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, archive_document_texts, register_text_functions
+from app.db.write_queue import get_write_queue
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("=" * 70)
 print("Indexing All Unindexed Parsed Resumes to Vector Store (Incremental)")
@@ -17,17 +19,19 @@ print("=" * 70)
 
 # Step 1: Get ONLY unparsed resumes from database (where indexed_at IS NULL)
 print("\n📂 Loading unparsed resumes from database...")
-conn = sqlite3.connect(DB_PATH)
+conn = register_text_functions(sqlite3.connect(DB_PATH))
 cursor = conn.cursor()
 
-cursor.execute("""
+# Indexed documents keep their text compressed in document_text
+cursor.execute(f"""
     SELECT 
         pr.resume_id, pr.document_id, pr.candidate_name, pr.email, pr.phone, pr.location,
         pr.total_experience_years, pr.current_role, pr.skills,
         pr.work_experience, pr.education, pr.projects, pr.additional_information,
-        d.raw_text
+        {RAW_TEXT_SQL}
     FROM parsed_resumes pr
     JOIN documents d ON pr.document_id = d.document_id
+    {RAW_TEXT_JOIN}
     WHERE pr.indexed_at IS NULL
     ORDER BY pr.parsed_at
 """)
@@ -97,14 +101,14 @@ for row in results:
         )
         
         # ✅ UPDATE indexed_at timestamp after successful indexing
-        update_conn = sqlite3.connect(DB_PATH)
-        update_cursor = update_conn.cursor()
-        update_cursor.execute(
-            "UPDATE parsed_resumes SET indexed_at = ? WHERE resume_id = ?",
-            (datetime.now().isoformat(), resume_id)
-        )
-        update_conn.commit()
-        update_conn.close()
+        def mark_indexed(conn, resume_id=resume_id, document_id=document_id):
+            conn.execute(
+                "UPDATE parsed_resumes SET indexed_at = ? WHERE resume_id = ?",
+                (datetime.now().isoformat(), resume_id)
+            )
+            # Indexed: the full text moves to compressed storage, as in the pipeline's index stage
+            archive_document_texts(conn, [document_id])
+        get_write_queue().submit(mark_indexed).result()
         
         indexed_count += 1
         print(f"   ✅ {indexed_count}. {candidate_name}")
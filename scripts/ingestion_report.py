@@ -0,0 +1,98 @@
+# scripts/ingestion_report.py
+"""
+Where does ingestion time go? Report from the ingestion run ledger.
+
+Usage:
+    python scripts/ingestion_report.py                 # latest run
+    python scripts/ingestion_report.py --run <run_id>  # a specific run
+    python scripts/ingestion_report.py --list          # recent runs
+    python scripts/ingestion_report.py --slowest 20    # longer slowest-documents list
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+from datetime import datetime
+
+from app.db.init_db import init_db
+from app.pipeline.run_ledger import list_runs, run_report
+from app.pipeline.stages import STAGES
+
+
+def _seconds(value) -> str:
+    return f"{value:.2f}s" if value is not None else "-"
+
+
+def _when(timestamp) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+
+
+def print_runs(limit: int):
+    print("=" * 70)
+    print("📒 RECENT INGESTION RUNS")
+    print("=" * 70)
+    for run in list_runs(limit):
+        print(f"   {run['run_id']}  {run['source']:<8} {run['status']:<8} "
+              f"{_when(run['started_at'])}  {run['documents']:>6} docs")
+
+
+def print_report(report: dict):
+    run = report["run"]
+    print("=" * 70)
+    print(f"📒 INGESTION RUN {run['run_id']} ({run['source']}, {run['status']})")
+    print("=" * 70)
+    print(f"   Started:     {_when(run['started_at'])}")
+    print(f"   Wall time:   {report['wall_seconds']}s")
+    print(f"   Documents:   {report['documents']} seen, {report['completed']} fully indexed")
+    print(f"   Throughput:  {report['docs_per_minute']} docs/min")
+
+    print("\n⏱️  Stage latency (work time; queue wait in brackets):")
+    print(f"   {'stage':<8} {'ok':>6} {'failed':>7} {'p50':>9} {'p95':>9} {'max':>9}   {'wait p50':>9} {'wait p95':>9}   busy")
+    for stage in STAGES:
+        s = report["stages"][stage]
+        print(f"   {stage:<8} {s['ok']:>6} {s['failed']:>7} {_seconds(s['p50']):>9} {_seconds(s['p95']):>9} "
+              f"{_seconds(s['max']):>9}   [{_seconds(s['wait_p50']):>8}] [{_seconds(s['wait_p95']):>8}]  {s['busy_seconds']}s")
+
+    if report["providers"] or report["cache_hits"]:
+        print("\n🧠 LLM usage (parse stage):")
+        for provider, usage in report["providers"].items():
+            print(f"   {provider:<16} {usage['documents']:>6} docs  {usage['llm_calls']:>6} calls  "
+                  f"{usage['input_tokens']:>10} in  {usage['output_tokens']:>9} out tokens")
+        print(f"   parse cache hits: {report['cache_hits']}")
+
+    if report["slowest"]:
+        print("\n🐢 Slowest documents (queue wait + work, all stages):")
+        for entry in report["slowest"]:
+            stages = ", ".join(f"{stage} {entry['stages'][stage]}s" for stage in STAGES if stage in entry["stages"])
+            print(f"   {entry['seconds']:>8.1f}s  {(entry['filename'] or entry['document_id'])[:40]:<40} ({stages})")
+
+    if report["failures"]:
+        print("\n❌ Most common failures:")
+        for failure in report["failures"]:
+            print(f"   {failure['count']:>5}× [{failure['stage']}] {failure['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion run ledger report.")
+    parser.add_argument("--run", help="Run id (default: the latest run)")
+    parser.add_argument("--list", action="store_true", help="List recent runs and exit")
+    parser.add_argument("--limit", type=int, default=10, help="Runs to list with --list")
+    parser.add_argument("--slowest", type=int, default=10, help="Slowest documents to show")
+    args = parser.parse_args()
+
+    init_db()
+    if args.list:
+        print_runs(args.limit)
+        return
+
+    report = run_report(args.run, slowest=args.slowest)
+    if report is None:
+        print("ℹ️  No ingestion runs recorded yet" if args.run is None else f"❌ Unknown run: {args.run}")
+        return
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
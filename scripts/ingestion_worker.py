@@ -0,0 +1,125 @@
+# scripts/ingestion_worker.py
+"""
+Durable ingestion workers backed by the `ingestion_jobs` table.
+
+Unlike process_all_resumes.py, any number of these can run at once (on one
+machine, sharing resumes.db) without duplicating work, and a crashed or
+stopped run resumes exactly where it left off.
+
+Usage:
+    # 4 worker processes taking every stage, exit when the queue is empty
+    python scripts/ingestion_worker.py --processes 4 --exit-when-idle
+
+    # A dedicated LLM parse worker that keeps polling for new jobs
+    python scripts/ingestion_worker.py --stages parse
+
+    # Queue status / dead letters / retry dead jobs
+    python scripts/ingestion_worker.py --status
+    python scripts/ingestion_worker.py --requeue-dead
+
+    # Move an upload batch to the front (interactive | normal | backfill)
+    python scripts/ingestion_worker.py --set-priority <batch_id> interactive
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import multiprocessing
+
+from app.db.init_db import init_db
+from app.pipeline.job_queue import DEFAULT_LEASE_SECONDS, JobQueue
+from app.pipeline.priority import PRIORITIES
+from app.pipeline.queue_worker import default_worker_id, run_worker
+from app.pipeline.stages import STAGES
+
+
+def print_status(job_queue: JobQueue):
+    print("=" * 70)
+    print("📊 INGESTION JOB QUEUE")
+    print("=" * 70)
+    for stage, counts in job_queue.stats().items():
+        summary = ", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "empty"
+        print(f"   {stage:<8} {summary}")
+
+    dead = job_queue.dead_letters()
+    if dead:
+        print("\n💀 Dead-lettered jobs (latest first):")
+        for job in dead:
+            print(f"   - [{job['stage']}] {job['document_id']} after {job['attempts']} attempts: {job['last_error']}")
+
+
+def worker_main(stages, lease_seconds, exit_when_idle):
+    worker_id = default_worker_id()
+
+    def report(stage, document_id, error):
+        if error is None:
+            print(f"[{worker_id}] ✅ {stage:<7} {document_id[:8]}")
+        else:
+            print(f"[{worker_id}] ❌ {stage:<7} {document_id[:8]}: {error}")
+
+    counts = run_worker(
+        worker_id=worker_id,
+        stages=stages,
+        lease_seconds=lease_seconds,
+        exit_when_idle=exit_when_idle,
+        on_event=report
+    )
+    print(f"[{worker_id}] 🏁 finished: {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run durable ingestion workers.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages: extract,parse,index")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS, help="Job lease length")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once no runnable job is left")
+    parser.add_argument("--status", action="store_true", help="Print queue status and exit")
+    parser.add_argument("--requeue-dead", action="store_true", help="Retry all dead-lettered jobs and exit")
+    parser.add_argument("--set-priority", nargs=2, metavar=("BATCH_ID", "PRIORITY"),
+                        help="Change an upload batch's priority (interactive, normal, backfill) and exit")
+    args = parser.parse_args()
+
+    init_db()
+    job_queue = JobQueue()
+
+    if args.status:
+        print_status(job_queue)
+        return
+    if args.requeue_dead:
+        print(f"♻️  Requeued {job_queue.requeue_dead()} dead jobs")
+        return
+    if args.set_priority:
+        batch_id, priority = args.set_priority
+        if priority not in PRIORITIES:
+            parser.error(f"Unknown priority: {priority}")
+        print(f"⏫ {job_queue.set_batch_priority(batch_id, priority)} jobs of batch {batch_id} set to {priority}")
+        return
+
+    stages = tuple(stage.strip() for stage in args.stages.split(",") if stage.strip())
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    created = job_queue.sync_from_documents()
+    if created:
+        print(f"📥 Queued {created} jobs for documents not yet in the job queue")
+
+    if args.processes <= 1:
+        worker_main(stages, args.lease_seconds, args.exit_when_idle)
+        return
+
+    processes = [
+        multiprocessing.Process(target=worker_main, args=(stages, args.lease_seconds, args.exit_when_idle))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    print_status(job_queue)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# scripts/migrate.py
+"""
+Bring resumes.db to the current schema and check that hot-path queries use indexes.
+
+Usage:
+    python scripts/migrate.py            # apply pending migrations
+    python scripts/migrate.py --status   # list migrations and whether they are applied
+    python scripts/migrate.py --check    # apply, then fail (exit 1) if a hot-path query full-scans a table
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import sqlite3
+
+from app.db.init_db import init_db, DB_PATH
+from app.db.migrations import MIGRATIONS, applied_versions, check_query_plans
+
+
+def print_status():
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    applied = applied_versions(conn)
+    conn.close()
+    print("=" * 70)
+    print(f"📦 SCHEMA MIGRATIONS ({DB_PATH})")
+    print("=" * 70)
+    for version, name, _ in MIGRATIONS:
+        state = f"applied {applied[version]}" if version in applied else "pending"
+        print(f"   {version:>3}  {name:<40} {state}")
+
+
+def run_check() -> bool:
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    regressions = check_query_plans(conn)
+    conn.close()
+    if not regressions:
+        print("✅ Every hot-path query uses an index")
+        return True
+    for regression in regressions:
+        print(f"❌ Full table scan in '{regression['query']}':")
+        for detail in regression["plan"]:
+            print(f"      {detail}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to resumes.db.")
+    parser.add_argument("--status", action="store_true", help="List migrations and exit")
+    parser.add_argument("--check", action="store_true", help="Fail if a hot-path query plan full-scans a table")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+
+    init_db()  # creates missing tables, then applies pending migrations
+    if args.check and not run_check():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
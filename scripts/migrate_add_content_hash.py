@@ -0,0 +1,66 @@
+# Migration: Add content_hash/duplicate_of to documents and backfill hashes
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import sqlite3
+from app.db.init_db import init_db, DB_PATH
+from app.ingestion.uploader import compute_content_hash, find_document_by_hash
+
+def migrate():
+    """Add the hash columns/index (via init_db) and hash every existing document"""
+    
+    print("🔧 Running migration: Add content_hash to documents")
+    init_db()
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT document_id, file_path
+        FROM documents
+        WHERE content_hash IS NULL
+        ORDER BY created_at
+    """)
+    documents = cursor.fetchall()
+    print(f"📊 Documents without a content hash: {len(documents)}")
+    
+    hashed = 0
+    missing = 0
+    linked = 0
+    for document_id, file_path in documents:
+        if not file_path or not os.path.exists(file_path):
+            missing += 1
+            continue
+        content_hash = compute_content_hash(Path(file_path))
+        # Only one original per content (unique index): later copies are linked to it
+        original = find_document_by_hash(cursor, content_hash)
+        cursor.execute(
+            "UPDATE documents SET content_hash = ?, duplicate_of = ? WHERE document_id = ?",
+            (content_hash, original[0] if original else None, document_id)
+        )
+        hashed += 1
+        linked += original is not None
+    conn.commit()
+    
+    # Report content that was already uploaded more than once before the migration
+    cursor.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT content_hash FROM documents
+            WHERE content_hash IS NOT NULL
+            GROUP BY content_hash
+            HAVING COUNT(*) > 1
+        )
+    """)
+    duplicate_groups = cursor.fetchone()[0]
+    conn.close()
+    
+    print(f"✅ Hashed {hashed} documents ({missing} files missing on disk)")
+    if linked:
+        print(f"🔗 Linked {linked} documents to an earlier upload of the same content")
+    if duplicate_groups:
+        print(f"ℹ️  {duplicate_groups} content hashes already have more than one document")
+
+if __name__ == "__main__":
+    migrate()
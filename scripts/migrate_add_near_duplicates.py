@@ -0,0 +1,54 @@
+# Migration: Add near_duplicate_of/near_duplicate_score and MinHash/LSH signatures for extracted documents
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sqlite3
+from app.db.init_db import init_db, DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+from app.ingestion.near_duplicates import NearDuplicateIndex, minhash_signature
+
+def migrate():
+    """Create the columns/tables (via init_db) and sign every extracted document, oldest first"""
+    
+    print("🔧 Running migration: Add near-duplicate signatures to documents")
+    init_db()
+    
+    # Indexed documents keep their text compressed in document_text (migration 6)
+    conn = register_text_functions(sqlite3.connect(DB_PATH, timeout=30))
+    cursor = conn.cursor()
+    
+    # Oldest first, so a later upload is the one pointed at its earlier version
+    cursor.execute(f"""
+        SELECT d.document_id, {RAW_TEXT_SQL}
+        FROM documents d
+        {RAW_TEXT_JOIN}
+        LEFT JOIN document_minhash m ON d.document_id = m.document_id
+        WHERE (d.raw_text IS NOT NULL OR dt.document_id IS NOT NULL) AND m.document_id IS NULL
+        ORDER BY d.created_at
+    """)
+    documents = cursor.fetchall()
+    print(f"📊 Extracted documents without a signature: {len(documents)}")
+    
+    index = NearDuplicateIndex(conn)
+    near_duplicates = 0
+    for document_id, raw_text in documents:
+        signature = minhash_signature(raw_text)
+        matches = index.query(signature, exclude=document_id)
+        index.add(document_id, signature)
+        if matches:
+            original_id, score = matches[0]
+            cursor.execute(
+                "UPDATE documents SET near_duplicate_of = ?, near_duplicate_score = ? WHERE document_id = ?",
+                (original_id, round(score, 3), document_id)
+            )
+            near_duplicates += 1
+    conn.commit()
+    conn.close()
+    
+    print(f"✅ Signed {len(documents)} documents")
+    if near_duplicates:
+        print(f"ℹ️  {near_duplicates} documents are near-duplicates of an earlier upload")
+
+if __name__ == "__main__":
+    migrate()
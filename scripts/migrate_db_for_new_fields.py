@@ -6,7 +6,7 @@ import sqlite3
 from app.utils.experience_calculator import calculate_years_of_experience
 import json
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("=" * 70)
 print("Database Migration: Add additional_information field and recalculate years")
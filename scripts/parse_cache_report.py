@@ -0,0 +1,48 @@
+# scripts/parse_cache_report.py
+"""
+Inspect and maintain the persistent LLM parse-result cache.
+
+Usage:
+    python scripts/parse_cache_report.py            # hit/miss report
+    python scripts/parse_cache_report.py --prune    # evict expired / over-size entries
+    python scripts/parse_cache_report.py --clear    # drop every entry and counter
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+
+from app.parsing.parse_cache import ParseCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM parse cache report and maintenance.")
+    parser.add_argument("--prune", action="store_true", help="Evict entries past max age / over the size cap")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached results and counters")
+    args = parser.parse_args()
+
+    cache = ParseCache()
+    if args.clear:
+        print(f"🗑️  Removed {cache.clear()} cached parses")
+        return
+    if args.prune:
+        print(f"🧹 Evicted {cache.prune()} cached parses")
+
+    report = cache.report()
+    print("=" * 70)
+    print("💾 LLM PARSE CACHE")
+    print("=" * 70)
+    print(f"   Hits:      {report['hits']}")
+    print(f"   Misses:    {report['misses']}")
+    print(f"   Hit rate:  {report['hit_rate']:.1%}")
+    print(f"   Stores:    {report['stores']}")
+    print(f"   Evictions: {report['evictions']}")
+    print(f"   Entries:   {report['entries']} ({report['size_mb']} MB)")
+    for model, info in report["models"].items():
+        print(f"   - {model:<28} {info['entries']:>6} entries  {info['size_mb']:>8} MB  {info['hits']:>6} hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from app.vectorstore.chroma_store import ResumeVectorStore
 from app.vectorstore.embeddings import create_resume_chunks, create_resume_metadata
 from app.models.resume import ParsedResume, WorkExperience, Education
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("="*70)
 print("Re-indexing with New 4-Chunk Embeddings")
@@ -7,7 +7,7 @@ import sqlite3
 import json
 from app.parsing.resume_parser import parse_resume_with_llm
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("="*70)
 print("Re-parsing All Resumes with Categorized Skills")
@@ -5,6 +5,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.querying.hybrid_search import HybridResumeSearch
 from app.generation.answer_generation import generate_answer, generate_summary
+from app.db.init_db import DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
 import sqlite3
 import json
 
@@ -36,20 +38,21 @@ for query in test_queries:
         print(f"     Matched text: {vector_results['documents'][0][i][:200]}...")
     
     # Step 2: Get full resume data from database
-    conn = sqlite3.connect("resumes.db")
+    conn = register_text_functions(sqlite3.connect(DB_PATH))
     cursor = conn.cursor()
     
     resume_ids = [meta['resume_id'] for meta in vector_results['metadatas'][0]]
     
     full_results = []
     for resume_id in resume_ids:
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT pr.candidate_name, pr.email, pr.phone, pr.location, 
                    pr.total_experience_years, pr.current_role, pr.technical_skills,
                    pr.work_experience, pr.education,
-                   d.raw_text
+                   {RAW_TEXT_SQL}
             FROM parsed_resumes pr
             JOIN documents d ON pr.document_id = d.document_id
+            {RAW_TEXT_JOIN}
             WHERE pr.resume_id = ?
         """, (resume_id,))
         
@@ -5,22 +5,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import sqlite3
 from app.parsing.resume_parser import parse_resume_with_llm, save_parsed_resume
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
 
 print("=" * 70)
 print("Parsing All Unparsed Resumes")
 print("=" * 70)
 
 # Get all documents that are extracted but not yet parsed
-conn = sqlite3.connect(DB_PATH)
+conn = register_text_functions(sqlite3.connect(DB_PATH))
 cursor = conn.cursor()
 
-cursor.execute("""
-    SELECT d.document_id, d.original_filename, d.raw_text
+cursor.execute(f"""
+    SELECT d.document_id, d.original_filename, {RAW_TEXT_SQL}
     FROM documents d
+    {RAW_TEXT_JOIN}
     LEFT JOIN parsed_resumes p ON d.document_id = p.document_id
     WHERE d.status = 'extracted' 
-      AND d.raw_text IS NOT NULL
+      AND (d.raw_text IS NOT NULL OR dt.document_id IS NOT NULL)
       AND p.resume_id IS NULL
 """)
 
@@ -8,7 +8,7 @@ from app.vectorstore.chroma_store import ResumeVectorStore
 from app.vectorstore.embeddings import create_resume_chunks, create_resume_metadata
 from app.models.resume import ParsedResume, WorkExperience, Education
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("=" * 70)
 print("Testing Vector Store with Parsed Resumes")
@@ -4,7 +4,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.ingestion.extractor import extract_text_from_pdf, save_extracted_text
 
-DB_PATH = "resumes.db"
+from app.db.init_db import DB_PATH
 
 print("=" * 70)
 print("Extracting Text from Unextracted PDFs (Incremental)")
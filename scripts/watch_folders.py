@@ -0,0 +1,102 @@
+# scripts/watch_folders.py
+"""
+Long-running ingestion service: watch folders for new resume PDFs.
+
+New PDFs are uploaded once their size/mtime have been stable for a few seconds,
+then queued for extract → parse → index. Queue workers started by this script
+process them right away, so a dropped-in resume becomes queryable in seconds
+instead of waiting for the next process_all_resumes.py run.
+
+Usage:
+    # Folders from WATCH_FOLDERS (default: resumedata/inbox), 4 queue workers
+    python scripts/watch_folders.py --processes 4
+
+    # Explicit folders, only watch/upload (workers run elsewhere via ingestion_worker.py)
+    python scripts/watch_folders.py --folder /data/inbox --folder /data/referrals --processes 0
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import multiprocessing
+from datetime import datetime
+
+from app.db.init_db import init_db
+from app.ingestion.watcher import (
+    WATCH_FOLDERS, WATCH_POLL_SECONDS, WATCH_STABLE_SECONDS, FolderWatcher, watch_and_ingest
+)
+from app.pipeline.job_queue import JobQueue
+from app.pipeline.queue_worker import default_worker_id, run_worker
+from app.pipeline.stages import STAGES
+
+WORKER_POLL_SECONDS = 1.0  # how quickly idle workers notice a newly queued document
+
+
+def worker_main():
+    worker_id = default_worker_id()
+
+    def report(stage, document_id, error):
+        if error is None:
+            print(f"[{worker_id}] ✅ {stage:<7} {document_id[:8]}")
+        else:
+            print(f"[{worker_id}] ❌ {stage:<7} {document_id[:8]}: {error}")
+
+    run_worker(worker_id=worker_id, stages=STAGES, poll_interval=WORKER_POLL_SECONDS, on_event=report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch folders and ingest new resume PDFs continuously.")
+    parser.add_argument("--folder", action="append", help="Folder to watch (repeatable; default: WATCH_FOLDERS)")
+    parser.add_argument("--processes", type=int, default=2, help="Queue worker processes to start (0 = none)")
+    parser.add_argument("--poll-seconds", type=float, default=WATCH_POLL_SECONDS, help="Seconds between folder scans")
+    parser.add_argument("--stable-seconds", type=float, default=WATCH_STABLE_SECONDS,
+                        help="Size/mtime must stay unchanged this long before a file is uploaded")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not watch subfolders")
+    args = parser.parse_args()
+
+    init_db()
+    folders = args.folder or WATCH_FOLDERS
+    for folder in folders:
+        Path(folder).mkdir(parents=True, exist_ok=True)
+
+    job_queue = JobQueue()
+    created = job_queue.sync_from_documents()
+    if created:
+        print(f"📥 Queued {created} jobs for documents not yet in the job queue")
+
+    processes = [multiprocessing.Process(target=worker_main, daemon=True) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    print("=" * 70)
+    print(f"👀 Watching {', '.join(folders)} (poll {args.poll_seconds}s, stable after {args.stable_seconds}s)")
+    print(f"   Queue workers: {args.processes}")
+    print("=" * 70)
+
+    def report_batch(batch_id, files, queued):
+        stamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[{stamp}] 📤 {len(files)} new PDFs → batch {batch_id[:8]} ({queued} queued, "
+              f"{len(files) - queued} duplicates)")
+
+    def report_error(error):
+        if isinstance(error, OSError):
+            print(f"⚠️  Skipping unreadable file until it changes: {error}")
+        else:
+            print(f"❌ Upload failed, retrying on the next scan: {error}")
+
+    watcher = FolderWatcher(folders, recursive=not args.no_recursive, stable_seconds=args.stable_seconds)
+    try:
+        watch_and_ingest(watcher, job_queue, poll_interval=args.poll_seconds,
+                         on_batch=report_batch, on_error=report_error)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watcher")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Never touch the project's resumes.db: the path is read once, at import
+os.environ.setdefault("RESUMES_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="resumes-test-"), "resumes.db"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+import app.db.init_db as init_db_module
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A freshly initialized resumes.db of its own for each test"""
+    path = str(tmp_path / "resumes.db")
+    monkeypatch.setattr(init_db_module, "DB_PATH", path)
+    init_db_module.init_db()
+    return path
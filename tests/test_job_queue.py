@@ -0,0 +1,73 @@
+# tests/test_job_queue.py
+import sqlite3
+
+import pytest
+
+from app.db.write_queue import get_write_queue
+from app.pipeline.job_queue import JobQueue
+
+
+@pytest.fixture
+def job_queue(db_path):
+    get_write_queue(db_path).executemany("""
+        INSERT INTO documents (document_id, original_filename, file_path, status)
+        VALUES (?, ?, ?, 'uploaded')
+    """, [(f"doc{i}", f"doc{i}.pdf", f"/tmp/doc{i}.pdf") for i in range(2)]).result()
+    return JobQueue(db_path)
+
+
+def job_status(db_path, job_id):
+    conn = sqlite3.connect(db_path)
+    status = conn.execute("SELECT status FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+    conn.close()
+    return status
+
+
+def test_enqueue_is_idempotent(job_queue):
+    assert job_queue.enqueue_many(["doc0", "doc1"]) == 2
+    assert job_queue.enqueue_many(["doc0", "doc1"]) == 0
+    assert job_queue.sync_from_documents() == 0
+
+
+def test_lease_complete_queues_next_stage(job_queue, db_path):
+    job_queue.enqueue("doc0")
+    [job] = job_queue.lease("worker-1")
+    assert (job["document_id"], job["stage"], job["attempts"]) == ("doc0", "extract", 1)
+    assert job_queue.lease("worker-2") == []  # already leased
+
+    assert job_queue.heartbeat(job["job_id"], "worker-1")
+    assert not job_queue.heartbeat(job["job_id"], "worker-2")
+    assert job_queue.complete(job["job_id"], "worker-1")
+    assert not job_queue.complete(job["job_id"], "worker-1")
+    assert job_status(db_path, job["job_id"]) == "done"
+
+    [next_job] = job_queue.lease("worker-1", stages=["parse"])
+    assert (next_job["document_id"], next_job["stage"]) == ("doc0", "parse")
+
+
+def test_failure_backs_off_then_dead_letters(db_path, job_queue):
+    job_queue = JobQueue(db_path, max_attempts=2)
+    job_queue.enqueue("doc0")
+    [job] = job_queue.lease("worker-1")
+    assert job_queue.fail(job["job_id"], "worker-1", "timeout") == "pending"
+    assert job_queue.lease("worker-1") == []  # waiting out the retry backoff
+    assert job_queue.fail(job["job_id"], "worker-1", "timeout") == "lost"
+
+    get_write_queue(db_path).execute("UPDATE ingestion_jobs SET available_at = 0").result()
+    [retry] = job_queue.lease("worker-1")
+    assert retry["attempts"] == 2
+    assert job_queue.fail(retry["job_id"], "worker-1", "timeout") == "dead"
+    assert job_queue.stats()["extract"] == {"dead": 1}
+
+    assert job_queue.requeue_dead() == 1
+    assert job_queue.lease("worker-1")[0]["attempts"] == 1
+
+
+def test_expired_lease_is_taken_over(job_queue, db_path):
+    job_queue.enqueue("doc0")
+    [job] = job_queue.lease("worker-1", lease_seconds=0)
+    [taken] = job_queue.lease("worker-2")
+    assert taken["job_id"] == job["job_id"]
+    assert taken["attempts"] == 2
+    assert not job_queue.complete(job["job_id"], "worker-1")  # the lost worker can't finish it
+    assert job_queue.complete(job["job_id"], "worker-2")
@@ -0,0 +1,65 @@
+# tests/test_json_repair.py
+from app.models.resume import ParsedResume, WorkExperience
+from app.parsing.json_repair import coerce_to_model, repair_json, repair_to_model
+
+
+def test_repair_json_strips_fences_and_fixes_syntax():
+    text = 'Here you go:\n```json\n{"candidate_name": "Asha", "skills": ["Python",], "remote": True}\n```'
+    assert repair_json(text) == {"candidate_name": "Asha", "skills": ["Python"], "remote": True}
+
+
+def test_repair_json_python_literals_and_smart_quotes():
+    assert repair_json("{'name': None}") == {"name": None}
+    assert repair_json('{“name”: “Asha”}') == {"name": "Asha"}
+
+
+def test_repair_json_closes_truncated_answer():
+    data = repair_json('{"candidate_name": "Asha", "technical_skills": ["Python", "SQ')
+    assert data["candidate_name"] == "Asha"
+    assert data["technical_skills"][0] == "Python"
+
+
+def test_repair_json_gives_up_on_prose():
+    assert repair_json("I could not read this resume.") is None
+
+
+def test_coerce_fixes_types():
+    resume = coerce_to_model({
+        "candidate_name": "Asha",
+        "technical_skills": "Python, SQL",
+        "total_experience_years": "5+ years",
+        "location": ["Bangalore", "India"],
+    }, ParsedResume)
+    assert resume.technical_skills == ["Python", "SQL"]
+    assert resume.total_experience_years == 5.0
+    assert resume.location == "Bangalore, India"
+
+
+def test_coerce_drops_entries_missing_required_fields():
+    salvage = []
+    resume = coerce_to_model({
+        "candidate_name": "Asha",
+        "work_experience": [{"company": "Acme", "role": "Engineer"}, {"role": "Intern"}, {"company": "  "}],
+    }, ParsedResume, salvage)
+    assert [job.company for job in resume.work_experience] == ["Acme"]
+    assert salvage == ["work_experience"]
+
+
+def test_coerce_never_invents_required_values():
+    assert coerce_to_model({"candidate_name": None, "email": "a@b.c"}, ParsedResume) is None
+    assert coerce_to_model({"email": "a@b.c"}, ParsedResume) is None
+    assert coerce_to_model({"role": "Engineer"}, WorkExperience) is None
+
+
+def test_coerce_unwraps_echoed_schema():
+    resume = coerce_to_model({"properties": {"candidate_name": "Asha"}}, ParsedResume)
+    assert resume.candidate_name == "Asha"
+
+
+def test_repair_to_model_reports_salvaged_fields():
+    resume, salvaged = repair_to_model(
+        '{"candidate_name": "Asha", "projects": [{"name": "Search"}], }', ParsedResume
+    )
+    assert resume.candidate_name == "Asha"
+    assert resume.projects == []
+    assert salvaged == ["projects"]
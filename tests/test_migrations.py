@@ -0,0 +1,98 @@
+# tests/test_migrations.py
+import json
+import sqlite3
+
+import app.db.init_db as init_db_module
+from app.db.migrations import MIGRATIONS, check_query_plans
+from app.db.text_store import RAW_TEXT_JOIN, RAW_TEXT_SQL, register_text_functions
+
+# The schema init_db() created in the first release, before any migration existed
+BASELINE_SCHEMA = """
+CREATE TABLE chat_sessions (
+    session_id TEXT PRIMARY KEY, title TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, last_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE chat_messages (
+    message_id TEXT PRIMARY KEY, session_id TEXT, role TEXT, content TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, candidate_names TEXT, search_type TEXT, query_analysis TEXT,
+    FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id)
+);
+CREATE TABLE message_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, message_id TEXT, resume_id TEXT, rank INTEGER,
+    FOREIGN KEY (message_id) REFERENCES chat_messages(message_id),
+    FOREIGN KEY (resume_id) REFERENCES parsed_resumes(resume_id)
+);
+CREATE TABLE upload_batches (
+    batch_id TEXT PRIMARY KEY, recruiter_id TEXT, upload_type pdf, total_files INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE documents (
+    document_id TEXT PRIMARY KEY, batch_id TEXT, raw_text TEXT, original_filename TEXT, file_path TEXT,
+    status TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (batch_id) REFERENCES upload_batches(batch_id)
+);
+CREATE TABLE parsed_resumes (
+    resume_id TEXT PRIMARY KEY, document_id TEXT, candidate_name TEXT, email TEXT, phone TEXT, location TEXT,
+    total_experience_years REAL, current_role TEXT, skills TEXT, work_experience TEXT, education TEXT,
+    projects TEXT, additional_information TEXT,
+    parsed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, indexed_at TIMESTAMP,
+    FOREIGN KEY (document_id) REFERENCES documents(document_id)
+);
+"""
+
+
+def baseline_db(path: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO upload_batches (batch_id, recruiter_id, total_files) VALUES ('b1', 'r1', 1)")
+    conn.execute("""
+        INSERT INTO documents (document_id, batch_id, raw_text, original_filename, file_path, status)
+        VALUES ('d1', 'b1', 'Asha Rao, data engineer at Google', 'asha.pdf', '/tmp/asha.pdf', 'parsed')
+    """)
+    conn.execute("""
+        INSERT INTO parsed_resumes (resume_id, document_id, candidate_name, location, current_role, skills,
+                                    work_experience, education, projects, indexed_at)
+        VALUES ('r1', 'd1', 'Asha Rao', 'Whitefield, Bengaluru', 'Data Engineer', ?, ?, ?, '[]', CURRENT_TIMESTAMP)
+    """, (
+        json.dumps(["Python", "K8s"]),
+        json.dumps([{"company": "Google LLC", "role": "Data Engineer", "start_date": "Jan 2020", "end_date": "Present"}]),
+        json.dumps([{"institute": "IIT Delhi", "degree": "B.Tech", "year": "2019"}]),
+    ))
+    conn.commit()
+    conn.close()
+
+
+def test_init_db_upgrades_a_baseline_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "resumes.db")
+    baseline_db(path)
+    monkeypatch.setattr(init_db_module, "DB_PATH", path)
+    init_db_module.init_db()
+
+    conn = register_text_functions(sqlite3.connect(path))
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    assert versions == [version for version, _, _ in MIGRATIONS]
+
+    # Backfilled facets of the existing resume
+    assert "python" in {row[0] for row in conn.execute("SELECT skill_canonical FROM resume_skills WHERE resume_id = 'r1'")}
+    assert conn.execute("SELECT end_date FROM resume_employment WHERE resume_id = 'r1'").fetchone()[0] == "present"
+    assert conn.execute("SELECT COUNT(*) FROM resume_education WHERE resume_id = 'r1'").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM resume_fts WHERE resume_fts MATCH 'google'").fetchone()[0] == 1
+
+    # The indexed document's text was archived and still reads back
+    text = conn.execute(f"SELECT {RAW_TEXT_SQL} FROM documents d {RAW_TEXT_JOIN} WHERE d.document_id = 'd1'").fetchone()[0]
+    assert text == "Asha Rao, data engineer at Google"
+
+    assert check_query_plans(conn) == []
+    conn.close()
+
+
+def test_init_db_is_idempotent(db_path):
+    conn = sqlite3.connect(db_path)
+    before = conn.execute("SELECT COUNT(*) FROM schema_migrations").fetchone()[0]
+    conn.close()
+
+    init_db_module.init_db()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM schema_migrations").fetchone()[0] == before == len(MIGRATIONS)
+    conn.close()
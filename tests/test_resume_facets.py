@@ -0,0 +1,25 @@
+# tests/test_resume_facets.py
+import pytest
+
+from app.db.resume_facets import CURRENT_MONTH, normalize_month
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Jan 2020", "2020-01"),
+    ("2019", "2019-01"),
+    ("Present", CURRENT_MONTH),
+    ("till date", CURRENT_MONTH),
+    ("", None),
+    (None, None),
+    ("sometime", None),
+])
+def test_normalize_month(value, expected):
+    assert normalize_month(value) == expected
+
+
+def test_bare_year_end_is_december():
+    assert normalize_month("2019", end=True) == "2019-12"
+
+
+def test_current_sorts_after_any_month():
+    assert CURRENT_MONTH > "2099-12"
@@ -0,0 +1,61 @@
+# tests/test_write_queue.py
+import sqlite3
+import threading
+
+import pytest
+
+from app.db.write_queue import WriteQueue
+
+
+@pytest.fixture
+def write_queue(tmp_path):
+    queue = WriteQueue(str(tmp_path / "writes.db"))
+    queue.execute("CREATE TABLE items (name TEXT PRIMARY KEY)").result()
+    yield queue
+    queue.close()
+
+
+def names(queue):
+    conn = sqlite3.connect(queue.db_path)
+    rows = [row[0] for row in conn.execute("SELECT name FROM items ORDER BY name")]
+    conn.close()
+    return rows
+
+
+def test_failed_request_is_rolled_back_alone(write_queue):
+    release = threading.Event()
+    blocker = write_queue.submit(lambda conn: release.wait(5))  # the next three share one transaction
+
+    def half_written(conn):
+        conn.execute("INSERT INTO items (name) VALUES ('partial')")
+        raise ValueError("boom")
+
+    first = write_queue.execute("INSERT INTO items (name) VALUES ('a')")
+    failing = write_queue.submit(half_written)
+    last = write_queue.execute("INSERT INTO items (name) VALUES ('b')")
+    release.set()
+
+    blocker.result()
+    assert first.result() == 1
+    assert last.result() == 1
+    with pytest.raises(ValueError):
+        failing.result()
+    assert names(write_queue) == ["a", "b"]
+
+
+def test_constraint_error_fails_only_its_future(write_queue):
+    write_queue.execute("INSERT INTO items (name) VALUES ('a')").result()
+    duplicate = write_queue.execute("INSERT INTO items (name) VALUES ('a')")
+    other = write_queue.execute("INSERT INTO items (name) VALUES ('c')")
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result()
+    assert other.result() == 1
+    assert names(write_queue) == ["a", "c"]
+
+
+def test_submit_fails_when_the_database_cannot_be_opened(tmp_path):
+    queue = WriteQueue(str(tmp_path))  # a directory, not a database file
+    with pytest.raises((RuntimeError, sqlite3.OperationalError)):
+        queue.execute("SELECT 1").result(timeout=5)
+    with pytest.raises(RuntimeError):
+        queue.execute("SELECT 1")